@@ -0,0 +1,143 @@
+# async_benchmark.py
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from pathlib import Path
+from typing import Dict, Any
+
+from schemes import dilithium, falcon, sphincs, AsyncScheme
+
+class EventLoopLagMonitor:
+    """Measures how late a periodic timer fires while the loop is under load"""
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.lags = []
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(loop.time() - expected, 0.0))
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> Dict[str, float]:
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        lags = sorted(self.lags) or [0.0]
+        return {
+            'samples': len(self.lags),
+            'lag_mean_ms': statistics.mean(lags) * 1000,
+            'lag_p50_ms': lags[len(lags) // 2] * 1000,
+            'lag_p99_ms': lags[min(int(len(lags) * 0.99), len(lags) - 1)] * 1000,
+            'lag_max_ms': lags[-1] * 1000
+        }
+
+class AsyncLoadBenchmark:
+    """Event-loop lag and throughput of blocking calls vs. the AsyncScheme API"""
+
+    def __init__(self, concurrency: int = 32, requests_per_client: int = 20,
+                 message_size: int = 1024, batch_window: float = 0.0005):
+        self.concurrency = concurrency
+        self.requests_per_client = requests_per_client
+        self.message = os.urandom(message_size)
+        self.batch_window = batch_window
+
+    async def _run_mode(self, scheme, mode: str, operation: str, keys, signature) -> Dict[str, Any]:
+        pub_key, priv_key = keys
+        async_scheme = None
+        if mode == 'executor':
+            async_scheme = AsyncScheme(scheme)
+        elif mode == 'batched':
+            async_scheme = AsyncScheme(scheme, batch_window=self.batch_window)
+
+        async def call():
+            if mode == 'blocking':
+                # Direct call on the event loop thread, as the aggregator does today
+                if operation == 'sign':
+                    return scheme.sign(self.message, priv_key)
+                return scheme.verify(self.message, signature, pub_key)
+            if operation == 'sign':
+                return await async_scheme.sign(self.message, priv_key)
+            return await async_scheme.verify(self.message, signature, pub_key)
+
+        latencies = []
+
+        async def client():
+            for _ in range(self.requests_per_client):
+                start = time.perf_counter()
+                await call()
+                latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0)
+
+        monitor = EventLoopLagMonitor()
+        monitor.start()
+        await asyncio.sleep(0.01)
+        start = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(self.concurrency)))
+        elapsed = time.perf_counter() - start
+        lag = await monitor.stop()
+        if async_scheme is not None:
+            async_scheme.close()
+
+        latencies.sort()
+        return {
+            'mode': mode,
+            'operation': operation,
+            'requests': len(latencies),
+            'throughput_ops': len(latencies) / elapsed,
+            'latency_p50_ms': latencies[len(latencies) // 2] * 1000,
+            'latency_p99_ms': latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)] * 1000,
+            **lag
+        }
+
+    async def benchmark_scheme(self, scheme) -> Dict[str, Any]:
+        keys = scheme.keygen()
+        signature = scheme.sign(self.message, keys[1])
+        results = {}
+        for operation in ('verify', 'sign'):
+            modes = ['blocking', 'executor'] + (['batched'] if operation == 'verify' else [])
+            for mode in modes:
+                print(f"  {operation} / {mode}...")
+                result = await self._run_mode(scheme, mode, operation, keys, signature)
+                print(f"    {result['throughput_ops']:.0f} ops/s, "
+                      f"loop lag p99 {result['lag_p99_ms']:.2f} ms, max {result['lag_max_ms']:.2f} ms")
+                results[f'{operation}_{mode}'] = result
+        return results
+
+    async def run(self, schemes) -> Dict[str, Any]:
+        all_results = {}
+        for scheme in schemes:
+            print(f"\nBenchmarking {scheme.get_name()}...")
+            all_results[scheme.get_name()] = await self.benchmark_scheme(scheme)
+        return all_results
+
+def main():
+    parser = argparse.ArgumentParser(description="Event-loop lag under sign/verify load")
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=20, help="Requests per client")
+    parser.add_argument('--message-size', type=int, default=1024)
+    parser.add_argument('--batch-window', type=float, default=0.0005,
+                        help="Verify coalescing window in seconds for batched mode")
+    args = parser.parse_args()
+
+    benchmark = AsyncLoadBenchmark(args.concurrency, args.requests, args.message_size, args.batch_window)
+    results = asyncio.run(benchmark.run([dilithium, falcon, sphincs]))
+
+    Path('results').mkdir(exist_ok=True)
+    with open('results/async_benchmark.json', 'w') as f:
+        json.dump(results, f, indent=2)
+    print("\nResults saved to results/async_benchmark.json")
+
+if __name__ == "__main__":
+    main()
@@ -4,16 +4,34 @@ import time
 import json
 import statistics
 import pandas as pd
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import psutil
 import os
+import ctypes
+from profiling import CellProfiler
+from schemes import RandomnessRecorder, use_randomness
+from schemes.base import randombytes
 
 class Benchmark:
-    def __init__(self, num_iterations: int = 100, warmup_iterations: int = 10):
+    def __init__(self, num_iterations: int = 100, warmup_iterations: int = 10,
+                 profile: bool = False, profile_perf: bool = False,
+                 rng_backend: str = 'system', seed: int = 0, measure_rng: bool = False):
         self.num_iterations = num_iterations
         self.warmup_iterations = warmup_iterations
+        # liboqs randomness backend for all measurements ("deterministic" makes runs replayable)
+        self.rng_backend = rng_backend
+        self.seed = seed
+        self.measure_rng = measure_rng
         self.results_dir = Path('results')
         self.results_dir.mkdir(exist_ok=True)
+        # Optional per-cell cProfile/stack sampling (and perf) capture
+        self.profiler = CellProfiler(self.results_dir / 'profiles', use_perf=profile_perf) if profile else None
+
+    def profile_operation(self, cell_name: str, func, *args) -> Optional[Dict[str, Any]]:
+        """Profile a benchmark cell if profiling is enabled"""
+        if self.profiler is None:
+            return None
+        return self.profiler.profile_cell(cell_name, func, *args, iterations=self.num_iterations)
 
     def measure_operation(self, operation_name: str, func, *args) -> Dict[str, float]:
         """Measure execution time of a function with warmup"""
@@ -74,6 +92,65 @@ class Benchmark:
             'used_mb': memory_used / 1024 / 1024
         }
 
+    def _mean_time(self, func, *args) -> float:
+        """Mean wall time in seconds of func(*args) over num_iterations quiet runs"""
+        start = time.perf_counter()
+        for _ in range(self.num_iterations):
+            func(*args)
+        return (time.perf_counter() - start) / self.num_iterations
+
+    @staticmethod
+    def _replay_randomness(requests: List[int], buffer):
+        for length in requests:
+            randombytes(length, buffer)
+
+    def measure_randomness_cost(self, scheme, backends=('system', 'OpenSSL', 'deterministic')) -> Dict[str, Any]:
+        """
+        Estimate how much of keygen and sign latency comes from each randomness backend.
+
+        The randomness requests an operation makes are recorded once, then replayed
+        against each backend through OQS_randombytes and timed on their own.
+        """
+        print(f"\nMeasuring randomness cost for {scheme.get_name()}...")
+        message = os.urandom(32)
+        pub_key, priv_key = scheme.keygen()
+        operations = {'keygen': (scheme.keygen,), 'sign': (scheme.sign, message, priv_key)}
+
+        requests = {}
+        for op, (func, *args) in operations.items():
+            recorder = RandomnessRecorder()
+            use_randomness(recorder)
+            func(*args)
+            requests[op] = recorder.requests
+
+        results = {
+            'requests': {op: {'calls': len(r), 'bytes': sum(r)} for op, r in requests.items()},
+            'backends': {}
+        }
+        for backend in backends:
+            try:
+                use_randomness(backend, self.seed)
+            except RuntimeError as e:
+                print(f"Skipping randomness backend {backend}: {e}")
+                continue
+            backend_results = {}
+            for op, (func, *args) in operations.items():
+                op_time = self._mean_time(func, *args)
+                buffer = (ctypes.c_uint8 * max(requests[op], default=1))()
+                rng_time = self._mean_time(self._replay_randomness, requests[op], buffer)
+                backend_results[op] = {
+                    'time_ms': op_time * 1000,
+                    'rng_time_ms': rng_time * 1000,
+                    'rng_share': rng_time / op_time if op_time > 0 else 0.0
+                }
+                print(f"  {backend:<13} {op:<6}: {op_time * 1000:.4f} ms, of which RNG "
+                      f"{rng_time * 1000:.4f} ms ({backend_results[op]['rng_share']:.1%}, "
+                      f"{results['requests'][op]['calls']} calls / {results['requests'][op]['bytes']} bytes)")
+            results['backends'][backend] = backend_results
+
+        use_randomness(self.rng_backend, self.seed)
+        return results
+
     def benchmark_scheme(self, scheme, message_sizes: List[int] = None) -> Dict[str, Any]:
         """Run comprehensive benchmark for a scheme"""
         if message_sizes is None:
@@ -96,11 +173,19 @@ class Benchmark:
             'public_key_size': len(pub_key),
             'private_key_size': len(priv_key)
         }
+        if self.profiler:
+            results['measurements']['keygen']['profile'] = self.profile_operation(
+                f'{scheme.get_name()}_keygen', scheme.keygen)
         
-        # Test with different message sizes
+        if self.measure_rng:
+            results['measurements']['randomness'] = self.measure_randomness_cost(scheme)
+        
+        # Test with different message sizes, slicing one random buffer instead of
+        # allocating a constant-byte message per size
+        message_buffer = memoryview(bytearray(os.urandom(max(message_sizes))))
         for size in message_sizes:
             print(f"\nTesting with message size: {size} bytes")
-            message = b'A' * size
+            message = message_buffer[:size]
             signature = scheme.sign(message, priv_key)
             
             size_results = {
@@ -121,6 +206,13 @@ class Benchmark:
                     'signature': len(signature)
                 }
             }
+            if self.profiler:
+                size_results['profile'] = {
+                    'sign': self.profile_operation(f'{scheme.get_name()}_sign_{size}',
+                                                   scheme.sign, message, priv_key),
+                    'verify': self.profile_operation(f'{scheme.get_name()}_verify_{size}',
+                                                     scheme.verify, message, signature, pub_key)
+                }
             
             results['measurements'][f'message_size_{size}'] = size_results
             
@@ -129,6 +221,7 @@ class Benchmark:
     def run_benchmarks(self, schemes: List, message_sizes: List[int] = None) -> Dict[str, Any]:
         """Run benchmarks for multiple schemes and save results"""
         all_results = {}
+        use_randomness(self.rng_backend, self.seed)
         
         for scheme in schemes:
             try:
@@ -145,6 +238,8 @@ class Benchmark:
         
         # Create and save summary
         self._save_summary(all_results)
+        if self.profiler:
+            self.profiler.save_breakdown()
         
         return all_results
 
@@ -163,6 +258,10 @@ class Benchmark:
                 'Public Key Size (bytes)': measurements['keygen']['public_key_size'],
                 'Private Key Size (bytes)': measurements['keygen']['private_key_size']
             }
+            rng_cost = measurements.get('randomness', {}).get('backends', {}).get(self.rng_backend)
+            if rng_cost:
+                base_row['Key Gen RNG Share (%)'] = rng_cost['keygen']['rng_share'] * 100
+                base_row['Sign RNG Share (%)'] = rng_cost['sign']['rng_share'] * 100
             
             # Add data for each message size
             for key, data in measurements.items():
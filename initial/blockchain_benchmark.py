@@ -1,14 +1,35 @@
 from web3 import Web3
+import argparse
 import json
+import os
 import time
 from pathlib import Path
 import statistics
 from typing import Dict, Any
 import numpy as np
-from schemes import dilithium, falcon, sphincs
+from profiling import CellProfiler
+import falcon_onchain
+from wire_formats import ENCODINGS, get_encoding
+
+# The on-chain SHAKE-256 absorbs the message byte by byte, so real Falcon verification
+# is only exercised for messages up to this size
+FALCON_ONCHAIN_MAX_MESSAGE = 4096
+FALCON_ONCHAIN_VARIANTS = ('public_key', 'ntt_key', 'stored_key')
+
+def placeholder_function_name(scheme_name: str) -> str:
+    """Name of the PQCVerifier placeholder function for a scheme"""
+    lowered = scheme_name.lower()
+    if 'mldsa' in lowered or 'ml-dsa' in lowered or 'dilithium' in lowered: # Match ML-DSA name
+        return 'verifyDilithium'
+    elif 'falcon' in lowered:
+        return 'verifyFalconPadded'
+    elif 'sphincs' in lowered: # Match SPHINCS+ name
+        return 'verifySphincsPlus'
+    raise ValueError(f"Unknown scheme name for contract function mapping: {scheme_name}")
 
 class BlockchainPQCBenchmark:
-    def __init__(self):
+    def __init__(self, profile=False, profile_perf=False, profile_iterations=10,
+                 falcon_onchain_iterations=5, signature_encoding='raw'):
         self.w3 = Web3(Web3.HTTPProvider('http://127.0.0.1:8545'))
         
         with open('build/contracts/PQCVerifier.json') as f:
@@ -21,6 +42,23 @@ class BlockchainPQCBenchmark:
         
         self.account = self.w3.eth.accounts[0]
 
+        # Real Falcon-512 verifier (migrations/2_deploy_falcon_verifier.js), if deployed
+        self.falcon_verifier = None
+        if os.path.exists('build/contracts/Falcon512Verifier.json'):
+            with open('build/contracts/Falcon512Verifier.json') as f:
+                contract_json = json.load(f)
+            if '1337' in contract_json.get('networks', {}):
+                self.falcon_verifier = self.w3.eth.contract(
+                    address=contract_json['networks']['1337']['address'],
+                    abi=contract_json['abi']
+                )
+        self.falcon_onchain_iterations = falcon_onchain_iterations
+        self.signature_encoding = signature_encoding
+
+        # Optional per-cell cProfile/stack sampling (and perf) capture
+        self.profiler = CellProfiler('results/profiles', use_perf=profile_perf) if profile else None
+        self.profile_iterations = profile_iterations
+
     def measure_pure_crypto(self, scheme, message: bytes):
         """Measure pure cryptographic operations without blockchain"""
         start_time = time.time()
@@ -46,11 +84,16 @@ class BlockchainPQCBenchmark:
             'signature': signature
         }
     
+    def placeholder_verify_function(self, scheme):
+        """Select the corresponding placeholder function in the PQCVerifier contract"""
+        return getattr(self.contract.functions, placeholder_function_name(scheme.get_name()))
+
     def measure_blockchain_overhead(self, scheme, message: bytes, keys, signature):
         """
         Measure blockchain-specific overheads using placeholder verification.
         NOTE: The contract functions only simulate the transaction cost of sending
               PQC data, they DO NOT perform actual PQC verification on-chain.
+              See measure_falcon_onchain for real Falcon-512 verification gas.
         """
         pub_key, priv_key = keys
         
@@ -67,16 +110,9 @@ class BlockchainPQCBenchmark:
         base_gas = receipt['gasUsed']
         
         # Measure verification transaction on blockchain (calling placeholder function)
-        scheme_name = scheme.get_name().lower()
-        # Select the corresponding placeholder function in the contract
-        if 'mldsa' in scheme_name or 'dilithium' in scheme_name: # Match ML-DSA name
-            verify_func = self.contract.functions.verifyDilithium
-        elif 'falcon' in scheme_name:
-            verify_func = self.contract.functions.verifyFalconPadded
-        elif 'sphincs' in scheme_name: # Match SPHINCS+ name
-            verify_func = self.contract.functions.verifySphincsPlus
-        else:
-             raise ValueError(f"Unknown scheme name for contract function mapping: {scheme.get_name()}")
+        verify_func = self.placeholder_verify_function(scheme)
+        # Send the signature in the selected wire encoding (raw unless --signature-encoding)
+        wire_signature = get_encoding(self.signature_encoding, scheme).encode(signature)
             
         start_time = time.time()
         
@@ -89,7 +125,7 @@ class BlockchainPQCBenchmark:
         try:
             gas_estimate = verify_func(
                 message,
-                signature,
+                wire_signature,
                 pub_key
             ).estimate_gas({'from': self.account}) * 2 # Using a multiplier as safety margin
         except Exception as e:
@@ -105,7 +141,7 @@ class BlockchainPQCBenchmark:
 
         tx_hash = verify_func(
             message,
-            signature,
+            wire_signature,
             pub_key
         ).transact({
             'from': self.account,
@@ -121,7 +157,7 @@ class BlockchainPQCBenchmark:
         if verification_gas < 0: # Ensure non-negative gas
              verification_gas = 0 
         
-        sig_data_size = len(signature) + len(pub_key) # Size of data relevant to verification tx
+        sig_data_size = len(wire_signature) + len(pub_key) # Size of data relevant to verification tx
 
         return {
             'base_transaction_time_ms': base_tx_time,
@@ -132,6 +168,48 @@ class BlockchainPQCBenchmark:
             'total_gas': receipt['gasUsed'] # Total gas for the verification transaction
         }
 
+    def measure_falcon_onchain(self, message: bytes, keys, signature):
+        """
+        Measure real Falcon-512 verification on-chain for each way of passing the public key:
+        the raw key (NTT computed on-chain), a precomputed NTT-domain key in calldata, and an
+        NTT-domain key registered once as contract code. Execution gas is the receipt gas
+        minus the 21000 intrinsic cost and the calldata cost (4 gas per zero byte, 16 otherwise).
+        """
+        pub_key, priv_key = keys
+        h_ntt = falcon_onchain.public_key_to_ntt(pub_key)
+
+        tx_hash = self.falcon_verifier.functions.registerKey(h_ntt).transact({
+            'from': self.account,
+            'gas': 2_000_000
+        })
+        receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
+        key_id = self.falcon_verifier.events.KeyRegistered().process_receipt(receipt)[0]['args']['keyId']
+        results = {'key_registration_gas': receipt['gasUsed']}
+
+        calls = {
+            'public_key': self.falcon_verifier.functions.verifyTx(message, signature, pub_key),
+            'ntt_key': self.falcon_verifier.functions.verifyWithNTTKeyTx(message, signature, h_ntt),
+            'stored_key': self.falcon_verifier.functions.verifyWithStoredKeyTx(message, signature, key_id)
+        }
+        for variant, call in calls.items():
+            gas_estimate = call.estimate_gas({'from': self.account})
+            start_time = time.time()
+            tx_hash = call.transact({'from': self.account, 'gas': int(gas_estimate * 1.2)})
+            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
+            tx_time = (time.time() - start_time) * 1000
+            calldata = bytes(self.w3.eth.get_transaction(tx_hash)['input'])
+            calldata_gas = sum(4 if b == 0 else 16 for b in calldata)
+            event = self.falcon_verifier.events.FalconVerified().process_receipt(receipt)[0]
+            results[variant] = {
+                'valid': event['args']['valid'],
+                'total_gas': receipt['gasUsed'],
+                'calldata_bytes': len(calldata),
+                'calldata_gas': calldata_gas,
+                'execution_gas': receipt['gasUsed'] - 21000 - calldata_gas,
+                'transaction_time_ms': tx_time
+            }
+        return results
+
     def benchmark_scheme(self, scheme, message_sizes=[32, 1024, 32*1024, 128*1024, 1024*1024], iterations=50):
         """Run comprehensive benchmarks for a scheme"""
         results = {
@@ -140,12 +218,17 @@ class BlockchainPQCBenchmark:
             'measurements': {}
         }
         
+        # Random content rather than a constant byte, so hashing sees realistic input
+        message_buffer = os.urandom(max(message_sizes))
         for size in message_sizes:
             print(f"\nTesting with message size: {size} bytes")
-            message = b'A' * size
+            message = message_buffer[:size]
             
             crypto_metrics = []
             blockchain_metrics = []
+            falcon_metrics = []
+            measure_falcon = (self.falcon_verifier is not None and 'falcon' in scheme.get_name().lower()
+                              and size <= FALCON_ONCHAIN_MAX_MESSAGE)
             
             for i in range(iterations):
                 if i % 10 == 0:
@@ -162,6 +245,13 @@ class BlockchainPQCBenchmark:
                         crypto_result['signature']
                     )
                     blockchain_metrics.append(blockchain_result)
+
+                    if measure_falcon and i < self.falcon_onchain_iterations:
+                        falcon_metrics.append(self.measure_falcon_onchain(
+                            message,
+                            crypto_result['keys'],
+                            crypto_result['signature']
+                        ))
                     
                 except Exception as e:
                     print(f"Error in iteration {i}: {str(e)}")
@@ -188,11 +278,46 @@ class BlockchainPQCBenchmark:
                                       crypto_metrics[0]['signature_size']
                     }
                 }
+                if falcon_metrics:
+                    falcon_summary = {
+                        variant: {
+                            metric: statistics.mean(m[variant][metric] for m in falcon_metrics)
+                            for metric in ('total_gas', 'execution_gas', 'calldata_bytes', 'calldata_gas',
+                                           'transaction_time_ms')
+                        }
+                        for variant in FALCON_ONCHAIN_VARIANTS
+                    }
+                    falcon_summary['key_registration_gas'] = statistics.mean(
+                        m['key_registration_gas'] for m in falcon_metrics)
+                    falcon_summary['all_valid'] = all(
+                        m[variant]['valid'] for m in falcon_metrics for variant in FALCON_ONCHAIN_VARIANTS)
+                    results['measurements'][f'message_size_{size}']['falcon_onchain'] = falcon_summary
+                    print("On-chain Falcon-512 gas: " + ", ".join(
+                        f"{variant} {falcon_summary[variant]['total_gas']:.0f}"
+                        for variant in FALCON_ONCHAIN_VARIANTS))
+                if self.profiler:
+                    results['measurements'][f'message_size_{size}']['profile'] = \
+                        self.profile_cell(scheme, message, crypto_metrics[-1])
             
         return results
 
+    def profile_cell(self, scheme, message: bytes, crypto_result):
+        """Profile the pure crypto and blockchain halves of one (scheme, size) cell"""
+        cell = f"{scheme.get_name()}_{len(message)}"
+        return {
+            'pure_crypto': self.profiler.profile_cell(
+                f"{cell}_pure_crypto", self.measure_pure_crypto, scheme, message,
+                iterations=self.profile_iterations),
+            'blockchain_overhead': self.profiler.profile_cell(
+                f"{cell}_blockchain", self.measure_blockchain_overhead, scheme, message,
+                crypto_result['keys'], crypto_result['signature'],
+                iterations=self.profile_iterations)
+        }
+
     def run_all_benchmarks(self):
-        # Use singleton instances
+        # Use singleton instances, imported here so that importing this module (e.g. for
+        # placeholder_function_name in client processes) does not load liboqs
+        from schemes import dilithium, falcon, sphincs
         schemes = [
             dilithium,
             falcon,
@@ -213,7 +338,29 @@ class BlockchainPQCBenchmark:
         Path('results').mkdir(exist_ok=True)
         with open('results/pqc_blockchain_benchmarks.json', 'w') as f:
             json.dump(all_results, f, indent=2)
+        if self.profiler:
+            self.profiler.save_breakdown()
+
+def main():
+    parser = argparse.ArgumentParser(description="PQC signature benchmarks with blockchain overhead")
+    parser.add_argument('--profile', action='store_true',
+                        help="Capture cProfile stats and flamegraphs for every benchmark cell")
+    parser.add_argument('--perf', action='store_true',
+                        help="With --profile, also capture native stacks with `perf record`")
+    parser.add_argument('--profile-iterations', type=int, default=10,
+                        help="Iterations per profiled cell (default: 10)")
+    parser.add_argument('--falcon-iterations', type=int, default=5,
+                        help="Iterations per message size measured on the Falcon512Verifier contract")
+    parser.add_argument('--signature-encoding', choices=list(ENCODINGS), default='raw',
+                        help="Wire encoding for signatures sent to PQCVerifier (see wire_formats.py); only raw and "
+                             "falcon-trimmed are verifiable on-chain, the others measure calldata only")
+    args = parser.parse_args()
+
+    benchmark = BlockchainPQCBenchmark(profile=args.profile, profile_perf=args.perf,
+                                       profile_iterations=args.profile_iterations,
+                                       falcon_onchain_iterations=args.falcon_iterations,
+                                       signature_encoding=args.signature_encoding)
+    benchmark.run_all_benchmarks()
 
 if __name__ == "__main__":
-    benchmark = BlockchainPQCBenchmark()
-    benchmark.run_all_benchmarks()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,328 @@
+# bulk_verify.py
+import argparse
+import base64
+import binascii
+import hashlib
+import json
+import mmap
+import os
+import struct
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, Iterator, Tuple
+
+import schemes
+from schemes import SignatureWrapper
+
+# Binary archive record: u32 msg_len | msg | u32 sig_len | sig | u32 pk_len | pk (big endian)
+LENGTH = struct.Struct('>I')
+# Bytes hashed from each end of the archive to tie a checkpoint to it
+FINGERPRINT_BYTES = 1 << 16
+
+class MalformedRecord(str):
+    """Stands in for the message of a record that could not be parsed; the text is the reason"""
+
+def resolve_scheme(name: str):
+    """Accept a singleton name (dilithium/falcon/sphincs) or any liboqs algorithm name"""
+    if name in ('dilithium', 'falcon', 'sphincs'):
+        return getattr(schemes, name)
+    return SignatureWrapper(name)
+
+def iter_binary_records(buffer, offset: int = 0) -> Iterator[Tuple[int, int, Any, Any, Any]]:
+    """
+    Yield (offset, end_offset, message, signature, public_key) as zero-copy views.
+    A truncated tail is yielded as one MalformedRecord spanning the rest of the buffer;
+    the length prefixes give no way to resynchronise after it, so iteration stops there.
+    """
+    view = memoryview(buffer)
+    size = len(view)
+    while offset < size:
+        start = offset
+        fields = []
+        for _ in range(3):
+            if offset + LENGTH.size > size:
+                break
+            (length,) = LENGTH.unpack_from(view, offset)
+            offset += LENGTH.size
+            if offset + length > size:
+                break
+            fields.append(view[offset:offset + length])
+            offset += length
+        if len(fields) < 3:
+            yield start, size, MalformedRecord(f"truncated record ({size - start} bytes left)"), None, None
+            return
+        yield start, offset, fields[0], fields[1], fields[2]
+
+def iter_jsonl_records(f, offset: int = 0) -> Iterator[Tuple[int, int, Any, Any, Any]]:
+    """
+    Yield records from base64 JSONL lines: {"message", "signature", "public_key"}.
+    A line that does not parse is yielded as a MalformedRecord and reading continues.
+    """
+    f.seek(offset)
+    for line in f:
+        start = offset
+        offset += len(line)
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            yield (start, offset, base64.b64decode(record['message'], validate=True),
+                   base64.b64decode(record['signature'], validate=True),
+                   base64.b64decode(record['public_key'], validate=True))
+        except json.JSONDecodeError as e:
+            yield start, offset, MalformedRecord(f"invalid JSON: {e}"), None, None
+        except binascii.Error as e:
+            yield start, offset, MalformedRecord(f"invalid base64: {e}"), None, None
+        except (KeyError, TypeError, ValueError) as e:
+            yield start, offset, MalformedRecord(f"missing or invalid field: {e}"), None, None
+
+def archive_fingerprint(path: str) -> Dict[str, Any]:
+    """Size and a hash of both ends of the archive, recorded in checkpoints"""
+    size = os.path.getsize(path)
+    digest = hashlib.blake2b(size.to_bytes(8, 'big'), digest_size=16)
+    with open(path, 'rb') as f:
+        digest.update(f.read(FINGERPRINT_BYTES))
+        f.seek(max(0, size - FINGERPRINT_BYTES))
+        digest.update(f.read(FINGERPRINT_BYTES))
+    return {'size': size, 'blake2b': digest.hexdigest()}
+
+class BulkVerifier:
+    """
+    Streaming verification of signed-record archives.
+
+    Records are read lazily (from an mmap for binary archives) and verified in chunks
+    on a thread pool. At most `max_inflight` chunks are queued at once, so reading
+    blocks when workers fall behind and memory stays flat regardless of archive size.
+    Chunks complete in order, which keeps the outputs simple:
+      <output>.bitmap          one bit per record (1 = valid), LSB first
+      <output>.failures.jsonl  index, offset and reason for every failed record
+      <output>.checkpoint.json position after the last completed chunk, for --resume
+    Records that cannot be parsed, or whose public key is not the scheme's key length
+    (liboqs would read past it), are failed with reason "malformed: ..." rather than
+    aborting the run. The checkpoint records the archive's size and fingerprint, and
+    resuming against a different archive is refused.
+    """
+
+    def __init__(self, scheme, output_prefix: str, workers: int = None, chunk_size: int = 256,
+                 max_inflight: int = None, report_interval: float = 5.0):
+        if chunk_size % 8:
+            raise ValueError("chunk_size must be a multiple of 8 so checkpoints are byte-aligned")
+        self.scheme = scheme
+        self.public_key_size = scheme.get_params()['public_key_size']
+        self.workers = workers or os.cpu_count()
+        self.chunk_size = chunk_size
+        self.max_inflight = max_inflight or self.workers * 2
+        self.report_interval = report_interval
+        self.output_prefix = Path(output_prefix)
+        self.output_prefix.parent.mkdir(parents=True, exist_ok=True)
+        self.bitmap_path = Path(f"{output_prefix}.bitmap")
+        self.failures_path = Path(f"{output_prefix}.failures.jsonl")
+        self.checkpoint_path = Path(f"{output_prefix}.checkpoint.json")
+
+    def _verify_chunk(self, chunk):
+        results = []
+        for _, _, message, signature, public_key in chunk:
+            if isinstance(message, MalformedRecord):
+                results.append(f'malformed: {message}')
+                continue
+            if len(public_key) != self.public_key_size:
+                results.append('malformed: public key length')
+                continue
+            try:
+                results.append(True if self.scheme.verify(message, signature, public_key) else 'invalid')
+            except Exception as e:
+                results.append(f'error: {e}')
+        return results
+
+    def _load_checkpoint(self) -> Dict[str, Any]:
+        if not self.checkpoint_path.exists():
+            return {'offset': 0, 'index': 0, 'failures': 0, 'failures_bytes': 0}
+        with open(self.checkpoint_path) as f:
+            return json.load(f)
+
+    def _write_checkpoint(self, state: Dict[str, Any]):
+        tmp = self.checkpoint_path.with_suffix('.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp, self.checkpoint_path)
+
+    def verify_archive(self, archive_path: str, fmt: str = 'binary', resume: bool = False,
+                       start_offset: int = None) -> Dict[str, Any]:
+        if resume and start_offset is not None:
+            # Bitmap bits are record numbers counted from the checkpoint's start
+            raise ValueError("--start-offset cannot be combined with --resume")
+        fingerprint = dict(archive_fingerprint(archive_path), format=fmt)
+        state = self._load_checkpoint() if resume else {'offset': 0, 'index': 0, 'failures': 0,
+                                                       'failures_bytes': 0}
+        if resume and 'archive' in state and state['archive'] != fingerprint:
+            raise ValueError(f"Checkpoint {self.checkpoint_path} belongs to a different archive "
+                             f"({state['archive']}, this one is {fingerprint})")
+        state['archive'] = fingerprint
+        if resume and state.get('completed'):
+            print(f"Archive already fully verified ({state['index']} records, {state['failures']} failed)")
+            return state
+        if start_offset is not None:
+            state['offset'] = start_offset
+        if resume:
+            print(f"Resuming at offset {state['offset']} (record {state['index']})")
+
+        # Drop any output written after the checkpoint
+        bitmap = open(self.bitmap_path, 'r+b' if resume and self.bitmap_path.exists() else 'wb')
+        bitmap.truncate(state['index'] // 8)
+        bitmap.seek(0, os.SEEK_END)
+        failures = open(self.failures_path, 'r+b' if resume and self.failures_path.exists() else 'wb')
+        failures.truncate(state['failures_bytes'])
+        failures.seek(0, os.SEEK_END)
+
+        archive = open(archive_path, 'rb')
+        archive_map = None
+        if fmt == 'binary':
+            # mmap cannot map an empty file
+            if fingerprint['size']:
+                archive_map = mmap.mmap(archive.fileno(), 0, access=mmap.ACCESS_READ)
+            records = iter_binary_records(archive_map or b'', state['offset'])
+        elif fmt == 'jsonl':
+            records = iter_jsonl_records(archive, state['offset'])
+        else:
+            raise ValueError(f"Unknown archive format: {fmt}")
+
+        start_state = dict(state)
+        start_time = time.perf_counter()
+        last_report = start_time
+        inflight = deque()
+
+        def complete_oldest():
+            chunk, future = inflight.popleft()
+            bits = 0
+            for i, (record, result) in enumerate(zip(chunk, future.result())):
+                if result is True:
+                    bits |= 1 << i
+                else:
+                    line = json.dumps({'index': state['index'] + i, 'offset': record[0],
+                                       'reason': result}) + '\n'
+                    failures.write(line.encode())
+                    state['failures_bytes'] += len(line)
+                    state['failures'] += 1
+            bitmap.write(bits.to_bytes((len(chunk) + 7) // 8, 'little'))
+            state['index'] += len(chunk)
+            state['offset'] = chunk[-1][1]
+            # Only full chunks keep the bitmap byte-aligned, so only they are checkpointed
+            if len(chunk) == self.chunk_size:
+                bitmap.flush()
+                failures.flush()
+                self._write_checkpoint(state)
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                chunk = []
+                for record in records:
+                    chunk.append(record)
+                    if len(chunk) == self.chunk_size:
+                        if len(inflight) >= self.max_inflight:
+                            complete_oldest()  # Backpressure: wait for the oldest chunk
+                        inflight.append((chunk, executor.submit(self._verify_chunk, chunk)))
+                        chunk = []
+                        now = time.perf_counter()
+                        if now - last_report >= self.report_interval:
+                            self._report(start_state, state, now - start_time)
+                            last_report = now
+                if chunk:
+                    inflight.append((chunk, executor.submit(self._verify_chunk, chunk)))
+                while inflight:
+                    complete_oldest()
+        finally:
+            inflight.clear()
+            bitmap.close()
+            failures.close()
+            records = None
+            if archive_map is not None:
+                try:
+                    archive_map.close()
+                except BufferError:
+                    pass  # Views still referenced by an aborted chunk; released with it
+            archive.close()
+
+        state['completed'] = True
+        self._write_checkpoint(state)
+        summary = self._report(start_state, state, time.perf_counter() - start_time)
+        summary['completed'] = True
+        with open(f"{self.output_prefix}.summary.json", 'w') as f:
+            json.dump(summary, f, indent=2)
+        return summary
+
+    def _report(self, start_state, state, elapsed: float) -> Dict[str, Any]:
+        records = state['index'] - start_state['index']
+        processed_bytes = state['offset'] - start_state['offset']
+        summary = {
+            'records': state['index'],
+            'failures': state['failures'],
+            'offset': state['offset'],
+            'elapsed_s': elapsed,
+            'records_per_s': records / elapsed if elapsed > 0 else 0.0,
+            'mb_per_s': processed_bytes / elapsed / 1e6 if elapsed > 0 else 0.0
+        }
+        print(f"  {summary['records']} records ({summary['failures']} failed), "
+              f"{summary['records_per_s']:.0f} records/s, {summary['mb_per_s']:.2f} MB/s")
+        return summary
+
+def write_archive(path: str, scheme, count: int, message_size: int = 256, fmt: str = 'binary',
+                  tamper_every: int = 0, keys_per_archive: int = 16):
+    """Write a test archive of `count` signed records, tampering every `tamper_every`-th message"""
+    keys = [scheme.keygen() for _ in range(keys_per_archive)]
+    with open(path, 'wb') as f:
+        for i in range(count):
+            public_key, private_key = keys[i % len(keys)]
+            message = os.urandom(message_size)
+            signature = scheme.sign(message, private_key)
+            if tamper_every and i % tamper_every == tamper_every - 1:
+                message = bytes([message[0] ^ 1]) + message[1:]
+            if fmt == 'binary':
+                for field in (message, signature, public_key):
+                    f.write(LENGTH.pack(len(field)))
+                    f.write(field)
+            else:
+                f.write(json.dumps({
+                    'message': base64.b64encode(message).decode(),
+                    'signature': base64.b64encode(signature).decode(),
+                    'public_key': base64.b64encode(public_key).decode()
+                }).encode() + b'\n')
+    print(f"Wrote {count} records to {path}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming bulk verifier for signed-record archives")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    verify = subparsers.add_parser('verify', help="Verify an archive")
+    verify.add_argument('archive')
+    verify.add_argument('--scheme', default='dilithium',
+                        help="dilithium/falcon/sphincs or a liboqs algorithm name")
+    verify.add_argument('--format', choices=['binary', 'jsonl'], default='binary')
+    verify.add_argument('--output', default='results/bulk_verify', help="Output path prefix")
+    verify.add_argument('--workers', type=int, default=None)
+    verify.add_argument('--chunk-size', type=int, default=256)
+    verify.add_argument('--max-inflight', type=int, default=None, help="Chunks queued at once")
+    verify.add_argument('--resume', action='store_true', help="Continue from the last checkpoint")
+    verify.add_argument('--start-offset', type=int, default=None, help="Byte offset to start reading at")
+
+    generate = subparsers.add_parser('generate', help="Write a test archive")
+    generate.add_argument('archive')
+    generate.add_argument('--scheme', default='dilithium')
+    generate.add_argument('--format', choices=['binary', 'jsonl'], default='binary')
+    generate.add_argument('--count', type=int, default=10000)
+    generate.add_argument('--message-size', type=int, default=256)
+    generate.add_argument('--tamper-every', type=int, default=0)
+    args = parser.parse_args()
+    if args.command == 'verify' and args.resume and args.start_offset is not None:
+        parser.error("--start-offset cannot be combined with --resume")
+
+    scheme = resolve_scheme(args.scheme)
+    if args.command == 'generate':
+        write_archive(args.archive, scheme, args.count, args.message_size, args.format, args.tamper_every)
+        return
+    verifier = BulkVerifier(scheme, args.output, args.workers, args.chunk_size, args.max_inflight)
+    verifier.verify_archive(args.archive, args.format, args.resume, args.start_offset)
+
+if __name__ == "__main__":
+    main()
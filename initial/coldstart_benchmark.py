@@ -0,0 +1,118 @@
+# coldstart_benchmark.py
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Any, List
+
+STAGES = [
+    'import_schemes', 'dlopen', 'oqs_init', 'handle_create',
+    'first_keygen', 'first_sign', 'first_verify',
+    'second_keygen', 'second_sign', 'second_verify'
+]
+DEFAULT_ALGORITHMS = ["ML-DSA-65", "Falcon-padded-512", "SPHINCS+-SHA2-128s-simple"]
+
+def child(algorithm: str, lib_path: str = None):
+    """Runs in a fresh interpreter: time each cold-path stage once and print JSON"""
+    timings = {}
+
+    def timed(stage, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        timings[stage] = (time.perf_counter() - start) * 1000
+        return result
+
+    def import_schemes():
+        import schemes.base
+        return schemes.base
+
+    base = timed('import_schemes', import_schemes)
+    timed('dlopen', base.load_liboqs, lib_path, False)
+    timed('oqs_init', base.initialize_liboqs)
+    sig = timed('handle_create', base.OQSSignature, algorithm)
+    message = os.urandom(32)
+    for prefix in ('first', 'second'):
+        public_key, secret_key = timed(f'{prefix}_keygen', sig.keypair)
+        signature = timed(f'{prefix}_sign', sig.sign, message, secret_key)
+        timed(f'{prefix}_verify', sig.verify, message, signature, public_key)
+    print(json.dumps(timings))
+
+class ColdStartBenchmark:
+    """
+    Times the cold path of a short-lived signer: each run is a fresh Python process
+    that imports the wrapper, dlopens liboqs, runs OQS_init, creates the algorithm
+    handle and performs its first keygen/sign/verify (followed by a second round for
+    comparison with warm calls). Note that the OS page cache is not dropped between runs.
+    """
+
+    def __init__(self, runs: int = 20, lib_path: str = None):
+        self.runs = runs
+        self.lib_path = lib_path
+
+    def run_once(self, algorithm: str) -> Dict[str, float]:
+        cmd = [sys.executable, os.path.abspath(__file__), '--child', algorithm]
+        if self.lib_path:
+            cmd += ['--lib', self.lib_path]
+        start = time.perf_counter()
+        completed = subprocess.run(cmd, capture_output=True, text=True,
+                                   cwd=os.path.dirname(os.path.abspath(__file__)))
+        process_ms = (time.perf_counter() - start) * 1000
+        if completed.returncode != 0:
+            raise RuntimeError(f"Cold-start child failed for {algorithm}: {completed.stderr.strip()}")
+        timings = json.loads(completed.stdout.strip().splitlines()[-1])
+        timings['process_total'] = process_ms
+        return timings
+
+    def benchmark_algorithm(self, algorithm: str) -> Dict[str, Any]:
+        print(f"\nCold-start benchmark for {algorithm} ({self.runs} fresh processes)...")
+        samples: List[Dict[str, float]] = [self.run_once(algorithm) for _ in range(self.runs)]
+        results = {}
+        for stage in STAGES + ['process_total']:
+            values = [sample[stage] for sample in samples]
+            results[stage] = {
+                'median_ms': statistics.median(values),
+                'mean_ms': statistics.mean(values),
+                'min_ms': min(values),
+                'max_ms': max(values)
+            }
+            print(f"  {stage:<15} median {results[stage]['median_ms']:9.3f} ms   "
+                  f"max {results[stage]['max_ms']:9.3f} ms")
+        cold_path = sum(results[stage]['median_ms'] for stage in STAGES[:7])
+        results['cold_path_ms'] = cold_path
+        print(f"  cold path (import .. first verify): {cold_path:.3f} ms")
+        return results
+
+    def run(self, algorithms: List[str]) -> Dict[str, Any]:
+        all_results = {}
+        for algorithm in algorithms:
+            try:
+                all_results[algorithm] = self.benchmark_algorithm(algorithm)
+            except RuntimeError as e:
+                print(f"Error: {e}")
+
+        Path('results').mkdir(exist_ok=True)
+        with open('results/coldstart.json', 'w') as f:
+            json.dump(all_results, f, indent=2)
+        print("\nResults saved to results/coldstart.json")
+        return all_results
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start and first-call latency benchmark")
+    parser.add_argument('--runs', type=int, default=20, help="Fresh processes per algorithm")
+    parser.add_argument('--lib', default=None,
+                        help="Explicit liboqs path (default: LIBOQS_PATH, local build, then linker search)")
+    parser.add_argument('--algorithms', nargs='+', default=DEFAULT_ALGORITHMS)
+    parser.add_argument('--child', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.lib)
+        return
+    ColdStartBenchmark(args.runs, args.lib).run(args.algorithms)
+
+if __name__ == "__main__":
+    main()
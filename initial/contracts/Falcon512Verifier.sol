@@ -0,0 +1,392 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+/**
+ * @title Falcon512Verifier
+ * @notice On-chain Falcon-512 signature verification (NTT-based polynomial multiplication).
+ * Mirrors falcon_onchain.py, which is the reference used to test it. Three ways of passing
+ * the public key are provided so their gas can be compared:
+ *   - verify:               standard 897-byte public key, NTT(h) computed on-chain
+ *   - verifyWithNTTKey:     precomputed NTT-domain key (896 bytes of calldata), one NTT fewer
+ *   - verifyWithStoredKey:  NTT-domain key registered once and read back with EXTCODECOPY
+ * Both the padded (Falcon-padded-512) and variable-length signature encodings are accepted.
+ * The *Tx variants are state-changing wrappers so that receipts report real execution gas.
+ */
+contract Falcon512Verifier {
+    uint256 private constant Q = 12289;
+    uint256 private constant N = 512;
+    uint256 private constant N_INV = 12265;
+    uint256 private constant NONCE_LEN = 40;
+    uint256 private constant PK_LEN = 897;
+    uint256 private constant NTT_KEY_LEN = 896;
+    uint256 private constant SIG_HEADER = 0x39;
+    uint256 private constant PK_HEADER = 0x09;
+    uint256 private constant SIG_BOUND = 34034726;
+    uint256 private constant SHAKE_RATE = 136;
+
+    // PSI^bitrev(k) and their inverses mod q (PSI a primitive 1024th root of unity), 16-bit big endian
+    bytes private constant ZETAS = hex"000105c72036141a102619992d2f051916e40c7b04bc29930e25261022510dd61c8f2aba23011691139f193d166011ef0bbe2549023324620a412c4c12d50a4f2f75073d02d612032b68109f0ad006630b931ce1093e241623ee2fb02c191f21222012c52bdb08f6254612ee23c22181243b0c811c232ad3049226f203bb2ceb20942321095c11641b030b1500821eff2c480ea4197a2cc613cb276c2f8b26551f4b068914d31c842a9c26241051220101e024e703fe2ff8169f2de1265d2eae2f701a5b21cc0d830aab20a518ea1ce729220e7b2193143b0d360163108709f423582d280cd92824232d24c013e427d819861218112404ec014e097a059429610d48095f144723c1243900f30bb8029f0dcb2e250f911cd8277f29f91a4a2e5d23520a7e0b990f8a224b1b2d24d009422031273824bd2b800c72151f27b3065e0cc72028296822dd113e0b1f278311142525144b1ce22a3527001c4f0fd525ac2f901337087620b62f6123b41eac000305921dd32910067f21cd134a0a9014ab149d04902b4a2351085f2bd82e6d122510002e141544094d2a9f077810f12e4e137029ba2c96213d2c1713931f4513e0267c21c32456187b09761797088b0a062a61214e2407001b1c2506601cec03f9102f1d972f0f2a0021890a761c662de00ef90ec22e7b030513ed2bd626a001ba24a119bf01621d04139409b1041524d6283e295b22142d731bab159923822fc918081354019006c0191b17f81ada0e3b2ab2153b04e62c3428100f9e287f20da2e2d206d2e83013c1b26154617cd0e7e1e8e12b51d7415a10ecd009315501ea02be71e4915450f14258604a6211717e6172503fa2247041107b515c62b0309280feb14c310e4133427882df71c2a234318892c8c1c7007a42c160dcc2f102fc704512f731631226c22930b1c03cf107421ef17b401a520110e100cbf1df117bd12ae1903242c15da1f8c2e09025d2703155c03f2031322671479249923ca1fb813c11da70d751d5508011cd12ad800c001af29d609c917122f6a27b2208c24ea190f02a5185a0d082fcd239b052b0ace0c4e0527203302c51f71220f2cbe1850039a2e482012042207a61f1f27e32ba9004021b92d562666196b061e0b84263a18e21eb00efa1489292e23ce2413156e057c2ebc047a2c4d0e902030189b048717d3012716862d75214f0b67205120140d011f37257d00a829c707aa13f218b814b1181a0f7405502b511bc12606181724bf070d07a2080317fe098f0f7b2dc12297223824a500da26c828ce242b101314d5281216f408e9009c253220800f9701c518ed2e5f214512a61acc1281050d27f814f9237f1e74015e05e828ea1afa05d109c4062f18cb2b122fd018e605cb0bc1069d02d300ae0ab219150a5f199a284a0ead24942ea61d6f28bf01aa0cf3";
+    bytes private constant ZETAS_INV = hex"00012a3a1be70fcb2ae802d216681fdb222b0db009f121dc066e2b452386191d25b21d2c03b525c00b9f2dce0ab824431e1219a116c41c6219700d000547137203162c46090f2b6f052e13de23800bc60e800c3f1d130abb270b04261d3c0de110e003e800510c130beb26c31320246e299e25311f6204991dfe2d2b28c4008c06a02a6d26872eb32b151edd1de9167b08291c1d0b410cd407dd232802d90ca9260d1f7a2e9e22cb1bc60e6e218606df131a17170f5c2556227e0e3515a60091015309a40220196200092c030b1a2e210e001fb009dd0565137d1b2e297810b609ac007608951c36033b1687215d03b911022f7f24ec14fe1e9d26a50ce00f6d0b2b2bec26501c6d12fd2e9f16420b602e470961042b1c142cfc0186213f21080221139b258b0e78060100f2126a1fd22c08131529a113dc2fe60bfa0eb305a025fb2776186a268b17860bab0e3e09851c2110bc1c6e03ea0ec4036b06471c9101b31f102889056226b41abd01ed20011ddc0194042927a20cb004b72b711b641b5625711cb70e34298206f1122e2a6f2ffe11550c4d00a00f4b278b1cca00710a55202c13b2090105cc131f1bb60adc1eed087e24e21ec30d2406990fd9233a29a3084e1ae2238f04810b4408c90fd026bf0b3114d40db62077246825830caf01a415b7060808821329207001dc22362d6224492f0e0bc80c401bba26a222b9230e2e5707421292015b0b6d215407b7166725a216ec254f2f532d2e296424402a36171b003104ef173629d2263d2a30150707172a192ea3118d0c821b0808092af41d8015351d5b0ebc01a217142e3c206a0f810acf2f652718190d07ef1b2c1fee0bd6073309392f270b5c0dc90d6a024020862672180327fe285f28f40b4217ea09fb144004b02ab1208d17e71b5017491c0f2857063a2f590a8410ca23000fed0fb0249a0eb2028c197b2eda182e2b7a17660fd1217103b42b8701452a851a930bee0c3306d31b7821071151171f09c7247d29e31696099b02ab0e482fc10458081e10e2285b2bdf0fef01b92c6717b103430df210902d3c0fce2ada23b325332ad60c66003422f917a72d5c16f20b170f75084f009718ef2638062b2e522f4105291330280012ac228c125a1c4010490c370b681b880d9a2cee2c0f1aa508fe2da401f810751a270bd516fe1d5318441210234221f10ff02e5c184d0e121f8d2c3224e50d6e0d9519d0008e2bb0003a00f1223503eb285d1391037517780cbe13d7020a08791ccd1f1d1b3e201626d904fe1a3b284c2bf00dba2c0718dc181b0eea2b5b0a7b20ed1abc11b8041a11611ab12f6e21341a60128d1d4c1173218318341abb14db2ec5017e0f9401d40f270782206307f103cd2b1b1ac6054f21c61527180916e629412e711cad17f900380c7f1a681456028e0ded06a607c3";
+
+    // Keccak-f[1600] round constants (64-bit big endian), rotation offsets and pi lane order (one byte each)
+    bytes private constant KECCAK_RC = hex"00000000000000010000000000008082800000000000808a8000000080008000000000000000808b000000008000000180000000800080818000000000008009000000000000008a00000000000000880000000080008009000000008000000a000000008000808b800000000000008b8000000000008089800000000000800380000000000080028000000000000080000000000000800a800000008000000a8000000080008081800000000000808000000000800000018000000080008008";
+    uint256 private constant KECCAK_ROTC = 0x2c143d27123e2b190838291b0e02372d241c150f0a060301;
+    uint256 private constant KECCAK_PILN = 0x010609160e14020c0d13170f0418150810050312110b070a;
+
+    event FalconVerified(address indexed sender, string variant, bool valid);
+    event KeyRegistered(uint256 indexed keyId, address pointer);
+
+    address[] public keyPointers;
+
+    // --- Public interface ---
+
+    function verify(
+        bytes calldata message,
+        bytes calldata signature,
+        bytes calldata publicKey
+    ) public pure returns (bool) {
+        if (publicKey.length != PK_LEN || uint8(publicKey[0]) != PK_HEADER) {
+            return false;
+        }
+        (uint256[] memory h, bool ok) = _unpack14(publicKey, 1);
+        if (!ok) {
+            return false;
+        }
+        _ntt(h);
+        return _verifyNTT(message, signature, h);
+    }
+
+    function verifyWithNTTKey(
+        bytes calldata message,
+        bytes calldata signature,
+        bytes calldata hNTT
+    ) public pure returns (bool) {
+        if (hNTT.length != NTT_KEY_LEN) {
+            return false;
+        }
+        (uint256[] memory h, bool ok) = _unpack14(hNTT, 0);
+        if (!ok) {
+            return false;
+        }
+        return _verifyNTT(message, signature, h);
+    }
+
+    function verifyWithStoredKey(
+        bytes calldata message,
+        bytes calldata signature,
+        uint256 keyId
+    ) public view returns (bool) {
+        require(keyId < keyPointers.length, "Falcon512Verifier: unknown key");
+        (uint256[] memory h, bool ok) = _unpack14(_readKey(keyPointers[keyId]), 0);
+        if (!ok) {
+            return false;
+        }
+        return _verifyNTT(message, signature, h);
+    }
+
+    /// @notice Store an NTT-domain public key as contract code (SSTORE2) and return its id
+    function registerKey(bytes calldata hNTT) external returns (uint256 keyId) {
+        require(hNTT.length == NTT_KEY_LEN, "Falcon512Verifier: bad key length");
+        // Creation code that returns everything after itself; the leading 0x00 (STOP)
+        // keeps the stored data from being executable.
+        bytes memory creationCode = abi.encodePacked(hex"600B5981380380925939F3", hex"00", hNTT);
+        address pointer;
+        assembly {
+            pointer := create(0, add(creationCode, 32), mload(creationCode))
+        }
+        require(pointer != address(0), "Falcon512Verifier: key deployment failed");
+        keyId = keyPointers.length;
+        keyPointers.push(pointer);
+        emit KeyRegistered(keyId, pointer);
+    }
+
+    function verifyTx(
+        bytes calldata message,
+        bytes calldata signature,
+        bytes calldata publicKey
+    ) external returns (bool valid) {
+        valid = verify(message, signature, publicKey);
+        emit FalconVerified(msg.sender, "public-key", valid);
+    }
+
+    function verifyWithNTTKeyTx(
+        bytes calldata message,
+        bytes calldata signature,
+        bytes calldata hNTT
+    ) external returns (bool valid) {
+        valid = verifyWithNTTKey(message, signature, hNTT);
+        emit FalconVerified(msg.sender, "ntt-key", valid);
+    }
+
+    function verifyWithStoredKeyTx(
+        bytes calldata message,
+        bytes calldata signature,
+        uint256 keyId
+    ) external returns (bool valid) {
+        valid = verifyWithStoredKey(message, signature, keyId);
+        emit FalconVerified(msg.sender, "stored-key", valid);
+    }
+
+    // --- Verification core ---
+
+    function _verifyNTT(
+        bytes calldata message,
+        bytes calldata signature,
+        uint256[] memory hNTT
+    ) private pure returns (bool) {
+        if (signature.length <= 1 + NONCE_LEN || uint8(signature[0]) != SIG_HEADER) {
+            return false;
+        }
+        (uint256[] memory s2, uint256 norm, bool ok) = _decompress(signature[1 + NONCE_LEN:]);
+        if (!ok || norm > SIG_BOUND) {
+            return false;
+        }
+        uint256[] memory c = _hashToPoint(abi.encodePacked(signature[1:1 + NONCE_LEN], message));
+
+        // s1 = c - s2 * h; the N^-1 scaling of the inverse NTT is folded in here
+        _ntt(s2);
+        unchecked {
+            for (uint256 i = 0; i < N; i++) {
+                s2[i] = mulmod(s2[i], hNTT[i], Q);
+            }
+            _inverseNTT(s2);
+            for (uint256 i = 0; i < N; i++) {
+                uint256 s1 = addmod(c[i], Q - mulmod(s2[i], N_INV, Q), Q);
+                if (s1 > Q / 2) {
+                    s1 = Q - s1;
+                }
+                norm += s1 * s1;
+            }
+        }
+        return norm <= SIG_BOUND;
+    }
+
+    /// @dev Falcon comp_decode. Returns s2 mod q and its squared norm; ok is false for
+    ///      non-canonical encodings (overlong values, -0, non-zero trailing bits or padding)
+    function _decompress(bytes calldata data)
+        private
+        pure
+        returns (uint256[] memory s2, uint256 norm, bool ok)
+    {
+        s2 = new uint256[](N);
+        uint256 acc;
+        uint256 accLen;
+        uint256 pos;
+        unchecked {
+            for (uint256 i = 0; i < N; i++) {
+                if (pos >= data.length) {
+                    return (s2, 0, false);
+                }
+                acc = ((acc << 8) | uint8(data[pos++])) & 0xFFFFFFFF;
+                uint256 b = acc >> accLen;
+                uint256 negative = b & 128;
+                uint256 m = b & 127;
+                while (true) {
+                    if (accLen == 0) {
+                        if (pos >= data.length) {
+                            return (s2, 0, false);
+                        }
+                        acc = ((acc << 8) | uint8(data[pos++])) & 0xFFFFFFFF;
+                        accLen = 8;
+                    }
+                    accLen--;
+                    if (((acc >> accLen) & 1) != 0) {
+                        break;
+                    }
+                    m += 128;
+                    if (m > 2047) {
+                        return (s2, 0, false);
+                    }
+                }
+                if (negative != 0) {
+                    if (m == 0) {
+                        return (s2, 0, false);
+                    }
+                    s2[i] = Q - m;
+                } else {
+                    s2[i] = m;
+                }
+                norm += m * m;
+            }
+            if ((acc & ((1 << accLen) - 1)) != 0) {
+                return (s2, 0, false);
+            }
+            for (; pos < data.length; pos++) {
+                if (uint8(data[pos]) != 0) {
+                    return (s2, 0, false);
+                }
+            }
+        }
+        ok = true;
+    }
+
+    /// @dev Unpack 512 big-endian 14-bit coefficients (4 per 7-byte group) starting at `offset`
+    function _unpack14(bytes memory data, uint256 offset)
+        private
+        pure
+        returns (uint256[] memory coeffs, bool ok)
+    {
+        coeffs = new uint256[](N);
+        unchecked {
+            for (uint256 g = 0; g < N / 4; g++) {
+                uint256 group;
+                assembly {
+                    group := shr(200, mload(add(add(data, 32), add(offset, mul(g, 7)))))
+                }
+                for (uint256 k = 0; k < 4; k++) {
+                    uint256 value = (group >> (42 - 14 * k)) & 0x3FFF;
+                    if (value >= Q) {
+                        return (coeffs, false);
+                    }
+                    coeffs[4 * g + k] = value;
+                }
+            }
+        }
+        ok = true;
+    }
+
+    function _readKey(address pointer) private view returns (bytes memory data) {
+        data = new bytes(NTT_KEY_LEN);
+        assembly {
+            extcodecopy(pointer, add(data, 32), 1, 896)
+        }
+    }
+
+    // --- NTT mod q ---
+
+    function _ntt(uint256[] memory a) private pure {
+        bytes memory zetas = ZETAS;
+        unchecked {
+            uint256 k = 1;
+            for (uint256 len = N / 2; len > 0; len >>= 1) {
+                for (uint256 start = 0; start < N; start += 2 * len) {
+                    uint256 zeta = _u16(zetas, k++);
+                    for (uint256 j = start; j < start + len; j++) {
+                        uint256 t = mulmod(zeta, a[j + len], Q);
+                        uint256 x = a[j];
+                        a[j + len] = addmod(x, Q - t, Q);
+                        a[j] = addmod(x, t, Q);
+                    }
+                }
+            }
+        }
+    }
+
+    /// @dev Inverse of _ntt without the final N^-1 scaling
+    function _inverseNTT(uint256[] memory a) private pure {
+        bytes memory zetasInv = ZETAS_INV;
+        unchecked {
+            for (uint256 len = 1; len < N; len <<= 1) {
+                uint256 k = N / (2 * len);
+                for (uint256 start = 0; start < N; start += 2 * len) {
+                    uint256 zetaInv = _u16(zetasInv, k++);
+                    for (uint256 j = start; j < start + len; j++) {
+                        uint256 x = a[j];
+                        uint256 y = a[j + len];
+                        a[j] = addmod(x, y, Q);
+                        a[j + len] = mulmod(x + Q - y, zetaInv, Q);
+                    }
+                }
+            }
+        }
+    }
+
+    function _u16(bytes memory table, uint256 index) private pure returns (uint256 value) {
+        assembly {
+            value := shr(240, mload(add(add(table, 32), shl(1, index))))
+        }
+    }
+
+    // --- SHAKE-256 hash-to-point ---
+
+    /// @dev SHAKE-256(input) read as 16-bit big-endian words; words >= 5q are rejected
+    function _hashToPoint(bytes memory input) private pure returns (uint256[] memory c) {
+        uint64[25] memory state;
+        bytes memory rc = KECCAK_RC;
+        uint256 length = input.length;
+        uint256 blocks = length / SHAKE_RATE + 1;
+        unchecked {
+            // Absorb with SHAKE padding (0x1F ... 0x80)
+            for (uint256 b = 0; b < blocks; b++) {
+                for (uint256 i = 0; i < SHAKE_RATE; i++) {
+                    uint256 p = b * SHAKE_RATE + i;
+                    uint256 v;
+                    if (p < length) {
+                        v = uint8(input[p]);
+                    } else if (p == length) {
+                        v = 0x1F;
+                    }
+                    if (b == blocks - 1 && i == SHAKE_RATE - 1) {
+                        v |= 0x80;
+                    }
+                    state[i / 8] ^= uint64(v << (8 * (i % 8)));
+                }
+                _keccakF(state, rc);
+            }
+
+            // Squeeze
+            c = new uint256[](N);
+            uint256 count;
+            while (true) {
+                for (uint256 i = 0; i < SHAKE_RATE / 8 && count < N; i++) {
+                    uint256 lane = state[i];
+                    for (uint256 j = 0; j < 4 && count < N; j++) {
+                        uint256 w = (((lane >> (16 * j)) & 0xFF) << 8) | ((lane >> (16 * j + 8)) & 0xFF);
+                        if (w < 5 * Q) {
+                            c[count++] = w % Q;
+                        }
+                    }
+                }
+                if (count == N) {
+                    break;
+                }
+                _keccakF(state, rc);
+            }
+        }
+    }
+
+    function _keccakF(uint64[25] memory a, bytes memory rc) private pure {
+        uint64[5] memory c;
+        unchecked {
+            for (uint256 round = 0; round < 24; round++) {
+                // Theta
+                for (uint256 x = 0; x < 5; x++) {
+                    c[x] = a[x] ^ a[x + 5] ^ a[x + 10] ^ a[x + 15] ^ a[x + 20];
+                }
+                for (uint256 x = 0; x < 5; x++) {
+                    uint64 d = c[(x + 4) % 5] ^ _rotl(c[(x + 1) % 5], 1);
+                    for (uint256 y = 0; y < 25; y += 5) {
+                        a[y + x] ^= d;
+                    }
+                }
+                // Rho and pi
+                uint64 current = a[1];
+                for (uint256 i = 0; i < 24; i++) {
+                    uint256 j = (KECCAK_PILN >> (8 * i)) & 0xFF;
+                    uint64 t = a[j];
+                    a[j] = _rotl(current, (KECCAK_ROTC >> (8 * i)) & 0xFF);
+                    current = t;
+                }
+                // Chi
+                for (uint256 y = 0; y < 25; y += 5) {
+                    for (uint256 x = 0; x < 5; x++) {
+                        c[x] = a[y + x];
+                    }
+                    for (uint256 x = 0; x < 5; x++) {
+                        a[y + x] = c[x] ^ (~c[(x + 1) % 5] & c[(x + 2) % 5]);
+                    }
+                }
+                // Iota
+                uint64 roundConstant;
+                assembly {
+                    roundConstant := shr(192, mload(add(add(rc, 32), shl(3, round))))
+                }
+                a[0] ^= roundConstant;
+            }
+        }
+    }
+
+    function _rotl(uint64 x, uint256 r) private pure returns (uint64) {
+        return (x << r) | (x >> (64 - r));
+    }
+}
@@ -1,9 +1,9 @@
 # Debug script to list available functions
 import ctypes
-from ctypes.util import find_library
-import os
+from schemes.base import find_liboqs
 
-lib_path = os.path.expanduser("~/liboqs/build/lib/liboqs.so")
+lib_path = find_liboqs()
+print(f"Using liboqs at {lib_path}")
 lib = ctypes.CDLL(lib_path)
 
 # Print available functions
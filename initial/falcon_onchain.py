@@ -0,0 +1,218 @@
+# falcon_onchain.py
+"""
+Python reference for the on-chain Falcon-512 verifier (contracts/Falcon512Verifier.sol).
+
+Mirrors the contract step by step (public key / signature decoding, SHAKE-256
+hash-to-point, negacyclic NTT multiplication mod q and the squared-norm bound), so
+signatures from `falcon.sign` can be checked off-chain against exactly what the
+contract does, and produces the NTT-domain public keys used by the cheaper variants.
+"""
+import hashlib
+from typing import List, Tuple
+
+Q = 12289
+N = 512
+LOGN = 9
+NONCE_LEN = 40
+SIG_HEADER = 0x30 + LOGN
+PK_HEADER = LOGN
+PK_LEN = 1 + N * 14 // 8
+# Squared-norm bound for Falcon-512 (l2bound[9] in the reference implementation)
+SIG_BOUND = 34034726
+# 11 generates the multiplicative group mod q; PSI is a primitive 2N-th root of unity
+PSI = pow(11, (Q - 1) // (2 * N), Q)
+
+
+def _bit_reverse(x: int, bits: int) -> int:
+    return int(format(x, f'0{bits}b')[::-1], 2)
+
+# ZETAS[k] = PSI^bitrev(k), consumed in the order of the Cooley-Tukey loops below
+ZETAS = [pow(PSI, _bit_reverse(k, LOGN), Q) for k in range(N)]
+ZETAS_INV = [pow(z, Q - 2, Q) for z in ZETAS]
+N_INV = pow(N, Q - 2, Q)
+
+
+def ntt(a: List[int]) -> List[int]:
+    """Forward negacyclic NTT (normal order in, bit-reversed order out)"""
+    a = list(a)
+    k = 1
+    length = N // 2
+    while length >= 1:
+        for start in range(0, N, 2 * length):
+            zeta = ZETAS[k]
+            k += 1
+            for j in range(start, start + length):
+                t = zeta * a[j + length] % Q
+                a[j + length] = (a[j] - t) % Q
+                a[j] = (a[j] + t) % Q
+        length //= 2
+    return a
+
+
+def intt(a: List[int]) -> List[int]:
+    """Inverse of ntt(), including the final scaling by N^-1"""
+    a = list(a)
+    length = 1
+    while length < N:
+        k = N // (2 * length)
+        for start in range(0, N, 2 * length):
+            zeta_inv = ZETAS_INV[k]
+            k += 1
+            for j in range(start, start + length):
+                t = a[j]
+                a[j] = (t + a[j + length]) % Q
+                a[j + length] = (t - a[j + length]) * zeta_inv % Q
+        length *= 2
+    return [x * N_INV % Q for x in a]
+
+
+def decode_14bit(data: bytes, count: int = N) -> List[int]:
+    """Unpack big-endian 14-bit coefficients (Falcon modq_decode)"""
+    acc = int.from_bytes(data[:count * 14 // 8], 'big')
+    coeffs = [(acc >> (14 * (count - 1 - i))) & 0x3FFF for i in range(count)]
+    if any(c >= Q for c in coeffs):
+        raise ValueError("Coefficient out of range")
+    return coeffs
+
+
+def encode_14bit(coeffs: List[int]) -> bytes:
+    acc = 0
+    for c in coeffs:
+        acc = (acc << 14) | c
+    return acc.to_bytes(len(coeffs) * 14 // 8, 'big')
+
+
+def decode_public_key(public_key: bytes) -> List[int]:
+    if len(public_key) != PK_LEN or public_key[0] != PK_HEADER:
+        raise ValueError("Not a Falcon-512 public key")
+    return decode_14bit(public_key[1:])
+
+
+def public_key_to_ntt(public_key: bytes) -> bytes:
+    """NTT-domain public key, 14-bit packed (896 bytes), for the precomputed-key variants"""
+    return encode_14bit(ntt(decode_public_key(public_key)))
+
+
+def decompress(data: bytes) -> Tuple[List[int], int]:
+    """
+    Falcon comp_decode: per coefficient a sign bit, 7 low bits and the high bits in
+    unary. Returns (s2, bytes consumed); raises ValueError on a non-canonical encoding.
+    """
+    coeffs = []
+    acc = 0
+    acc_len = 0
+    pos = 0
+    for _ in range(N):
+        if pos >= len(data):
+            raise ValueError("Truncated signature")
+        acc = ((acc << 8) | data[pos]) & 0xFFFFFFFF
+        pos += 1
+        b = acc >> acc_len
+        sign = b & 128
+        m = b & 127
+        while True:
+            if acc_len == 0:
+                if pos >= len(data):
+                    raise ValueError("Truncated signature")
+                acc = ((acc << 8) | data[pos]) & 0xFFFFFFFF
+                pos += 1
+                acc_len = 8
+            acc_len -= 1
+            if (acc >> acc_len) & 1:
+                break
+            m += 128
+            if m > 2047:
+                raise ValueError("Coefficient too large")
+        if sign and m == 0:
+            raise ValueError("Negative zero")
+        coeffs.append(-m if sign else m)
+    if acc & ((1 << acc_len) - 1):
+        raise ValueError("Non-zero trailing bits")
+    return coeffs, pos
+
+
+def compress(coeffs: List[int]) -> bytes:
+    """Falcon comp_encode, the inverse of decompress()"""
+    out = bytearray()
+    acc = 0
+    acc_len = 0
+    for c in coeffs:
+        if not -2047 <= c <= 2047:
+            raise ValueError("Coefficient out of range for compression")
+        m = abs(c)
+        acc = (acc << 1) | (1 if c < 0 else 0)
+        acc = (acc << 7) | (m & 127)
+        m >>= 7
+        acc <<= m + 1
+        acc |= 1
+        acc_len += 8 + m + 1
+        while acc_len >= 8:
+            acc_len -= 8
+            out.append((acc >> acc_len) & 0xFF)
+        acc &= (1 << acc_len) - 1
+    if acc_len > 0:
+        out.append((acc << (8 - acc_len)) & 0xFF)
+    return bytes(out)
+
+
+def decode_signature(signature: bytes) -> Tuple[bytes, List[int]]:
+    """
+    Split a Falcon-512 signature into (nonce, s2). Accepts both the variable-length
+    and the zero-padded (Falcon-padded-512) encodings: bytes after the compressed
+    s2 must all be zero.
+    """
+    if len(signature) < 1 + NONCE_LEN or signature[0] != SIG_HEADER:
+        raise ValueError("Not a Falcon-512 signature")
+    nonce = signature[1:1 + NONCE_LEN]
+    s2, used = decompress(signature[1 + NONCE_LEN:])
+    if any(signature[1 + NONCE_LEN + used:]):
+        raise ValueError("Non-zero padding")
+    return nonce, s2
+
+
+def hash_to_point(nonce: bytes, message: bytes) -> List[int]:
+    """SHAKE-256(nonce || message) -> N coefficients mod q, rejecting 16-bit values >= 5q"""
+    out = []
+    stream_len = 2 * N + 256
+    while True:
+        stream = hashlib.shake_256(bytes(nonce) + bytes(message)).digest(stream_len)
+        out = []
+        for i in range(0, stream_len, 2):
+            w = (stream[i] << 8) | stream[i + 1]
+            if w < 5 * Q:
+                out.append(w % Q)
+                if len(out) == N:
+                    return out
+        stream_len *= 2
+
+
+def verify_ntt(message: bytes, signature: bytes, h_ntt: List[int]) -> bool:
+    """Verify against an NTT-domain public key"""
+    try:
+        nonce, s2 = decode_signature(signature)
+    except ValueError:
+        return False
+    c = hash_to_point(nonce, message)
+    s2_ntt = ntt([x % Q for x in s2])
+    product = intt([a * b % Q for a, b in zip(s2_ntt, h_ntt)])
+    norm = 0
+    for i in range(N):
+        # s1 = c - s2*h, centred into [-q/2, q/2]
+        s1 = (c[i] - product[i]) % Q
+        if s1 > Q // 2:
+            s1 -= Q
+        norm += s1 * s1 + s2[i] * s2[i]
+    return norm <= SIG_BOUND
+
+
+def verify(message: bytes, signature: bytes, public_key: bytes) -> bool:
+    try:
+        h = decode_public_key(public_key)
+    except ValueError:
+        return False
+    return verify_ntt(message, signature, ntt(h))
+
+
+def solidity_table(values: List[int]) -> str:
+    """16-bit big-endian hex literal for embedding a table in the contract"""
+    return 'hex"' + ''.join(f'{v:04x}' for v in values) + '"'
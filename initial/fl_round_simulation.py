@@ -0,0 +1,273 @@
+# fl_round_simulation.py
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import re
+import statistics
+import time
+from pathlib import Path
+from typing import Dict, Any, List
+
+from web3 import Web3
+
+from blockchain_benchmark import placeholder_function_name
+from bulk_verify import resolve_scheme
+
+RPC_URL = 'http://127.0.0.1:8545'
+NONCE_RETRY_LIMIT = 20
+# Node errors for a transaction it already holds (geth "already known", others "known transaction")
+KNOWN_TRANSACTION = re.compile(r'\balready known\b|\bknown transaction\b')
+# Time allowed for all clients of a round to report, from the barrier release
+ROUND_TIMEOUT = 600.0
+
+def load_ganache_accounts(keys_path: str = 'keys.json') -> List[Dict[str, str]]:
+    """Accounts written by launch_ganache.sh, in account order"""
+    with open(keys_path) as f:
+        keys = json.load(f)
+    return [{'address': Web3.to_checksum_address(address), 'private_key': private_key}
+            for address, private_key in keys['private_keys'].items()]
+
+def client_main(index: int, scheme_name: str, account: Dict[str, str], contract_info: Dict[str, Any],
+                update_size: int, rounds: int, barrier, results):
+    """
+    One federated-learning client in its own process: its own Ganache account and PQC
+    keypair. Each round it waits for the coordinator, signs a fresh model update and
+    submits it to the placeholder verifier as a locally signed transaction, managing its
+    own nonce (retrying if another sender took it) like an independent wallet would. A
+    transaction the node reports as already known counts as submitted.
+    """
+    w3 = Web3(Web3.HTTPProvider(contract_info['rpc_url']))
+    contract = w3.eth.contract(address=contract_info['address'], abi=contract_info['abi'])
+    scheme = resolve_scheme(scheme_name)
+    verify_func = getattr(contract.functions, placeholder_function_name(scheme.get_name()))
+    public_key, private_key = scheme.keygen()
+
+    update = os.urandom(update_size)
+    gas = int(verify_func(update, scheme.sign(update, private_key), public_key)
+              .estimate_gas({'from': account['address']}) * 1.2)
+
+    for round_index in range(rounds):
+        barrier.wait()
+        start = time.time()
+        update = os.urandom(update_size)
+        signature = scheme.sign(update, private_key)
+        signed_at = time.time()
+
+        retries = 0
+        mempool = None
+        while True:
+            try:
+                mempool = len(w3.eth.get_block('pending')['transactions'])
+            except Exception:
+                pass
+            nonce = w3.eth.get_transaction_count(account['address'], 'pending')
+            tx = verify_func(update, signature, public_key).build_transaction({
+                'from': account['address'],
+                'nonce': nonce,
+                'gas': gas
+            })
+            signed = w3.eth.account.sign_transaction(tx, account['private_key'])
+            raw = getattr(signed, 'raw_transaction', None) or signed.rawTransaction
+            try:
+                tx_hash = w3.eth.send_raw_transaction(raw)
+                break
+            except Exception as e:
+                message = str(e).lower()
+                if KNOWN_TRANSACTION.search(message):
+                    # The node already has this exact transaction: resending cannot help
+                    tx_hash = signed.hash
+                    break
+                # Another client sharing this account took the nonce first
+                if retries >= NONCE_RETRY_LIMIT or not any(
+                        reason in message for reason in ('nonce', 'underpriced')):
+                    raise
+                retries += 1
+        submitted_at = time.time()
+        receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=300)
+        mined_at = time.time()
+
+        results.put({
+            'client': index,
+            'round': round_index,
+            'start': start,
+            'signed_at': signed_at,
+            'submitted_at': submitted_at,
+            'mined_at': mined_at,
+            'block_number': receipt['blockNumber'],
+            'gas_used': receipt['gasUsed'],
+            'status': receipt['status'],
+            'nonce': nonce,
+            'nonce_retries': retries,
+            'mempool_at_submit': mempool,
+            'signature_size': len(signature)
+        })
+
+class FederatedRoundSimulation:
+    """
+    Simulates federated-learning rounds: N client processes sign their updates and submit
+    verification transactions at the same moment (released together by a barrier).
+
+    Per round it records completion time (release to last receipt), signing, submission
+    and inclusion latency, gas per round, how many blocks the round spans and how full
+    they are, and nonce/mempool contention (nonce retries, pending transactions seen at
+    submission). Clients get their own account unless `accounts` limits the pool, in
+    which case clients share accounts round-robin and compete for nonces.
+
+    With Ganache's default instamining every transaction gets its own block; set
+    GANACHE_BLOCK_TIME when launching Ganache to observe block fill and mempool queueing.
+    """
+
+    def __init__(self, client_counts: List[int], rounds: int = 5, update_size: int = 1024,
+                 accounts: int = None, keys_path: str = 'keys.json', rpc_url: str = RPC_URL):
+        self.client_counts = client_counts
+        self.rounds = rounds
+        self.update_size = update_size
+        self.account_limit = accounts
+        self.w3 = Web3(Web3.HTTPProvider(rpc_url))
+        # Account 0 is left to the other benchmarks
+        self.accounts = load_ganache_accounts(keys_path)[1:]
+        with open('build/contracts/PQCVerifier.json') as f:
+            contract_json = json.load(f)
+        self.contract_info = {
+            'rpc_url': rpc_url,
+            'address': contract_json['networks']['1337']['address'],
+            'abi': contract_json['abi']
+        }
+        needed = min(max(client_counts), accounts or max(client_counts))
+        if needed > len(self.accounts):
+            raise ValueError(f"{needed} client accounts needed but keys.json has {len(self.accounts)} besides "
+                             f"account 0; relaunch with GANACHE_ACCOUNTS={needed + 1} ./launch_ganache.sh")
+
+    def _summarize_round(self, records: List[Dict[str, Any]], released_at: float) -> Dict[str, Any]:
+        blocks = {}
+        for number in sorted({r['block_number'] for r in records}):
+            block = self.w3.eth.get_block(number)
+            blocks[number] = {
+                'fill': block['gasUsed'] / block['gasLimit'],
+                'transactions': len(block['transactions']),
+                'round_transactions': sum(1 for r in records if r['block_number'] == number)
+            }
+        mempool = [r['mempool_at_submit'] for r in records if r['mempool_at_submit'] is not None]
+        return {
+            'round_time_s': max(r['mined_at'] for r in records) - released_at,
+            'signing_ms': statistics.mean(r['signed_at'] - r['start'] for r in records) * 1000,
+            'submission_ms': statistics.mean(r['submitted_at'] - r['signed_at'] for r in records) * 1000,
+            'inclusion_mean_ms': statistics.mean(r['mined_at'] - r['submitted_at'] for r in records) * 1000,
+            'inclusion_max_ms': max(r['mined_at'] - r['submitted_at'] for r in records) * 1000,
+            'gas_per_round': sum(r['gas_used'] for r in records),
+            'gas_per_client': statistics.mean(r['gas_used'] for r in records),
+            'failed_transactions': sum(1 for r in records if r['status'] != 1),
+            'blocks_spanned': len(blocks),
+            'block_fill_mean': statistics.mean(b['fill'] for b in blocks.values()),
+            'round_transactions_per_block': statistics.mean(b['round_transactions'] for b in blocks.values()),
+            'nonce_retries': sum(r['nonce_retries'] for r in records),
+            'mempool_at_submit_max': max(mempool) if mempool else None,
+            'mempool_at_submit_mean': statistics.mean(mempool) if mempool else None
+        }
+
+    @staticmethod
+    def _collect_round(results, processes, round_index: int) -> List[Dict[str, Any]]:
+        """
+        Wait for one record per client, within ROUND_TIMEOUT for the whole round. Fails
+        as soon as a client process has exited without reporting, rather than waiting.
+        """
+        deadline = time.monotonic() + ROUND_TIMEOUT
+        records = []
+        reported = set()
+        while len(records) < len(processes):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                missing = sorted(set(range(len(processes))) - reported)
+                raise TimeoutError(f"Round {round_index + 1}: no record from clients {missing} "
+                                   f"within {ROUND_TIMEOUT:.0f}s")
+            try:
+                record = results.get(timeout=min(remaining, 1.0))
+            except queue.Empty:
+                for index, process in enumerate(processes):
+                    if index not in reported and process.exitcode is not None:
+                        raise RuntimeError(f"Round {round_index + 1}: client {index} exited with code "
+                                           f"{process.exitcode} before reporting")
+                continue
+            records.append(record)
+            reported.add(record['client'])
+        return records
+
+    def simulate(self, scheme_name: str, clients: int) -> Dict[str, Any]:
+        accounts = self.accounts[:min(clients, self.account_limit or clients)]
+        print(f"\n{scheme_name}: {clients} clients on {len(accounts)} accounts, {self.rounds} rounds")
+        context = multiprocessing.get_context('spawn')
+        barrier = context.Barrier(clients + 1)
+        results = context.Queue()
+        processes = [
+            context.Process(target=client_main, args=(
+                i, scheme_name, accounts[i % len(accounts)], self.contract_info,
+                self.update_size, self.rounds, barrier, results), daemon=True)
+            for i in range(clients)
+        ]
+        for process in processes:
+            process.start()
+
+        rounds = []
+        try:
+            for round_index in range(self.rounds):
+                # Released once every client has its keypair and is ready
+                barrier.wait(timeout=300)
+                released_at = time.time()
+                records = self._collect_round(results, processes, round_index)
+                summary = self._summarize_round(records, released_at)
+                rounds.append(summary)
+                print(f"  round {round_index + 1}: {summary['round_time_s'] * 1000:8.1f} ms, "
+                      f"{summary['gas_per_round']} gas, {summary['blocks_spanned']} blocks "
+                      f"(fill {summary['block_fill_mean'] * 100:.2f}%), "
+                      f"nonce retries {summary['nonce_retries']}")
+        finally:
+            barrier.abort()
+            for process in processes:
+                process.join(timeout=10)
+                if process.is_alive():
+                    process.terminate()
+
+        aggregate = {key: statistics.mean(r[key] for r in rounds)
+                     for key in rounds[0] if all(r[key] is not None for r in rounds)}
+        return {'clients': clients, 'accounts': len(accounts), 'rounds': rounds, 'mean': aggregate}
+
+    def run(self, scheme_names: List[str], output_path='results/fl_rounds.json') -> Dict[str, Any]:
+        all_results = {}
+        for scheme_name in scheme_names:
+            scheme_results = {}
+            for clients in self.client_counts:
+                try:
+                    scheme_results[f'clients_{clients}'] = self.simulate(scheme_name, clients)
+                except Exception as e:
+                    print(f"Error simulating {scheme_name} with {clients} clients: {str(e)}")
+                    import traceback
+                    traceback.print_exc()
+            all_results[scheme_name] = scheme_results
+
+        Path(output_path).parent.mkdir(exist_ok=True)
+        with open(output_path, 'w') as f:
+            json.dump(all_results, f, indent=2)
+        print(f"\nResults saved to {output_path}")
+        return all_results
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent multi-client submission of federated-learning rounds")
+    parser.add_argument('--schemes', nargs='+', default=['dilithium', 'falcon', 'sphincs'],
+                        help="dilithium/falcon/sphincs or liboqs algorithm names")
+    parser.add_argument('--clients', nargs='+', type=int, default=[1, 2, 4, 8],
+                        help="Client counts to simulate")
+    parser.add_argument('--rounds', type=int, default=5, help="Rounds per scheme and client count")
+    parser.add_argument('--update-size', type=int, default=1024, help="Bytes of model update signed per client")
+    parser.add_argument('--accounts', type=int, default=None,
+                        help="Limit the account pool so clients share accounts and contend for nonces")
+    parser.add_argument('--keys', default='keys.json', help="Account keys written by launch_ganache.sh")
+    args = parser.parse_args()
+
+    simulation = FederatedRoundSimulation(sorted(args.clients), args.rounds, args.update_size,
+                                          args.accounts, args.keys)
+    simulation.run(args.schemes)
+
+if __name__ == "__main__":
+    main()
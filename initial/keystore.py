@@ -0,0 +1,349 @@
+# keystore.py
+import argparse
+import hashlib
+import heapq
+import json
+import mmap
+import os
+import struct
+import time
+import tracemalloc
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Any, Iterable, Iterator, Tuple
+
+from schemes.base import OQSSignature
+
+MAGIC = b'PQCKS001'
+# magic, record size, record count, algorithm name
+HEADER = struct.Struct('<8sIQ44s')
+HEADER_SIZE = 64
+INITIAL_CAPACITY = 1024
+# Inserts kept in the pending dict before they are merged into the sorted index arrays
+PENDING_LIMIT = 65536
+
+class MmapKeystore:
+    """
+    Fixed-size key records for one algorithm in a single memory-mapped file.
+
+    Every key of an algorithm has the same length (`length_public_key` or
+    `length_secret_key` of its OQS_SIG struct), so record `i` lives at
+    HEADER_SIZE + i * record_size and no per-key Python object is needed at rest.
+
+    IDs are appended, length-prefixed and in slot order, to an index file. In memory the
+    ID -> slot index is kept as flat arrays (a sorted 64-bit ID hash column, the matching
+    slots, and each slot's offset into the index file) rather than a dict of str objects,
+    about 20 bytes per key. Hash matches are confirmed against the stored ID, so lookups
+    are exact. Recent inserts sit in a small dict until they are merged into the arrays.
+
+    `get` returns a zero-copy memoryview into the map. With the default writable
+    mapping it can be passed straight to `verify` without copying the key.
+    """
+
+    def __init__(self, directory, algorithm: str, kind: str = 'public',
+                 record_size: int = None, readonly: bool = False):
+        if kind not in ('public', 'secret'):
+            raise ValueError(f"Unknown key kind: {kind}")
+        if record_size is None:
+            sig = OQSSignature(algorithm)
+            record_size = sig.length_public_key if kind == 'public' else sig.length_secret_key
+
+        self.algorithm = algorithm
+        self.record_size = record_size
+        self.readonly = readonly
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        stem = f"{algorithm.replace('/', '_')}.{kind}"
+        self.data_path = directory / f"{stem}.keys"
+        self.index_path = directory / f"{stem}.idx"
+
+        self.count = 0
+        self._hashes = array('q')       # sorted ID hashes
+        self._slots = array('I')        # slot of each entry in _hashes
+        self._id_offsets = array('Q')   # index file offset of each slot's ID
+        self._pending: Dict[str, int] = {}
+        self._index_size = 0
+        self._index_map = None
+        self._open()
+
+    def _open(self):
+        if not self.data_path.exists():
+            if self.readonly:
+                raise FileNotFoundError(f"Keystore not found: {self.data_path}")
+            with open(self.data_path, 'wb') as f:
+                f.write(self._header(0).ljust(HEADER_SIZE, b'\0'))
+                f.truncate(HEADER_SIZE + INITIAL_CAPACITY * self.record_size)
+            self.index_path.write_bytes(b'')
+
+        self._file = open(self.data_path, 'rb' if self.readonly else 'r+b')
+        self._map = mmap.mmap(self._file.fileno(), 0,
+                              access=mmap.ACCESS_READ if self.readonly else mmap.ACCESS_WRITE)
+        magic, record_size, count, algorithm = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.data_path} is not a keystore file")
+        if record_size != self.record_size:
+            raise ValueError(f"{self.data_path} has {record_size}-byte records, expected {self.record_size}")
+        self.count = count
+        self._load_index()
+        if not self.readonly:
+            self._index_file = open(self.index_path, 'r+b')
+            # Drop IDs written after the last header update (e.g. a crash mid-import)
+            self._index_file.truncate(self._index_size)
+            self._index_file.seek(self._index_size)
+
+    def _header(self, count: int) -> bytes:
+        return HEADER.pack(MAGIC, self.record_size, count, self.algorithm.encode()[:44])
+
+    def _load_index(self):
+        self._remap_index()
+        pairs = []
+        pos = 0
+        for slot in range(self.count):
+            (length,) = struct.unpack_from('<H', self._index_map, pos)
+            self._id_offsets.append(pos)
+            pairs.append((_id_hash(self._index_map[pos + 2:pos + 2 + length]), slot))
+            pos += 2 + length
+        self._index_size = pos
+        pairs.sort()
+        self._hashes.extend(h for h, _ in pairs)
+        self._slots.extend(slot for _, slot in pairs)
+
+    def _remap_index(self):
+        if not self.readonly and hasattr(self, '_index_file'):
+            self._index_file.flush()
+        size = self.index_path.stat().st_size
+        self._index_map = None
+        if size:
+            with open(self.index_path, 'rb') as f:
+                self._index_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._index_map = b''
+
+    def _read_id(self, slot: int) -> bytes:
+        offset = self._id_offsets[slot]
+        # IDs appended since the last remap are in the index file but not yet in the map
+        end = self._id_offsets[slot + 1] if slot + 1 < len(self._id_offsets) else self._index_size
+        if end > len(self._index_map):
+            self._remap_index()
+        (length,) = struct.unpack_from('<H', self._index_map, offset)
+        return self._index_map[offset + 2:offset + 2 + length]
+
+    def _find(self, key_id: str):
+        slot = self._pending.get(key_id)
+        if slot is not None:
+            return slot
+        encoded_id = key_id.encode()
+        h = _id_hash(encoded_id)
+        i = bisect_left(self._hashes, h)
+        while i < len(self._hashes) and self._hashes[i] == h:
+            slot = self._slots[i]
+            if self._read_id(slot) == encoded_id:
+                return slot
+            i += 1
+        return None
+
+    def _merge_pending(self):
+        """Fold pending inserts into the sorted hash/slot arrays"""
+        if not self._pending:
+            return
+        new = sorted((_id_hash(key_id.encode()), slot) for key_id, slot in self._pending.items())
+        merged = list(heapq.merge(zip(self._hashes, self._slots), new))
+        self._hashes = array('q', (h for h, _ in merged))
+        self._slots = array('I', (slot for _, slot in merged))
+        self._pending.clear()
+
+    @property
+    def capacity(self) -> int:
+        return (len(self._map) - HEADER_SIZE) // self.record_size
+
+    def _reserve(self, records: int):
+        """Grow the file (doubling) so it can hold at least `records` records"""
+        if records <= self.capacity:
+            return
+        new_capacity = max(records, self.capacity * 2)
+        self._map.flush()
+        self._file.truncate(HEADER_SIZE + new_capacity * self.record_size)
+        # The old map stays alive until memoryviews handed out by `get` are released
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_WRITE)
+
+    def _offset(self, slot: int) -> int:
+        return HEADER_SIZE + slot * self.record_size
+
+    def put(self, key_id: str, key):
+        """Store `key` under `key_id`, overwriting any existing record for that ID"""
+        self.import_keys([(key_id, key)])
+
+    def get(self, key_id: str) -> memoryview:
+        """Return a zero-copy view of the key stored under `key_id`"""
+        slot = self._find(key_id)
+        if slot is None:
+            raise KeyError(key_id)
+        offset = self._offset(slot)
+        return memoryview(self._map)[offset:offset + self.record_size]
+
+    def __contains__(self, key_id: str) -> bool:
+        return self._find(key_id) is not None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def ids(self) -> Iterator[str]:
+        """Yield IDs in insertion order"""
+        for slot in range(self.count):
+            yield self._read_id(slot).decode()
+
+    def import_keys(self, items: Iterable[Tuple[str, Any]]) -> int:
+        """Bulk-insert (id, key) pairs; returns the number of records written"""
+        if self.readonly:
+            raise PermissionError("Keystore is opened read-only")
+        if hasattr(items, '__len__'):
+            self._reserve(self.count + len(items))
+
+        written = 0
+        try:
+            for key_id, key in items:
+                if len(key) != self.record_size:
+                    raise ValueError(f"Key for {key_id!r} is {len(key)} bytes, expected {self.record_size}")
+                slot = self._find(key_id)
+                if slot is None:
+                    slot = self.count
+                    self._reserve(slot + 1)
+                    encoded_id = key_id.encode()
+                    # Written (buffered) right away: once merged, _find reads IDs back from the file
+                    self._index_file.write(struct.pack('<H', len(encoded_id)) + encoded_id)
+                    self._id_offsets.append(self._index_size)
+                    self._index_size += 2 + len(encoded_id)
+                    self._pending[key_id] = slot
+                    self.count += 1
+                    if len(self._pending) >= PENDING_LIMIT:
+                        self._merge_pending()
+                offset = self._offset(slot)
+                self._map[offset:offset + self.record_size] = key
+                written += 1
+        finally:
+            # Header, index file and in-memory index agree even if the batch fails part-way
+            self._merge_pending()
+            self.flush()
+        return written
+
+    def export_keys(self) -> Iterator[Tuple[str, bytes]]:
+        """Yield (id, key) pairs in insertion order"""
+        for slot, key_id in enumerate(self.ids()):
+            offset = self._offset(slot)
+            yield key_id, bytes(self._map[offset:offset + self.record_size])
+
+    def flush(self):
+        if self.readonly:
+            return
+        self._index_file.flush()
+        self._map[:HEADER.size] = self._header(self.count)
+        self._map.flush()
+
+    def disk_usage(self) -> Dict[str, int]:
+        """Bytes used at rest by records (excluding unused capacity), header and index"""
+        return {
+            'records': self.count * self.record_size,
+            'header': HEADER_SIZE,
+            'index': self._index_size
+        }
+
+    def close(self):
+        self.flush()
+        if not self.readonly:
+            self._index_file.close()
+        self._map = None
+        self._index_map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _id_hash(encoded_id: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(encoded_id, digest_size=8).digest(), 'little', signed=True)
+
+
+def benchmark_overhead(directory, algorithm: str = 'ML-DSA-65', num_keys: int = 1_000_000,
+                       lookups: int = 100_000, record_size: int = None) -> Dict[str, Any]:
+    """Compare Python heap/disk usage and lookup time of a dict of bytes against MmapKeystore"""
+    if record_size is None:
+        record_size = OQSSignature(algorithm).length_public_key
+    print(f"Generating {num_keys} random {record_size}-byte keys...")
+    ids = [f"participant-{i}" for i in range(num_keys)]
+    raw = os.urandom(num_keys * record_size)
+    raw_key_bytes = num_keys * record_size
+
+    # Dict of bytes, as kept by the node today
+    tracemalloc.start()
+    key_dict = {f"participant-{i}": raw[i * record_size:(i + 1) * record_size] for i in range(num_keys)}
+    dict_heap, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for i in range(lookups):
+        key_dict[ids[i % num_keys]]
+    dict_lookup = (time.perf_counter() - start) / lookups
+    del key_dict
+
+    # Memory-mapped keystore (only the ID index lives on the Python heap)
+    store_dir = Path(directory)
+    for path in store_dir.glob(f"{algorithm}.public.*"):
+        path.unlink()
+    start = time.perf_counter()
+    store = MmapKeystore(store_dir, algorithm, record_size=record_size)
+    store.import_keys([(key_id, memoryview(raw)[i * record_size:(i + 1) * record_size])
+                       for i, key_id in enumerate(ids)])
+    import_time = time.perf_counter() - start
+    store.close()
+
+    tracemalloc.start()
+    store = MmapKeystore(store_dir, algorithm, record_size=record_size)
+    store_heap, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for i in range(lookups):
+        store.get(ids[i % num_keys])
+    store_lookup = (time.perf_counter() - start) / lookups
+    disk = store.disk_usage()
+    store.close()
+
+    disk_total = sum(disk.values())
+    results = {
+        'algorithm': algorithm,
+        'num_keys': num_keys,
+        'record_size': record_size,
+        'raw_key_bytes': raw_key_bytes,
+        'dict_heap_bytes': dict_heap,
+        'dict_overhead_per_key': (dict_heap - raw_key_bytes) / num_keys,
+        'dict_lookup_us': dict_lookup * 1e6,
+        'keystore_heap_bytes': store_heap,
+        'keystore_disk_bytes': disk_total,
+        'keystore_overhead_per_key': (disk_total - raw_key_bytes + store_heap) / num_keys,
+        'keystore_lookup_us': store_lookup * 1e6,
+        'keystore_import_s': import_time
+    }
+    print(f"Dict of bytes:  {dict_heap / 1024 / 1024:.1f} MB heap, "
+          f"{results['dict_overhead_per_key']:.1f} B overhead/key, {results['dict_lookup_us']:.3f} us/lookup")
+    print(f"MmapKeystore:   {disk_total / 1024 / 1024:.1f} MB on disk + {store_heap / 1024 / 1024:.1f} MB index heap, "
+          f"{results['keystore_overhead_per_key']:.1f} B overhead/key, {results['keystore_lookup_us']:.3f} us/lookup")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Keystore at-rest overhead benchmark")
+    parser.add_argument('--algorithm', default='ML-DSA-65', help="liboqs algorithm name")
+    parser.add_argument('--num-keys', type=int, default=1_000_000)
+    parser.add_argument('--directory', default='results/keystore')
+    args = parser.parse_args()
+
+    results = benchmark_overhead(args.directory, args.algorithm, args.num_keys)
+    Path('results').mkdir(exist_ok=True)
+    with open('results/keystore_overhead.json', 'w') as f:
+        json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,10 @@
 #!/bin/bash
 
+# Number of funded accounts (fl_round_simulation.py uses one per client besides account 0)
+# and block time in seconds (0 mines each transaction immediately)
+GANACHE_ACCOUNTS="${GANACHE_ACCOUNTS:-10}"
+GANACHE_BLOCK_TIME="${GANACHE_BLOCK_TIME:-0}"
+
 # Kill any process using port 8545
 kill_port() {
     lsof -i:8545 -t | xargs -r kill -9
@@ -14,10 +19,11 @@ kill_port
 ganache \
     --port 8545 \
     --gas-limit 100000000 \
-    --accounts 10 \
+    --accounts "$GANACHE_ACCOUNTS" \
     --account_keys_path "keys.json" \
     --mnemonic "test test test test test test test test test test test junk" \
     --chain.networkId 1337 \
     --chain.chainId 1337 \
     --chain.hardfork "london" \
-    --wallet.defaultBalance 10000
\ No newline at end of file
+    --miner.blockTime "$GANACHE_BLOCK_TIME" \
+    --wallet.defaultBalance 10000
@@ -1,12 +1,30 @@
 # main.py
+import argparse
 from benchmark import Benchmark
 from schemes import dilithium, falcon, sphincs
 
 def main():
+    parser = argparse.ArgumentParser(description="Pure crypto PQC signature benchmarks")
+    parser.add_argument('--profile', action='store_true',
+                        help="Capture cProfile stats and flamegraphs for every benchmark cell")
+    parser.add_argument('--perf', action='store_true',
+                        help="With --profile, also capture native stacks with `perf record`")
+    parser.add_argument('--rng', default='system', choices=['system', 'OpenSSL', 'deterministic'],
+                        help="liboqs randomness backend (deterministic = seeded DRBG for replayable runs)")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for --rng deterministic")
+    parser.add_argument('--rng-cost', action='store_true',
+                        help="Report the share of keygen/sign latency spent in each randomness backend")
+    args = parser.parse_args()
+
     # Initialize benchmark with desired parameters
     benchmark = Benchmark(
         num_iterations=100,  # Number of iterations for timing measurements
-        warmup_iterations=10  # Number of warmup iterations
+        warmup_iterations=10,  # Number of warmup iterations
+        profile=args.profile,
+        profile_perf=args.perf,
+        rng_backend=args.rng,
+        seed=args.seed,
+        measure_rng=args.rng_cost
     )
     
     # List of schemes to test
@@ -29,6 +47,8 @@ def main():
     print("\nBenchmarking complete. Results saved to results/")
     print("- Detailed results: results/detailed_measurements.json")
     print("- Summary: results/summary.csv")
+    if args.profile:
+        print("- Profiles: results/profiles/ (breakdown.csv, *.prof, *.svg)")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
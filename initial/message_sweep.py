@@ -0,0 +1,124 @@
+# message_sweep.py
+import argparse
+import json
+import math
+import os
+import statistics
+import time
+from pathlib import Path
+from typing import Dict, Any, List
+
+from schemes import dilithium, falcon, sphincs
+
+def log_spaced_sizes(max_size: int, points_per_octave: int = 2) -> List[int]:
+    """Sizes from 1 byte to max_size, evenly spaced on a log scale (duplicates removed)"""
+    steps = int(math.log2(max_size) * points_per_octave)
+    sizes = sorted({max(1, round(2 ** (i / points_per_octave))) for i in range(steps + 1)} | {max_size})
+    return [size for size in sizes if size <= max_size]
+
+class MessageSizeSweep:
+    """
+    Sign/verify latency and throughput across log-spaced message sizes.
+
+    Messages are zero-copy slices of one preallocated random buffer, so no per-size
+    allocation happens and the hashing paths see realistic input. Each size is timed
+    for at least `min_time` seconds (bounded by `min_iterations`/`max_iterations`).
+
+    Latency is modelled as t(size) = fixed + size / throughput. The crossover size
+    `fixed * throughput` is where hashing the message starts to cost as much as the
+    scheme's fixed per-call work; above it the scheme is hash-throughput-dominated.
+    """
+
+    def __init__(self, max_size: int = 16 * 1024 * 1024, points_per_octave: int = 2,
+                 min_time: float = 0.2, min_iterations: int = 3, max_iterations: int = 1000):
+        self.sizes = log_spaced_sizes(max_size, points_per_octave)
+        self.min_time = min_time
+        self.min_iterations = min_iterations
+        self.max_iterations = max_iterations
+        # Writable buffer, so slices are passed to liboqs without copying
+        self.buffer = memoryview(bytearray(os.urandom(max_size)))
+
+    def _time(self, func, *args) -> float:
+        """Median wall time in seconds of func(*args)"""
+        times = []
+        deadline = time.perf_counter() + self.min_time
+        while len(times) < self.max_iterations and (
+                len(times) < self.min_iterations or time.perf_counter() < deadline):
+            start = time.perf_counter()
+            func(*args)
+            times.append(time.perf_counter() - start)
+        return statistics.median(times)
+
+    @staticmethod
+    def find_crossover(points: List[Dict[str, float]]) -> Dict[str, float]:
+        """Fit fixed cost from the smallest sizes and per-byte cost from the largest"""
+        small = [p['latency_ms'] for p in points if p['size'] <= 64] or [points[0]['latency_ms']]
+        fixed_ms = statistics.median(small)
+        large = points[-3:]
+        per_byte_ms = statistics.median(max(p['latency_ms'] - fixed_ms, 0.0) / p['size'] for p in large)
+        if per_byte_ms <= 0:
+            return {'fixed_ms': fixed_ms, 'hash_throughput_mbps': None, 'crossover_bytes': None}
+        return {
+            'fixed_ms': fixed_ms,
+            'hash_throughput_mbps': 1 / per_byte_ms / 1000,
+            'crossover_bytes': fixed_ms / per_byte_ms
+        }
+
+    def sweep_scheme(self, scheme) -> Dict[str, Any]:
+        print(f"\nSweeping {scheme.get_name()} over {len(self.sizes)} sizes "
+              f"({self.sizes[0]} B - {self.sizes[-1]} B)...")
+        pub_key, priv_key = scheme.keygen()
+        results = {'sizes': self.sizes, 'sign': [], 'verify': []}
+        for size in self.sizes:
+            message = self.buffer[:size]
+            signature = scheme.sign(message, priv_key)
+            for op, args in (('sign', (message, priv_key)), ('verify', (message, signature, pub_key))):
+                latency = self._time(getattr(scheme, op), *args)
+                results[op].append({
+                    'size': size,
+                    'latency_ms': latency * 1000,
+                    'throughput_mbps': size / latency / 1e6
+                })
+            print(f"  {size:>10} B: sign {results['sign'][-1]['latency_ms']:.3f} ms "
+                  f"({results['sign'][-1]['throughput_mbps']:.1f} MB/s), "
+                  f"verify {results['verify'][-1]['latency_ms']:.3f} ms "
+                  f"({results['verify'][-1]['throughput_mbps']:.1f} MB/s)")
+
+        results['crossover'] = {op: self.find_crossover(results[op]) for op in ('sign', 'verify')}
+        for op, crossover in results['crossover'].items():
+            if crossover['crossover_bytes'] is not None:
+                print(f"  {op}: fixed {crossover['fixed_ms']:.3f} ms, hashing "
+                      f"{crossover['hash_throughput_mbps']:.0f} MB/s, "
+                      f"hash-dominated above ~{crossover['crossover_bytes']:.0f} B")
+        return results
+
+    def run(self, schemes, output_path='results/message_sweep.json') -> Dict[str, Any]:
+        all_results = {}
+        for scheme in schemes:
+            try:
+                all_results[scheme.get_name()] = self.sweep_scheme(scheme)
+            except Exception as e:
+                print(f"Error sweeping {scheme.get_name()}: {str(e)}")
+                import traceback
+                traceback.print_exc()
+
+        Path(output_path).parent.mkdir(exist_ok=True)
+        with open(output_path, 'w') as f:
+            json.dump(all_results, f, indent=2)
+        print(f"\nResults saved to {output_path}")
+        return all_results
+
+def main():
+    parser = argparse.ArgumentParser(description="Log-spaced message-size sweep for sign/verify")
+    parser.add_argument('--max-size', type=int, default=16 * 1024 * 1024,
+                        help="Largest message size in bytes (default: 16 MiB)")
+    parser.add_argument('--points-per-octave', type=int, default=2)
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help="Minimum measuring time per size and operation in seconds")
+    args = parser.parse_args()
+
+    sweep = MessageSizeSweep(args.max_size, args.points_per_octave, args.min_time)
+    sweep.run([dilithium, falcon, sphincs])
+
+if __name__ == "__main__":
+    main()
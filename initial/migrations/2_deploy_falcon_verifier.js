@@ -0,0 +1,6 @@
+// migrations/2_deploy_falcon_verifier.js
+const Falcon512Verifier = artifacts.require("Falcon512Verifier");
+
+module.exports = function(deployer) {
+  deployer.deploy(Falcon512Verifier);
+};
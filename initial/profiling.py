@@ -0,0 +1,368 @@
+# profiling.py
+import ast
+import cProfile
+import csv
+import dis
+import inspect
+import os
+import pstats
+import re
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+import textwrap
+import time
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Any, List
+
+from schemes import base as oqs_base
+
+# Leaf frames in these stdlib modules are blocked on sockets (e.g. waiting for Ganache)
+IO_MODULES = ('socket.py', 'ssl.py', 'selectors.py', 'http/client.py', 'urllib3')
+CATEGORIES = ('python', 'ctypes', 'native', 'io')
+
+
+class CellProfiler:
+    """
+    Per-cell profiler for the benchmark harnesses.
+
+    Each benchmark cell (scheme x operation x message size) is run in up to three
+    separate passes so the profilers do not distort each other:
+      1. cProfile, dumped as a .prof file plus a text summary.
+      2. A Python stack sampler, written as collapsed stacks and a flamegraph SVG.
+         Its leaf frames give the Python / ctypes / native / io time breakdown.
+      3. Optionally `perf record` on this process for the native stack
+         (requires `perf` on PATH and permission to attach to the process).
+    """
+
+    def __init__(self, output_dir='results/profiles', use_perf: bool = False,
+                 sample_interval: float = 0.0005, perf_frequency: int = 999):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.sample_interval = sample_interval
+        self.perf_frequency = perf_frequency
+        self.use_perf = use_perf and self._perf_available()
+        self.cells: List[Dict[str, Any]] = []
+
+    @staticmethod
+    def _perf_available() -> bool:
+        if shutil.which('perf') is None:
+            print("Warning: perf not found on PATH, native stack capture disabled.")
+            return False
+        return True
+
+    @staticmethod
+    def _cell_filename(cell_name: str) -> str:
+        return re.sub(r'[^A-Za-z0-9_.-]+', '_', cell_name)
+
+    def profile_cell(self, cell_name: str, func, *args, iterations: int = 10) -> Dict[str, Any]:
+        """Profile `iterations` calls of func(*args) and return paths and time breakdown"""
+        print(f"Profiling {cell_name} ({iterations} iterations)...")
+        stem = self.output_dir / self._cell_filename(cell_name)
+
+        # Pass 1: cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+        for _ in range(iterations):
+            func(*args)
+        profiler.disable()
+        profiler.dump_stats(f"{stem}.prof")
+        with open(f"{stem}.prof.txt", 'w') as f:
+            stats = pstats.Stats(profiler, stream=f)
+            stats.sort_stats('cumulative').print_stats(30)
+
+        # Pass 2: sampled Python stacks (plus perf if enabled)
+        perf_data = f"{stem}.perf.data"
+        perf_proc = self._start_perf(perf_data) if self.use_perf else None
+
+        sampler = _StackSampler(threading.get_ident(), self.sample_interval)
+        sampler.start()
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func(*args)
+        elapsed = time.perf_counter() - start
+        sampler.stop()
+
+        result = {
+            'cell': cell_name,
+            'iterations': iterations,
+            'wall_time_per_call_ms': elapsed / iterations * 1000,
+            'samples': sampler.total_samples,
+            'cprofile_stats': f"{stem}.prof",
+            'python_collapsed': f"{stem}.python.collapsed",
+            'python_flamegraph': f"{stem}.python.svg",
+            'breakdown_ms': self._breakdown(sampler.category_counts, sampler.total_samples,
+                                            elapsed / iterations)
+        }
+        write_collapsed(sampler.stacks, result['python_collapsed'])
+        write_flamegraph_svg(sampler.stacks, result['python_flamegraph'],
+                             title=f"{cell_name} (Python stacks)")
+
+        if perf_proc is not None:
+            result['perf'] = self._finish_perf(perf_proc, perf_data, stem, cell_name,
+                                               elapsed / iterations)
+
+        print("  Breakdown per call: " + ", ".join(
+            f"{k} {v:.3f} ms" for k, v in result['breakdown_ms'].items()))
+        self.cells.append(result)
+        return result
+
+    @staticmethod
+    def _breakdown(counts: Counter, total: int, seconds_per_call: float) -> Dict[str, float]:
+        if total == 0:
+            return {category: 0.0 for category in CATEGORIES}
+        return {category: counts[category] / total * seconds_per_call * 1000
+                for category in CATEGORIES}
+
+    def _start_perf(self, perf_data: str):
+        cmd = ['perf', 'record', '-F', str(self.perf_frequency), '-g',
+               '-p', str(os.getpid()), '-o', perf_data]
+        try:
+            proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        except OSError as e:
+            print(f"Warning: could not start perf: {e}")
+            return None
+        time.sleep(0.2)  # Give perf time to attach before the measured loop starts
+        if proc.poll() is not None:
+            print(f"Warning: perf exited early: {proc.stderr.read().decode(errors='replace').strip()}")
+            return None
+        return proc
+
+    def _finish_perf(self, proc, perf_data: str, stem: Path, cell_name: str,
+                     seconds_per_call: float) -> Dict[str, Any]:
+        proc.send_signal(signal.SIGINT)
+        proc.wait()
+        try:
+            script = subprocess.run(['perf', 'script', '-i', perf_data],
+                                    capture_output=True, text=True, check=True).stdout
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"Warning: perf script failed: {e}")
+            return {}
+
+        stacks, counts = collapse_perf_script(script)
+        total = sum(counts.values())
+        perf_result = {
+            'perf_data': perf_data,
+            'native_collapsed': f"{stem}.native.collapsed",
+            'native_flamegraph': f"{stem}.native.svg",
+            'samples': total,
+            'breakdown_ms': self._breakdown(counts, total, seconds_per_call)
+        }
+        write_collapsed(stacks, perf_result['native_collapsed'])
+        write_flamegraph_svg(stacks, perf_result['native_flamegraph'],
+                             title=f"{cell_name} (perf native stacks)")
+        return perf_result
+
+    def save_breakdown(self, filename: str = 'breakdown.csv'):
+        """Write one row per profiled cell with the per-call time breakdown"""
+        path = self.output_dir / filename
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            header = ['Cell', 'Iterations', 'Wall Time (ms)']
+            header += [f'{c.capitalize()} (ms)' for c in CATEGORIES]
+            header += [f'Perf {c.capitalize()} (ms)' for c in CATEGORIES]
+            writer.writerow(header)
+            for cell in self.cells:
+                row = [cell['cell'], cell['iterations'], f"{cell['wall_time_per_call_ms']:.4f}"]
+                row += [f"{cell['breakdown_ms'][c]:.4f}" for c in CATEGORIES]
+                perf_breakdown = cell.get('perf', {}).get('breakdown_ms')
+                row += [f"{perf_breakdown[c]:.4f}" if perf_breakdown else '' for c in CATEGORIES]
+                writer.writerow(row)
+        print(f"Profile breakdown saved to {path}")
+
+
+class _StackSampler(threading.Thread):
+    """Samples the target thread's Python stack at a fixed interval"""
+
+    def __init__(self, target_thread_id: int, interval: float):
+        super().__init__(daemon=True)
+        self.target_thread_id = target_thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.category_counts: Counter = Counter()
+        self.total_samples = 0
+        self._stop_event = threading.Event()
+        self._old_switch_interval = sys.getswitchinterval()
+
+    def start(self):
+        # A short switch interval lets the sampler get the GIL while the
+        # target thread is in Python code, which would otherwise be under-sampled.
+        sys.setswitchinterval(self.interval)
+        super().start()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        sys.setswitchinterval(self._old_switch_interval)
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.target_thread_id)
+            if frame is None:
+                continue
+            category = classify_frame(frame)
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})")
+                frame = frame.f_back
+            frames.reverse()
+            if category == 'native':
+                frames.append('[liboqs]')
+            self.stacks[';'.join(frames)] += 1
+            self.category_counts[category] += 1
+            self.total_samples += 1
+
+
+def native_call_sites(functions) -> Dict[Any, set]:
+    """
+    Map each function's code object to the bytecode offsets of its liboqs foreign calls.
+
+    Calls of an `OQS_*` attribute are found in the function's AST, so formatting and line
+    wrapping do not matter, and each is mapped to its outermost CALL instruction: a frame
+    parked there is inside the foreign call, while one still evaluating or converting the
+    call's arguments sits on an earlier instruction.
+    """
+    sites = {}
+    for func in functions:
+        code = func.__code__
+        source = inspect.getsource(func)
+        indent = len(source) - len(source.lstrip())
+        tree = ast.parse(textwrap.dedent(source))
+        spans = [((node.lineno + code.co_firstlineno - 1, node.col_offset + indent),
+                  (node.end_lineno + code.co_firstlineno - 1, node.end_col_offset + indent))
+                 for node in ast.walk(tree)
+                 if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                 and node.func.attr.startswith('OQS_')]
+        offsets = set()
+        instructions = list(dis.get_instructions(code))
+        for start, end in spans:
+            last_call = None
+            line = code.co_firstlineno
+            for instr in instructions:
+                positions = getattr(instr, 'positions', None)
+                if positions is not None and positions.lineno is not None:
+                    inside = start <= (positions.lineno, positions.col_offset) \
+                        and (positions.end_lineno, positions.end_col_offset) <= end
+                else:
+                    # Before Python 3.11 there are no column positions; fall back to lines
+                    line = instr.starts_line or line
+                    inside = start[0] <= line <= end[0]
+                if inside and instr.opname.startswith('CALL'):
+                    last_call = instr.offset
+            if last_call is not None:
+                offsets.add(last_call)
+        if offsets:
+            sites[code] = offsets
+    return sites
+
+# The liboqs entry points in schemes/base.py. ctypes releases the GIL during foreign
+# calls, so a sample taken while liboqs runs shows one of these frames parked on its call.
+NATIVE_CALL_SITES = native_call_sites(
+    [obj for _, obj in inspect.getmembers(oqs_base, inspect.isfunction)
+     if obj.__module__ == oqs_base.__name__]
+    + [obj for _, obj in inspect.getmembers(oqs_base.OQSSignature, inspect.isfunction)])
+
+
+def classify_frame(frame) -> str:
+    """Attribute a sampled leaf frame to python, ctypes, native or io time"""
+    if frame.f_lasti in NATIVE_CALL_SITES.get(frame.f_code, ()):
+        return 'native'
+    filename = frame.f_code.co_filename.replace(os.sep, '/')
+    if filename.endswith('schemes/base.py'):
+        return 'ctypes'
+    if '/ctypes/' in filename:
+        return 'ctypes'
+    if any(module in filename for module in IO_MODULES):
+        return 'io'
+    return 'python'
+
+
+def collapse_perf_script(script: str):
+    """Fold `perf script` output into collapsed stacks and per-category sample counts"""
+    stacks: Counter = Counter()
+    counts: Counter = Counter()
+    for block in script.split('\n\n'):
+        lines = [line.strip() for line in block.strip().splitlines()]
+        if len(lines) < 2:
+            continue
+        # Frame lines look like: "7f3a2b1c sym+0x12 (/path/to/liboqs.so)"
+        frames = []
+        for line in lines[1:]:
+            parts = line.split(None, 1)
+            if len(parts) < 2:
+                continue
+            symbol, _, dso = parts[1].rpartition(' (')
+            frames.append((symbol.split('+0x')[0] or '[unknown]', dso.rstrip(')')))
+        if not frames:
+            continue
+        leaf_dso = frames[0][1]
+        if 'liboqs' in leaf_dso:
+            counts['native'] += 1
+        elif 'libffi' in leaf_dso or '_ctypes' in leaf_dso:
+            counts['ctypes'] += 1
+        elif 'kernel' in leaf_dso:
+            counts['io'] += 1
+        else:
+            counts['python'] += 1
+        stacks[';'.join(f"{symbol} [{Path(dso).name}]" for symbol, dso in reversed(frames))] += 1
+    return stacks, counts
+
+
+def write_collapsed(stacks: Counter, path: str):
+    """Write collapsed stacks in the format used by flamegraph.pl and speedscope"""
+    with open(path, 'w') as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+
+
+def write_flamegraph_svg(stacks: Counter, path: str, title: str = 'Flame Graph',
+                         width: int = 1200, frame_height: int = 16):
+    """Render collapsed stacks as a static flamegraph SVG"""
+    # Build a call tree: node = [count, children]
+    root = [0, {}]
+    for stack, count in stacks.items():
+        node = root
+        node[0] += count
+        for frame in stack.split(';'):
+            node = node[1].setdefault(frame, [0, {}])
+            node[0] += count
+
+    rects = []
+
+    def layout(children, x, depth, scale):
+        for name, (count, grandchildren) in sorted(children.items()):
+            w = count * scale
+            if w >= 0.5:
+                rects.append((x, depth, w, name, count))
+                layout(grandchildren, x, depth + 1, scale)
+            x += w
+
+    total = root[0] or 1
+    layout(root[1], 10.0, 0, (width - 20) / total)
+    max_depth = max((r[1] for r in rects), default=0) + 1
+    height = (max_depth + 3) * frame_height
+
+    def escape(text):
+        return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+    out = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+           f'font-family="monospace" font-size="11">',
+           f'<text x="{width / 2}" y="{frame_height}" text-anchor="middle" font-size="14">'
+           f'{escape(title)}</text>']
+    for x, depth, w, name, count in rects:
+        y = height - (depth + 1) * frame_height
+        # crc32 rather than hash(), which is salted per process, so SVGs are reproducible
+        hue = 0 if name == '[liboqs]' or '[liboqs' in name else 20 + (zlib.crc32(name.encode()) % 40)
+        label = escape(name) if w > 7 * len(name) else escape(name[:max(int(w / 7) - 2, 0)]) + '..'
+        out.append(f'<g><title>{escape(name)} ({count} samples, {count / total:.1%})</title>'
+                   f'<rect x="{x:.1f}" y="{y}" width="{w:.1f}" height="{frame_height - 1}" '
+                   f'fill="hsl({hue},85%,60%)"/>'
+                   f'<text x="{x + 3:.1f}" y="{y + frame_height - 4}">{label if w > 21 else ""}</text></g>')
+    out.append('</svg>')
+    with open(path, 'w') as f:
+        f.write('\n'.join(out))
@@ -2,8 +2,31 @@
 from .dilithium import DilithiumWrapper
 from .falcon import FalconWrapper
 from .sphincs import SphincsWrapper
+from .generic import SignatureWrapper
+from .async_api import AsyncScheme, get_async_scheme
+from .base import load_liboqs, preinitialize, live_handles
+from .randomness import DeterministicDRBG, RandomnessRecorder, use_randomness, randomness
 
-# Create and export the instances directly
-dilithium = DilithiumWrapper()
-falcon = FalconWrapper()
-sphincs = SphincsWrapper()
\ No newline at end of file
+import threading
+
+# The submodule imports above bound `dilithium`, `falcon` and `sphincs` to the modules;
+# drop them so these names resolve to the wrapper singletons through __getattr__
+del dilithium, falcon, sphincs
+
+# Wrapper singletons, created on first access so that importing `schemes` does not
+# load liboqs (and load_liboqs(path) can still choose the library first)
+_singletons = {
+    'dilithium': DilithiumWrapper,
+    'falcon': FalconWrapper,
+    'sphincs': SphincsWrapper
+}
+_singletons_lock = threading.Lock()
+
+def __getattr__(name):
+    if name in _singletons:
+        with _singletons_lock:
+            # Another thread may have created it while this one waited
+            if name not in globals():
+                globals()[name] = _singletons[name]()
+            return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
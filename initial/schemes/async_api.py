@@ -0,0 +1,148 @@
+# schemes/async_api.py
+import asyncio
+import atexit
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class AsyncScheme:
+    """
+    Awaitable keygen/sign/verify for a scheme wrapper.
+
+    Native calls run on a dedicated thread pool (ctypes releases the GIL while liboqs
+    runs, so the event loop keeps serving other tasks). At most `max_pending` operations
+    may be queued or running at once; further callers wait for a slot, which gives
+    backpressure instead of an unbounded executor queue. A slot is only released once
+    the native call has actually finished, so cancelled requests that are already
+    running still count against the bound.
+
+    With `batch_window` > 0, verify requests arriving within that many seconds of each
+    other (up to `max_batch`) are coalesced into one executor job that verifies them
+    back to back, saving a thread hand-off per request.
+    """
+
+    def __init__(self, scheme, max_workers=None, max_pending=64, batch_window=0.0, max_batch=64):
+        self.scheme = scheme
+        self.max_pending = max_pending
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.executor = ThreadPoolExecutor(max_workers=max_workers or os.cpu_count(),
+                                           thread_name_prefix=f"pqc-{scheme.get_name()}")
+        self._loop = None
+        self._slots = None
+        self._batch = []
+        self._batch_timer = None
+
+    def _bind_loop(self):
+        # Semaphores belong to one event loop; rebind if a new loop is running
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._slots = asyncio.Semaphore(self.max_pending)
+            self._batch = []
+            self._batch_timer = None
+        return loop
+
+    def _release_when_done(self, future, slots=1):
+        loop = self._loop
+        semaphore = self._slots
+
+        def release(_):
+            for _ in range(slots):
+                loop.call_soon_threadsafe(semaphore.release)
+        future.add_done_callback(release)
+
+    async def _submit(self, func, *args):
+        self._bind_loop()
+        await self._slots.acquire()
+        try:
+            future = self.executor.submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        self._release_when_done(future)
+        # Cancelling the awaiting task cancels the executor job if it has not started
+        return await asyncio.wrap_future(future)
+
+    async def keygen(self):
+        return await self._submit(self.scheme.keygen)
+
+    async def sign(self, message, private_key):
+        return await self._submit(self.scheme.sign, message, private_key)
+
+    async def verify(self, message, signature, public_key):
+        if self.batch_window <= 0:
+            return await self._submit(self.scheme.verify, message, signature, public_key)
+
+        loop = self._bind_loop()
+        await self._slots.acquire()
+        result = loop.create_future()
+        self._batch.append((message, signature, public_key, result))
+        if len(self._batch) >= self.max_batch:
+            self._flush_batch()
+        elif self._batch_timer is None:
+            self._batch_timer = loop.call_later(self.batch_window, self._flush_batch)
+        return await result
+
+    def _flush_batch(self):
+        if self._batch_timer is not None:
+            self._batch_timer.cancel()
+            self._batch_timer = None
+        batch, self._batch = self._batch, []
+
+        # Requests cancelled while waiting for the window never reach the executor
+        live = []
+        for item in batch:
+            if item[3].cancelled():
+                self._slots.release()
+            else:
+                live.append(item)
+        if not live:
+            return
+
+        future = self.executor.submit(self._verify_batch, [item[:3] for item in live])
+        self._release_when_done(future, slots=len(live))
+        loop = self._loop
+
+        def deliver(done):
+            loop.call_soon_threadsafe(self._deliver_batch, done, [item[3] for item in live])
+        future.add_done_callback(deliver)
+
+    def _verify_batch(self, requests):
+        return [self.scheme.verify(message, signature, public_key)
+                for message, signature, public_key in requests]
+
+    @staticmethod
+    def _deliver_batch(done, futures):
+        if done.cancelled():
+            for future in futures:
+                future.cancel()
+            return
+        error = done.exception()
+        for i, future in enumerate(futures):
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(done.result()[i])
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+_async_schemes = {}
+_async_schemes_lock = threading.Lock()
+
+def get_async_scheme(scheme, **kwargs):
+    """Return the shared AsyncScheme (and its bounded executor) for this algorithm"""
+    name = scheme.get_name()
+    with _async_schemes_lock:
+        if name not in _async_schemes:
+            _async_schemes[name] = AsyncScheme(scheme, **kwargs)
+        return _async_schemes[name]
+
+@atexit.register
+def _shutdown_executors():
+    for async_scheme in _async_schemes.values():
+        async_scheme.executor.shutdown(wait=False, cancel_futures=True)
@@ -1,26 +1,175 @@
 import os
 import ctypes
+import ctypes.util
 from ctypes import c_int, c_uint8, c_size_t, POINTER, c_char_p, c_void_p
 import atexit
+import threading
 
 class OQS_STATUS(c_int):
     SUCCESS = 0
     ERROR = -1
 
 _lib = None
+_initialized = False
+# Serialises loading and OQS_init, so concurrent first users share one library handle
+_lib_lock = threading.RLock()
 
-def load_liboqs():
+# Number of OQS_SIG handles allocated and not yet freed, for leak detection
+_live_handles = 0
+_live_handles_lock = threading.Lock()
+
+# Legacy location of a local liboqs build, tried after LIBOQS_PATH
+DEFAULT_LIB_PATH = "~/liboqs/build/lib/liboqs.so"
+
+def find_liboqs(path=None):
+    """
+    Resolve the liboqs shared library, in order of preference:
+    an explicit `path`, the LIBOQS_PATH environment variable, the local build at
+    DEFAULT_LIB_PATH, then the system linker search via ctypes.util.find_library.
+    An explicit `path` or LIBOQS_PATH that does not exist is an error, not skipped.
+    """
+    for source, candidate in (('path', path), ('LIBOQS_PATH', os.environ.get('LIBOQS_PATH'))):
+        if candidate:
+            candidate = os.path.expanduser(candidate)
+            if not os.path.exists(candidate):
+                raise RuntimeError(f"liboqs library not found at {candidate} (from {source})")
+            return candidate
+    if os.path.exists(os.path.expanduser(DEFAULT_LIB_PATH)):
+        return os.path.expanduser(DEFAULT_LIB_PATH)
+    found = ctypes.util.find_library('oqs')
+    if found is None:
+        raise RuntimeError("liboqs library not found: set LIBOQS_PATH, build it at "
+                           f"{DEFAULT_LIB_PATH} or install it on the linker path")
+    return found
+
+def load_liboqs(path=None, init=True):
+    """
+    Load liboqs once (see find_liboqs for resolution) and run OQS_init unless `init` is
+    False. Asking for a `path` other than the library already loaded raises RuntimeError.
+    """
     global _lib
-    if (_lib is None):
-        lib_path = os.path.expanduser("~/liboqs/build/lib/liboqs.so")
-        if not os.path.exists(lib_path):
-            raise RuntimeError(f"liboqs library not found at {lib_path}")
-        _lib = ctypes.CDLL(lib_path)
-        if hasattr(_lib, 'OQS_init'):
-            _lib.OQS_init()
-            atexit.register(lambda: _lib.OQS_destroy())
+    with _lib_lock:
+        if _lib is None:
+            _lib = ctypes.CDLL(find_liboqs(path))
+        elif path is not None and os.path.realpath(os.path.expanduser(path)) != os.path.realpath(_lib._name):
+            raise RuntimeError(f"liboqs is already loaded from {_lib._name}; cannot switch to {path}")
+        if init:
+            initialize_liboqs()
     return _lib
 
+def initialize_liboqs():
+    """Run OQS_init on the loaded library (once) and register OQS_destroy at exit"""
+    global _initialized
+    with _lib_lock:
+        if _lib is None:
+            raise RuntimeError("liboqs is not loaded; call load_liboqs() first")
+        if not _initialized:
+            if hasattr(_lib, 'OQS_init'):
+                _lib.OQS_init()
+                atexit.register(lambda: _lib.OQS_destroy())
+            _initialized = True
+
+def preinitialize(names=(), path=None, warm=False):
+    """
+    Eagerly load liboqs, run OQS_init and create handles for `names`, so the first real
+    request does not pay for it. With `warm`, also run one keygen/sign/verify per
+    algorithm to fault in its code pages. Returns the created OQSSignature handles.
+    """
+    load_liboqs(path)
+    handles = {}
+    for name in names:
+        handles[name] = OQSSignature(name)
+        if warm:
+            public_key, secret_key = handles[name].keypair()
+            handles[name].verify(b'', handles[name].sign(b'', secret_key), public_key)
+    return handles
+
+def as_uint8_array(data):
+    """
+    Return a c_uint8 array for `data` (bytes, bytearray, memoryview, mmap slice, ...).
+    Writable contiguous buffers are shared without copying; read-only ones are copied once.
+    """
+    if isinstance(data, str):
+        data = data.encode()
+    view = memoryview(data).cast('B')
+    array_type = c_uint8 * view.nbytes
+    if not view.readonly:
+        return array_type.from_buffer(view)
+    return array_type.from_buffer_copy(view)
+
+def is_enabled(name):
+    """Return True if the loaded liboqs build provides the signature algorithm `name`"""
+    lib = load_liboqs()
+    lib.OQS_SIG_alg_is_enabled.argtypes = [c_char_p]
+    lib.OQS_SIG_alg_is_enabled.restype = c_int
+    return lib.OQS_SIG_alg_is_enabled(name.encode()) == 1
+
+# void (*)(uint8_t *random_array, size_t bytes_to_read)
+RANDOMBYTES_CALLBACK = ctypes.CFUNCTYPE(None, POINTER(c_uint8), c_size_t)
+_randombytes_callback = None  # Keeps the active custom callback alive while liboqs holds it
+# Error raised by a custom randomness source inside the callback, per calling thread.
+# ctypes cannot propagate it through liboqs, so it is re-raised once the OQS call returns.
+_randombytes_error = threading.local()
+
+def _raise_randombytes_error():
+    error = getattr(_randombytes_error, 'error', None)
+    if error is not None:
+        _randombytes_error.error = None
+        raise RuntimeError("Custom randomness source failed; the liboqs result was discarded") from error
+
+def set_randombytes_algorithm(algorithm):
+    """Switch liboqs to a built-in randomness backend ("system" or "OpenSSL")"""
+    global _randombytes_callback
+    lib = load_liboqs()
+    lib.OQS_randombytes_switch_algorithm.argtypes = [c_char_p]
+    lib.OQS_randombytes_switch_algorithm.restype = c_int
+    if lib.OQS_randombytes_switch_algorithm(algorithm.encode()) != OQS_STATUS.SUCCESS:
+        raise RuntimeError(f"liboqs randomness backend {algorithm!r} is not available")
+    _randombytes_callback = None
+
+def set_randombytes_callback(source):
+    """Route liboqs randomness through `source(n) -> bytes`, e.g. a seeded DRBG"""
+    global _randombytes_callback
+    lib = load_liboqs()
+
+    @RANDOMBYTES_CALLBACK
+    def callback(random_array, bytes_to_read):
+        try:
+            data = source(bytes_to_read)
+            if not isinstance(data, (bytes, bytearray)):
+                raise TypeError(f"Randomness source returned {type(data).__name__}, expected bytes")
+            if len(data) != bytes_to_read:
+                raise ValueError(f"Randomness source returned {len(data)} bytes, expected {bytes_to_read}")
+            ctypes.memmove(random_array, bytes(data), bytes_to_read)
+        except BaseException as e:
+            # Never leave the buffer as it was: zero it, and fail the OQS call afterwards
+            ctypes.memset(random_array, 0, bytes_to_read)
+            if getattr(_randombytes_error, 'error', None) is None:
+                _randombytes_error.error = e
+
+    lib.OQS_randombytes_custom_algorithm.argtypes = [RANDOMBYTES_CALLBACK]
+    lib.OQS_randombytes_custom_algorithm.restype = None
+    lib.OQS_randombytes_custom_algorithm(callback)
+    _randombytes_callback = callback
+
+def randombytes(length, out=None):
+    """
+    Read `length` bytes from the active liboqs randomness backend.
+    Fills `out` (a c_uint8 array of at least `length` bytes) if given, else returns new bytes.
+    """
+    lib = load_liboqs()
+    if lib.OQS_randombytes.argtypes is None:
+        lib.OQS_randombytes.argtypes = [POINTER(c_uint8), c_size_t]
+        lib.OQS_randombytes.restype = None
+    buffer = out if out is not None else (c_uint8 * length)()
+    lib.OQS_randombytes(buffer, length)
+    _raise_randombytes_error()
+    return None if out is not None else bytes(buffer)
+
+def live_handles():
+    """Number of OQSSignature handles currently allocated in liboqs"""
+    return _live_handles
+
 class OQSSignature:
     def __init__(self, name):
         self.lib = load_liboqs()
@@ -29,6 +178,11 @@ class OQSSignature:
         self.sig = self.lib.OQS_SIG_new(name.encode())
         if not self.sig:
             raise RuntimeError(f"Failed to initialize {name}")
+        global _live_handles
+        with _live_handles_lock:
+            _live_handles += 1
+        self.lib.OQS_SIG_free.argtypes = [c_void_p]
+        self.lib.OQS_SIG_free.restype = None
 
         self.lib.OQS_SIG_keypair.argtypes = [c_void_p, POINTER(c_uint8), POINTER(c_uint8)]
         self.lib.OQS_SIG_keypair.restype = c_int
@@ -50,6 +204,10 @@ class OQSSignature:
                 ("length_signature", c_size_t)
             ]
         sig_struct = ctypes.cast(self.sig, POINTER(SIG_STRUCT)).contents
+        self.method_name = sig_struct.method_name.decode()
+        self.alg_version = sig_struct.alg_version.decode() if sig_struct.alg_version else None
+        self.claimed_nist_level = sig_struct.claimed_nist_level
+        self.euf_cma = bool(sig_struct.euf_cma)
         self.length_public_key = sig_struct.length_public_key
         self.length_secret_key = sig_struct.length_secret_key
         self.length_signature = sig_struct.length_signature
@@ -58,33 +216,43 @@ class OQSSignature:
         public_key = (c_uint8 * self.length_public_key)()
         secret_key = (c_uint8 * self.length_secret_key)()
         ret = self.lib.OQS_SIG_keypair(self.sig, public_key, secret_key)
+        _raise_randombytes_error()
         if ret != 0:
             raise RuntimeError("Key generation failed")
         return bytes(public_key), bytes(secret_key)
 
     def sign(self, message, secret_key):
-        if isinstance(message, str):
-            message = message.encode()
+        # liboqs takes no key length and reads length_secret_key bytes regardless
+        secret_array = as_uint8_array(secret_key)
+        if len(secret_array) != self.length_secret_key:
+            raise ValueError(f"{self.method_name} secret key is {len(secret_array)} bytes, "
+                             f"expected {self.length_secret_key}")
         signature = (c_uint8 * self.length_signature)()
         sig_len = c_size_t(self.length_signature)
-        msg_array = (c_uint8 * len(message))(*message)
-        secret_array = (c_uint8 * len(secret_key))(*secret_key)
+        msg_array = as_uint8_array(message)
         ret = self.lib.OQS_SIG_sign(self.sig, signature, ctypes.byref(sig_len),
-                                    msg_array, len(message), secret_array)
+                                    msg_array, len(msg_array), secret_array)
+        _raise_randombytes_error()
         if ret != 0:
             raise RuntimeError("Signing failed")
         return bytes(signature[:sig_len.value])
 
     def verify(self, message, signature, public_key):
-        if isinstance(message, str):
-            message = message.encode()
-        msg_array = (c_uint8 * len(message))(*message)
-        sig_array = (c_uint8 * len(signature))(*signature)
-        pub_array = (c_uint8 * len(public_key))(*public_key)
-        ret = self.lib.OQS_SIG_verify(self.sig, msg_array, len(message),
-                                      sig_array, len(signature), pub_array)
+        # liboqs takes no key length and reads length_public_key bytes regardless
+        pub_array = as_uint8_array(public_key)
+        if len(pub_array) != self.length_public_key:
+            raise ValueError(f"{self.method_name} public key is {len(pub_array)} bytes, "
+                             f"expected {self.length_public_key}")
+        msg_array = as_uint8_array(message)
+        sig_array = as_uint8_array(signature)
+        ret = self.lib.OQS_SIG_verify(self.sig, msg_array, len(msg_array),
+                                      sig_array, len(sig_array), pub_array)
         return ret == 0
 
     def __del__(self):
-        if hasattr(self, 'sig') and self.sig:
-            self.lib.OQS_SIG_free(self.sig)
\ No newline at end of file
+        global _live_handles
+        if getattr(self, 'sig', None):
+            self.lib.OQS_SIG_free(self.sig)
+            self.sig = None
+            with _live_handles_lock:
+                _live_handles -= 1
\ No newline at end of file
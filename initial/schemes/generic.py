@@ -0,0 +1,38 @@
+# schemes/generic.py
+from .base import OQSSignature
+from .async_api import get_async_scheme
+
+class SignatureWrapper:
+    """Wrapper for any liboqs signature algorithm, with parameters read from its OQS_SIG struct"""
+    def __init__(self, name):
+        self.name = name
+        self.sig = OQSSignature(name)
+        
+    def keygen(self):
+        return self.sig.keypair()
+        
+    def sign(self, message, private_key):
+        return self.sig.sign(message, private_key)
+        
+    def verify(self, message, signature, public_key):
+        return self.sig.verify(message, signature, public_key)
+        
+    @property
+    def aio(self):
+        """Awaitable keygen/sign/verify running on this algorithm's bounded executor"""
+        return get_async_scheme(self)
+        
+    def get_name(self):
+        return self.name
+        
+    def get_params(self):
+        return {
+            "version": self.sig.method_name,
+            "alg_version": self.sig.alg_version,
+            "security_level": f"NIST Level {self.sig.claimed_nist_level}",
+            "claimed_nist_level": self.sig.claimed_nist_level,
+            "euf_cma": self.sig.euf_cma,
+            "public_key_size": self.sig.length_public_key,
+            "private_key_size": self.sig.length_secret_key,
+            "signature_size": self.sig.length_signature
+        }
@@ -0,0 +1,59 @@
+# schemes/randomness.py
+import hashlib
+import os
+from contextlib import contextmanager
+
+from .base import set_randombytes_algorithm, set_randombytes_callback
+
+class DeterministicDRBG:
+    """
+    Seeded SHAKE-256 byte stream for reproducible keygen/sign runs.
+
+    Output depends only on the seed and the sequence of requests, so a run replays
+    exactly as long as operations are issued in the same order (i.e. single-threaded).
+    NOT for production keys.
+    """
+
+    def __init__(self, seed):
+        if isinstance(seed, int):
+            seed = seed.to_bytes(32, 'big')
+        self.seed = bytes(seed)
+        self.counter = 0
+
+    def __call__(self, length):
+        block = hashlib.shake_256(self.seed + self.counter.to_bytes(8, 'big')).digest(length)
+        self.counter += 1
+        return block
+
+class RandomnessRecorder:
+    """Wraps a randomness source and records the size of every request liboqs makes"""
+
+    def __init__(self, source=os.urandom):
+        self.source = source
+        self.requests = []
+
+    def __call__(self, length):
+        self.requests.append(length)
+        return self.source(length)
+
+def use_randomness(backend='system', seed=0):
+    """
+    Select the liboqs randomness backend:
+    "system" / "OpenSSL" (built into liboqs), "deterministic" (DeterministicDRBG(seed)),
+    or any callable source(n) -> bytes.
+    """
+    if callable(backend):
+        set_randombytes_callback(backend)
+    elif backend == 'deterministic':
+        set_randombytes_callback(DeterministicDRBG(seed))
+    else:
+        set_randombytes_algorithm(backend)
+
+@contextmanager
+def randomness(backend='system', seed=0):
+    """Use a randomness backend for the duration of a block, then restore system randomness"""
+    use_randomness(backend, seed)
+    try:
+        yield
+    finally:
+        set_randombytes_algorithm('system')
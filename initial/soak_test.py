@@ -0,0 +1,263 @@
+# soak_test.py
+import argparse
+import gc
+import json
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, Any, List
+
+import psutil
+
+from schemes.base import OQSSignature, live_handles
+from bulk_verify import resolve_scheme
+
+OPERATIONS = ('keygen', 'sign', 'verify')
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(int(q * (len(sorted_values) - 1)), len(sorted_values) - 1)]
+
+class SoakTest:
+    """
+    Hammers keygen/sign/verify from several threads for a fixed duration.
+
+    Every signature is cross-checked: it must verify, and a copy with one bit flipped
+    in the message or in the signature must not. Worker threads also periodically
+    create and drop a fresh OQSSignature so that handle cleanup in __del__ is exercised.
+    A sampler records RSS, open file descriptors, live liboqs handles and rolling
+    latency percentiles (over the last `window` calls per scheme and operation).
+
+    After `warmup` seconds the first sample becomes the baseline; the run fails if, at
+    the end, RSS grew by more than `max_rss_growth_mb`, live handles or open files grew
+    by more than `max_handle_growth`, any rolling p50 (p99) latency exceeds
+    `max_latency_drift` (`max_p99_drift`) times its baseline, or any cross-check failed.
+    Latency drift is only checked where the baseline window holds `min_samples` calls.
+    """
+
+    def __init__(self, schemes, duration: float = 300.0, threads: int = None, window: int = 1000,
+                 sample_interval: float = 5.0, warmup: float = 10.0, keygen_every: int = 10,
+                 handle_churn_every: int = 100, message_size: int = 256,
+                 max_rss_growth_mb: float = 64.0, max_latency_drift: float = 1.5,
+                 max_p99_drift: float = 3.0, max_handle_growth: int = 8, min_samples: int = 50):
+        self.schemes = schemes
+        self.duration = duration
+        self.threads = threads or os.cpu_count()
+        self.sample_interval = sample_interval
+        self.warmup = warmup
+        self.keygen_every = keygen_every
+        self.handle_churn_every = handle_churn_every
+        self.message_size = message_size
+        self.max_rss_growth_mb = max_rss_growth_mb
+        self.max_latency_drift = max_latency_drift
+        self.max_p99_drift = max_p99_drift
+        self.max_handle_growth = max_handle_growth
+        self.min_samples = min_samples
+
+        self.latencies = {(scheme.get_name(), op): deque(maxlen=window)
+                          for scheme in schemes for op in OPERATIONS}
+        self.counts = {key: 0 for key in self.latencies}
+        self.lock = threading.Lock()
+        self.stop = threading.Event()
+        self.failures = []
+        self.process = psutil.Process()
+
+    def _record(self, key, elapsed: float):
+        with self.lock:
+            self.latencies[key].append(elapsed)
+            self.counts[key] += 1
+
+    def _fail(self, message: str):
+        with self.lock:
+            if len(self.failures) < 100:
+                self.failures.append(message)
+        print(f"✗ {message}")
+
+    def _worker(self, index: int):
+        iteration = 0
+        keys = {}
+        while not self.stop.is_set():
+            scheme = self.schemes[(index + iteration) % len(self.schemes)]
+            name = scheme.get_name()
+            try:
+                if name not in keys or iteration % self.keygen_every == 0:
+                    start = time.perf_counter()
+                    keys[name] = scheme.keygen()
+                    self._record((name, 'keygen'), time.perf_counter() - start)
+                public_key, private_key = keys[name]
+
+                message = os.urandom(self.message_size)
+                start = time.perf_counter()
+                signature = scheme.sign(message, private_key)
+                self._record((name, 'sign'), time.perf_counter() - start)
+
+                start = time.perf_counter()
+                valid = scheme.verify(message, signature, public_key)
+                self._record((name, 'verify'), time.perf_counter() - start)
+                if not valid:
+                    self._fail(f"{name}: valid signature rejected")
+
+                bit = iteration % (8 * len(message))
+                tampered_message = bytearray(message)
+                tampered_message[bit // 8] ^= 1 << (bit % 8)
+                if scheme.verify(bytes(tampered_message), signature, public_key):
+                    self._fail(f"{name}: tampered message accepted")
+                tampered_signature = bytearray(signature)
+                tampered_signature[len(signature) // 2] ^= 1 << (iteration % 8)
+                if scheme.verify(message, bytes(tampered_signature), public_key):
+                    self._fail(f"{name}: tampered signature accepted")
+
+                if self.handle_churn_every and iteration % self.handle_churn_every == 0:
+                    # Allocate and drop a handle; __del__ must free it
+                    OQSSignature(name)
+            except Exception as e:
+                self._fail(f"{name}: {type(e).__name__}: {e}")
+            iteration += 1
+
+    def sample(self, elapsed: float) -> Dict[str, Any]:
+        with self.lock:
+            snapshots = {key: sorted(values) for key, values in self.latencies.items()}
+            counts = dict(self.counts)
+        gc.collect()
+        sample = {
+            'elapsed_s': elapsed,
+            'rss_mb': self.process.memory_info().rss / 1024 / 1024,
+            'open_files': self.process.num_fds() if hasattr(self.process, 'num_fds')
+            else self.process.num_handles(),
+            'live_handles': live_handles(),
+            'latency': {}
+        }
+        for (name, op), values in snapshots.items():
+            sample['latency'][f"{name}/{op}"] = {
+                'calls': counts[(name, op)],
+                'window': len(values),
+                'p50_ms': percentile(values, 0.50) * 1000,
+                'p99_ms': percentile(values, 0.99) * 1000
+            }
+        total_calls = sum(counts.values())
+        print(f"  [{elapsed:7.1f}s] rss {sample['rss_mb']:7.1f} MB   fds {sample['open_files']:4d}   "
+              f"handles {sample['live_handles']:3d}   calls {total_calls}")
+        return sample
+
+    def _check(self, checks, name: str, value, threshold, passed: bool):
+        checks.append({'check': name, 'value': value, 'threshold': threshold, 'passed': passed})
+        print(f"{'✓' if passed else '✗'} {name}: {value} (threshold {threshold})")
+
+    def evaluate(self, baseline: Dict[str, Any], final: Dict[str, Any]) -> List[Dict[str, Any]]:
+        checks = []
+        rss_growth = final['rss_mb'] - baseline['rss_mb']
+        self._check(checks, 'rss_growth_mb', round(rss_growth, 2), self.max_rss_growth_mb,
+                    rss_growth <= self.max_rss_growth_mb)
+        for key in ('live_handles', 'open_files'):
+            growth = final[key] - baseline[key]
+            self._check(checks, f'{key}_growth', growth, self.max_handle_growth,
+                        growth <= self.max_handle_growth)
+        for key, latency in final['latency'].items():
+            base = baseline['latency'][key]
+            if base['window'] < self.min_samples or latency['window'] < self.min_samples:
+                print(f"- {key}: fewer than {self.min_samples} calls per window, drift not checked")
+                continue
+            for stat, threshold in (('p50', self.max_latency_drift), ('p99', self.max_p99_drift)):
+                drift = latency[f'{stat}_ms'] / base[f'{stat}_ms']
+                self._check(checks, f'{key}_{stat}_drift', round(drift, 3), threshold, drift <= threshold)
+        self._check(checks, 'cross_check_failures', len(self.failures), 0, not self.failures)
+        return checks
+
+    def run(self, output_path='results/soak_report.json') -> bool:
+        names = ', '.join(scheme.get_name() for scheme in self.schemes)
+        print(f"Soak test: {names} on {self.threads} threads for {self.duration:.0f}s "
+              f"(warmup {self.warmup:.0f}s)")
+        workers = [threading.Thread(target=self._worker, args=(i,), name=f"soak-{i}")
+                   for i in range(self.threads)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+
+        timeline = []
+        baseline = None
+        try:
+            while True:
+                elapsed = time.perf_counter() - start
+                if elapsed >= self.duration:
+                    break
+                self.stop.wait(min(self.sample_interval, self.duration - elapsed))
+                sample = self.sample(time.perf_counter() - start)
+                timeline.append(sample)
+                if baseline is None and sample['elapsed_s'] >= self.warmup:
+                    baseline = sample
+        except KeyboardInterrupt:
+            print("Interrupted, stopping workers...")
+        finally:
+            self.stop.set()
+            for worker in workers:
+                worker.join()
+
+        final = self.sample(time.perf_counter() - start)
+        timeline.append(final)
+        if baseline is None:
+            print("Warning: run ended before the warmup; using the first sample as baseline")
+            baseline = timeline[0]
+        checks = self.evaluate(baseline, final)
+        passed = all(check['passed'] for check in checks)
+
+        report = {
+            'passed': passed,
+            'config': {
+                'schemes': [scheme.get_name() for scheme in self.schemes],
+                'duration_s': self.duration,
+                'threads': self.threads,
+                'warmup_s': self.warmup,
+                'max_rss_growth_mb': self.max_rss_growth_mb,
+                'max_latency_drift': self.max_latency_drift,
+                'max_p99_drift': self.max_p99_drift,
+                'max_handle_growth': self.max_handle_growth
+            },
+            'checks': checks,
+            'failures': self.failures,
+            'baseline': baseline,
+            'final': final,
+            'timeline': timeline
+        }
+        Path(output_path).parent.mkdir(exist_ok=True)
+        with open(output_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSoak test {'passed' if passed else 'FAILED'}; report saved to {output_path}")
+        return passed
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak test for leaks and latency drift in the liboqs wrapper")
+    parser.add_argument('--schemes', nargs='+', default=['dilithium', 'falcon', 'sphincs'],
+                        help="dilithium/falcon/sphincs or liboqs algorithm names")
+    parser.add_argument('--duration', type=float, default=300.0, help="Seconds to run")
+    parser.add_argument('--threads', type=int, default=None)
+    parser.add_argument('--window', type=int, default=1000, help="Calls per rolling latency window")
+    parser.add_argument('--sample-interval', type=float, default=5.0)
+    parser.add_argument('--warmup', type=float, default=10.0, help="Seconds before the baseline sample")
+    parser.add_argument('--keygen-every', type=int, default=10, help="Sign/verify rounds per fresh keypair")
+    parser.add_argument('--handle-churn-every', type=int, default=100,
+                        help="Rounds between creating and dropping a fresh OQSSignature (0 to disable)")
+    parser.add_argument('--message-size', type=int, default=256)
+    parser.add_argument('--max-rss-growth-mb', type=float, default=64.0)
+    parser.add_argument('--max-latency-drift', type=float, default=1.5,
+                        help="Allowed ratio of final to baseline rolling p50 latency")
+    parser.add_argument('--max-p99-drift', type=float, default=3.0,
+                        help="Allowed ratio of final to baseline rolling p99 latency")
+    parser.add_argument('--max-handle-growth', type=int, default=8,
+                        help="Allowed growth in live liboqs handles and open files")
+    parser.add_argument('--min-samples', type=int, default=50,
+                        help="Calls needed in a latency window before its drift is checked")
+    parser.add_argument('--output', default='results/soak_report.json')
+    args = parser.parse_args()
+
+    soak = SoakTest([resolve_scheme(name) for name in args.schemes], args.duration, args.threads,
+                    args.window, args.sample_interval, args.warmup, args.keygen_every,
+                    args.handle_churn_every, args.message_size, args.max_rss_growth_mb,
+                    args.max_latency_drift, args.max_p99_drift, args.max_handle_growth,
+                    args.min_samples)
+    return 0 if soak.run(args.output) else 1
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,222 @@
+# sweep.py
+import argparse
+import json
+import os
+import statistics
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+import pandas as pd
+
+from schemes import SignatureWrapper
+from schemes.base import is_enabled
+
+# Every ML-DSA, Falcon and SPHINCS+ parameter set across NIST levels 1/2, 3 and 5
+SWEEP_ALGORITHMS = [
+    "ML-DSA-44", "ML-DSA-65", "ML-DSA-87",
+    "Falcon-512", "Falcon-1024", "Falcon-padded-512", "Falcon-padded-1024",
+] + [
+    f"SPHINCS+-{hash_fn}-{bits}{variant}-simple"
+    for hash_fn in ("SHA2", "SHAKE")
+    for bits in (128, 192, 256)
+    for variant in ("f", "s")
+]
+
+class ParameterSweep:
+    """
+    Benchmark keygen/sign/verify for every parameter set within a fixed wall-clock limit.
+
+    A quick probe times one keygen/sign/verify round per algorithm, stopping if the limit
+    is reached. The remaining time budget is split evenly between algorithms and converted
+    into an iteration count from the probed cost, so slow SPHINCS+ `s` variants get
+    proportionately fewer iterations. Time left unused by algorithms capped at
+    `max_iterations` is redistributed to the rest.
+
+    Each algorithm runs against its own deadline (its share of the budget, starting when it
+    starts, and never past the overall limit), so one that overruns cannot starve the
+    algorithms after it. An algorithm whose share fits fewer than `min_iterations` rounds
+    is cut off at its deadline rather than given more time. Every row carries a status:
+    "ok", "truncated" (stopped at its deadline), or "skipped" (not enabled in this liboqs
+    build, not probed before the limit, or no round fitted its share).
+    """
+
+    def __init__(self, algorithms: List[str] = None, time_limit: float = 600.0,
+                 message_size: int = 1024, min_iterations: int = 3, max_iterations: int = 1000):
+        self.algorithms = algorithms or SWEEP_ALGORITHMS
+        self.time_limit = time_limit
+        self.message = os.urandom(message_size)
+        self.min_iterations = min_iterations
+        self.max_iterations = max_iterations
+        self.results_dir = Path('results')
+        self.results_dir.mkdir(exist_ok=True)
+
+    def probe(self, scheme) -> float:
+        """Return the cost in seconds of one keygen + sign + verify round"""
+        start = time.perf_counter()
+        pub_key, priv_key = scheme.keygen()
+        signature = scheme.sign(self.message, priv_key)
+        scheme.verify(self.message, signature, pub_key)
+        return time.perf_counter() - start
+
+    def plan(self, costs: Dict[str, float], budget: float) -> Dict[str, Tuple[int, float]]:
+        """
+        Give each algorithm an equal share of the time budget. Returns (iterations, share in
+        seconds) per algorithm; iterations never drop below min_iterations, but the share is
+        not enlarged to fit them.
+        """
+        plan = {}
+        remaining = dict(costs)
+        budget = max(budget, 0.0)
+        while remaining:
+            share = budget / len(remaining)
+            capped = {name: cost for name, cost in remaining.items()
+                      if share / cost >= self.max_iterations}
+            if not capped:
+                for name, cost in remaining.items():
+                    plan[name] = (max(self.min_iterations, int(share / cost)), share)
+                break
+            for name, cost in capped.items():
+                plan[name] = (self.max_iterations, self.max_iterations * cost)
+                budget -= self.max_iterations * cost
+                del remaining[name]
+        return plan
+
+    def measure(self, scheme, iterations: int, deadline: float, cost: float) -> Dict[str, Any]:
+        """
+        Time up to `iterations` rounds, stopping early if the next one would miss the deadline.
+        The probed `cost` is replaced by the measured round time once rounds complete.
+        """
+        times = {'keygen': [], 'sign': [], 'verify': []}
+        for _ in range(iterations):
+            if times['keygen']:
+                last_round = times['keygen'][-1] + times['sign'][-1] + times['verify'][-1]
+                cost = (cost + last_round) / 2
+            if time.perf_counter() + cost > deadline:
+                break
+            start = time.perf_counter()
+            pub_key, priv_key = scheme.keygen()
+            keygen_done = time.perf_counter()
+            signature = scheme.sign(self.message, priv_key)
+            sign_done = time.perf_counter()
+            scheme.verify(self.message, signature, pub_key)
+            verify_done = time.perf_counter()
+            times['keygen'].append(keygen_done - start)
+            times['sign'].append(sign_done - keygen_done)
+            times['verify'].append(verify_done - sign_done)
+
+        completed = len(times['keygen'])
+        timing = {}
+        for op, samples in times.items():
+            if samples:
+                timing[op] = {
+                    'mean_ms': statistics.mean(samples) * 1000,
+                    'median_ms': statistics.median(samples) * 1000,
+                    'std_ms': statistics.stdev(samples) * 1000 if len(samples) > 1 else 0.0,
+                    'min_ms': min(samples) * 1000,
+                    'max_ms': max(samples) * 1000
+                }
+        return {
+            'status': 'ok' if completed == iterations else 'truncated' if completed else 'skipped',
+            'iterations_planned': iterations,
+            'iterations_completed': completed,
+            'truncated': completed < iterations,
+            'timing': timing
+        }
+
+    def run(self) -> Dict[str, Any]:
+        start = time.perf_counter()
+        deadline = start + self.time_limit
+
+        schemes = {}
+        all_results = {}
+        for name in self.algorithms:
+            if not is_enabled(name):
+                print(f"Skipping {name}: not enabled in this liboqs build")
+                all_results[name] = {'scheme': name, 'status': 'skipped', 'reason': 'not enabled',
+                                     'iterations_planned': 0, 'iterations_completed': 0, 'timing': {}}
+                continue
+            schemes[name] = SignatureWrapper(name)
+
+        print(f"Probing {len(schemes)} algorithms...")
+        costs = {}
+        for name, scheme in schemes.items():
+            if time.perf_counter() >= deadline:
+                print(f"Skipping {name}: time limit reached before its probe")
+                all_results[name] = {'scheme': name, 'status': 'skipped', 'reason': 'time limit reached before probe',
+                                     'iterations_planned': 0, 'iterations_completed': 0, 'timing': {}}
+                continue
+            costs[name] = self.probe(scheme)
+            print(f"  {name}: {costs[name] * 1000:.2f} ms per keygen/sign/verify round")
+
+        # Keep 10% of the remaining time as slack for bookkeeping and timer jitter
+        budget = (deadline - time.perf_counter()) * 0.9
+        plan = self.plan(costs, budget)
+
+        for name in costs:
+            scheme = schemes[name]
+            iterations, share = plan[name]
+            print(f"\nBenchmarking {name} ({iterations} iterations, {share:.1f}s share)...")
+            # The 10% slack kept out of the budget absorbs per-round jitter within each share
+            algorithm_deadline = min(time.perf_counter() + share * 1.1, deadline)
+            result = self.measure(scheme, iterations, algorithm_deadline, costs[name])
+            if result['status'] != 'ok':
+                print(f"Warning: {name} {result['status']} after {result['iterations_completed']} "
+                      f"iterations to stay within its {share:.1f}s share")
+                if not result['iterations_completed']:
+                    result['reason'] = 'no round fitted its share'
+            all_results[name] = {
+                'scheme': name,
+                'parameters': scheme.get_params(),
+                'probe_cost_ms': costs[name] * 1000,
+                'message_size': len(self.message),
+                **result
+            }
+
+        all_results = {name: all_results[name] for name in self.algorithms}
+        print(f"\nSweep finished in {time.perf_counter() - start:.1f}s (limit {self.time_limit:g}s)")
+        self._save(all_results)
+        return all_results
+
+    def _save(self, results: Dict[str, Any]):
+        with open(self.results_dir / 'parameter_sweep.json', 'w') as f:
+            json.dump(results, f, indent=2)
+
+        rows = []
+        for name, data in results.items():
+            params = data.get('parameters', {})
+            row = {
+                'Scheme': name,
+                'Status': data['status'],
+                'NIST Level': params.get('claimed_nist_level'),
+                'Public Key Size (bytes)': params.get('public_key_size'),
+                'Private Key Size (bytes)': params.get('private_key_size'),
+                'Signature Size (bytes)': params.get('signature_size'),
+                'Iterations': data['iterations_completed']
+            }
+            for op in ('keygen', 'sign', 'verify'):
+                row[f'{op.capitalize()} Time (ms)'] = data['timing'].get(op, {}).get('mean_ms')
+            rows.append(row)
+
+        df = pd.DataFrame(rows)
+        df.to_csv(self.results_dir / 'parameter_sweep.csv', index=False)
+        print("\nSummary of results:")
+        print(df.to_string())
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep all ML-DSA, Falcon and SPHINCS+ parameter sets")
+    parser.add_argument('--time-limit', type=float, default=600.0,
+                        help="Wall-clock limit for the whole sweep in seconds (default: 600)")
+    parser.add_argument('--message-size', type=int, default=1024,
+                        help="Message size in bytes (default: 1024)")
+    parser.add_argument('--algorithms', nargs='+', default=None,
+                        help="Subset of liboqs algorithm names to sweep")
+    args = parser.parse_args()
+
+    sweep = ParameterSweep(algorithms=args.algorithms, time_limit=args.time_limit,
+                           message_size=args.message_size)
+    sweep.run()
+    print("\nResults saved to results/parameter_sweep.json and results/parameter_sweep.csv")
+
+if __name__ == "__main__":
+    main()
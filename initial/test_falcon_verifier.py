@@ -0,0 +1,88 @@
+# test_falcon_verifier.py
+import json
+import os
+
+from schemes import falcon
+import falcon_onchain
+
+def print_separator():
+    print("\n" + "="*50 + "\n")
+
+def check(description, condition):
+    print(f"{'✓' if condition else '✗'} {description}")
+    return condition
+
+def test_reference(public_key, message, signature):
+    """The Python mirror of the contract must agree with liboqs"""
+    print("Python reference verifier:")
+    tampered_signature = bytearray(signature)
+    tampered_signature[60] ^= 1
+    h_ntt = falcon_onchain.decode_14bit(falcon_onchain.public_key_to_ntt(public_key))
+    return all([
+        check("liboqs accepts the signature", falcon.verify(message, signature, public_key)),
+        check("Reference accepts the signature", falcon_onchain.verify(message, signature, public_key)),
+        check("Reference accepts it with the NTT-domain key",
+              falcon_onchain.verify_ntt(message, signature, h_ntt)),
+        check("Reference rejects a tampered message",
+              not falcon_onchain.verify(message + b"!", signature, public_key)),
+        check("Reference rejects a tampered signature",
+              not falcon_onchain.verify(message, bytes(tampered_signature), public_key))
+    ])
+
+def test_contract(public_key, message, signature):
+    """Run the same checks against the deployed Falcon512Verifier, if a local chain is up"""
+    try:
+        from web3 import Web3
+        w3 = Web3(Web3.HTTPProvider('http://127.0.0.1:8545'))
+        with open('build/contracts/Falcon512Verifier.json') as f:
+            contract_json = json.load(f)
+        contract = w3.eth.contract(address=contract_json['networks']['1337']['address'],
+                                   abi=contract_json['abi'])
+        w3.eth.block_number
+    except Exception as e:
+        print(f"Skipping on-chain checks (no deployed Falcon512Verifier: {e})")
+        return True
+
+    print("On-chain verifier:")
+    account = w3.eth.accounts[0]
+    h_ntt = falcon_onchain.public_key_to_ntt(public_key)
+    tx_hash = contract.functions.registerKey(h_ntt).transact({'from': account, 'gas': 2_000_000})
+    receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+    key_id = contract.events.KeyRegistered().process_receipt(receipt)[0]['args']['keyId']
+    tampered_signature = bytearray(signature)
+    tampered_signature[60] ^= 1
+    call = {'from': account, 'gas': 50_000_000}
+    return all([
+        check("Contract accepts the signature",
+              contract.functions.verify(message, signature, public_key).call(call)),
+        check("Contract accepts it with the NTT-domain key",
+              contract.functions.verifyWithNTTKey(message, signature, h_ntt).call(call)),
+        check("Contract accepts it with the stored key",
+              contract.functions.verifyWithStoredKey(message, signature, key_id).call(call)),
+        check("Contract rejects a tampered message",
+              not contract.functions.verify(message + b"!", signature, public_key).call(call)),
+        check("Contract rejects a tampered signature",
+              not contract.functions.verify(message, bytes(tampered_signature), public_key).call(call))
+    ])
+
+def main():
+    print_separator()
+    print("Falcon-512 On-Chain Verifier Testing")
+    print_separator()
+
+    public_key, private_key = falcon.keygen()
+    results = []
+    for size in (0, 32, 200, 1024):
+        message = os.urandom(size)
+        signature = falcon.sign(message, private_key)
+        print(f"Message size {size} bytes, signature {len(signature)} bytes\n")
+        results.append(test_reference(public_key, message, signature))
+        results.append(test_contract(public_key, message, signature))
+        print_separator()
+
+    passed = sum(results)
+    print(f"Passed {passed} out of {len(results)} check groups")
+    return 0 if passed == len(results) else 1
+
+if __name__ == "__main__":
+    exit(main())
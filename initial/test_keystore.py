@@ -0,0 +1,75 @@
+# test_keystore.py
+import os
+import tempfile
+
+import keystore
+from keystore import MmapKeystore
+
+RECORD_SIZE = 32
+
+def print_separator():
+    print("\n" + "="*50 + "\n")
+
+def check(description, condition):
+    print(f"{'✓' if condition else '✗'} {description}")
+    return condition
+
+def test_duplicate_after_merge(directory):
+    """An ID repeated in a batch after the pending inserts were merged must be found, not re-added"""
+    print("Duplicate ID after a pending merge:")
+    keys = [(f"k{i}", os.urandom(RECORD_SIZE)) for i in range(20)]
+    replacement = os.urandom(RECORD_SIZE)
+    with MmapKeystore(directory, 'TEST', record_size=RECORD_SIZE) as store:
+        written = store.import_keys(keys + [("k1", replacement)])
+        results = [
+            check("All 21 records written", written == 21),
+            check("The duplicate did not add a slot", len(store) == 20),
+            check("The duplicate overwrote the first record", bytes(store.get("k1")) == replacement),
+            check("Other records are intact", bytes(store.get("k19")) == keys[19][1])
+        ]
+    with MmapKeystore(directory, 'TEST', record_size=RECORD_SIZE, readonly=True) as store:
+        results += [
+            check("Reopened store has 20 records", len(store) == 20),
+            check("Reopened IDs are in insertion order", list(store.ids()) == [k for k, _ in keys]),
+            check("Reopened store returns the overwritten key", bytes(store.get("k1")) == replacement)
+        ]
+    return all(results)
+
+def test_failed_batch(directory):
+    """A batch that fails part-way leaves the records before the failure stored and consistent"""
+    print("Batch failing part-way:")
+    keys = [(f"k{i}", os.urandom(RECORD_SIZE)) for i in range(15)]
+    with MmapKeystore(directory, 'TEST', record_size=RECORD_SIZE) as store:
+        try:
+            store.import_keys(keys + [("bad", b"short")])
+            raised = False
+        except ValueError:
+            raised = True
+        results = [check("Wrong-size key raises ValueError", raised)]
+    with MmapKeystore(directory, 'TEST', record_size=RECORD_SIZE, readonly=True) as store:
+        results += [
+            check("Records before the failure were kept", len(store) == 15),
+            check("Every kept ID resolves", all(bytes(store.get(k)) == v for k, v in keys)),
+            check("The failed ID was not stored", "bad" not in store)
+        ]
+    return all(results)
+
+def main():
+    print_separator()
+    print("MmapKeystore Testing")
+    print_separator()
+
+    # Merge every 10 inserts so the merge path is hit inside a single batch
+    keystore.PENDING_LIMIT = 10
+    results = []
+    for test in (test_duplicate_after_merge, test_failed_batch):
+        with tempfile.TemporaryDirectory() as directory:
+            results.append(test(directory))
+        print_separator()
+
+    passed = sum(results)
+    print(f"Passed {passed} out of {len(results)} check groups")
+    return 0 if passed == len(results) else 1
+
+if __name__ == "__main__":
+    exit(main())
@@ -1,4 +1,5 @@
 # test_schemes.py
+import argparse
 from schemes import dilithium, falcon, sphincs
 
 def print_separator():
@@ -51,11 +52,20 @@ def test_scheme(scheme_wrapper):
         return False
 
 def main():
+    parser = argparse.ArgumentParser(description="Functional test of the signature schemes")
+    parser.add_argument('--soak', type=float, default=None, metavar='SECONDS',
+                        help="Instead run the multi-threaded soak test (see soak_test.py) for this long")
+    args = parser.parse_args()
+
     schemes = [
         dilithium,
         falcon,
         sphincs
     ]
+
+    if args.soak is not None:
+        from soak_test import SoakTest
+        return 0 if SoakTest(schemes, duration=args.soak).run() else 1
     
     print_separator()
     print("Post-Quantum Signature Scheme Testing")
@@ -0,0 +1,134 @@
+# test_verify_daemon.py
+import asyncio
+import base64
+import json
+import os
+import tempfile
+
+from schemes import dilithium
+from verify_daemon import (VerificationDaemon, FRAME_HEADER, STATUS_VALID, STATUS_INVALID, STATUS_ERROR,
+                           encode_request, decode_response)
+
+MAX_INFLIGHT = 4
+
+def print_separator():
+    print("\n" + "="*50 + "\n")
+
+def check(description, condition):
+    print(f"{'✓' if condition else '✗'} {description}")
+    return condition
+
+class CountingDaemon(VerificationDaemon):
+    """Records the most requests one connection had in verification at once"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.active = 0
+        self.peak = 0
+
+    async def verify(self, name, message, signature, public_key):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            # Hold the request so pipelined frames pile up behind it
+            await asyncio.sleep(0.01)
+            return await super().verify(name, message, signature, public_key)
+        finally:
+            self.active -= 1
+
+async def unix_requests(path, frames):
+    reader, writer = await asyncio.open_unix_connection(path)
+    writer.write(b''.join(frames))
+    await writer.drain()
+    responses = {}
+    for _ in frames:
+        (length,) = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+        request_id, status, _ = decode_response(await reader.readexactly(length))
+        responses[request_id] = status
+    writer.close()
+    return responses
+
+async def http_request(port, request):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    body = json.dumps(request).encode()
+    writer.write((f"POST /verify HTTP/1.1\r\nHost: 127.0.0.1\r\nContent-Length: {len(body)}\r\n"
+                  f"Connection: close\r\n\r\n").encode() + body)
+    await writer.drain()
+    status_line = (await reader.readline()).decode()
+    writer.close()
+    return int(status_line.split(' ')[1])
+
+async def run_checks(directory):
+    daemon = CountingDaemon(workers=2, batch_window=0, max_inflight=MAX_INFLIGHT)
+    path = os.path.join(directory, 'verify.sock')
+    unix_server = await asyncio.start_unix_server(daemon.handle_unix_client, path=path)
+    http_server = await asyncio.start_server(daemon.handle_http_client, '127.0.0.1', 0)
+    port = http_server.sockets[0].getsockname()[1]
+
+    name = dilithium.get_name()
+    public_key, private_key = dilithium.keygen()
+    message = os.urandom(64)
+    signature = dilithium.sign(message, private_key)
+    results = []
+    try:
+        print("Unix socket:")
+        responses = await unix_requests(path, [
+            encode_request(1, name, message, signature, public_key),
+            encode_request(2, name, message[::-1], signature, public_key),
+            encode_request(3, name, message, signature, public_key[:1]),
+            encode_request(4, name, message, signature, public_key + b'\0'),
+            encode_request(5, 'No-Such-Scheme', message, signature, public_key)
+        ])
+        results += [
+            check("Valid signature is accepted", responses.get(1) == STATUS_VALID),
+            check("Wrong message is rejected", responses.get(2) == STATUS_INVALID),
+            check("1-byte public key is an error", responses.get(3) == STATUS_ERROR),
+            check("Over-long public key is an error", responses.get(4) == STATUS_ERROR),
+            check("Unknown scheme is an error", responses.get(5) == STATUS_ERROR)
+        ]
+
+        daemon.peak = 0
+        frames = [encode_request(i, name, message, signature, public_key) for i in range(32)]
+        responses = await unix_requests(path, frames)
+        results += [
+            check("32 pipelined requests are all answered",
+                  sorted(responses) == list(range(32)) and set(responses.values()) == {STATUS_VALID}),
+            check(f"At most {MAX_INFLIGHT} requests in flight per connection (peak {daemon.peak})",
+                  daemon.peak <= MAX_INFLIGHT)
+        ]
+
+        print("\nHTTP:")
+        request = {
+            'scheme': name,
+            'message': base64.b64encode(message).decode(),
+            'signature': base64.b64encode(signature).decode(),
+            'public_key': base64.b64encode(public_key).decode()
+        }
+        malformed = dict(request, public_key=base64.b64encode(public_key[:1]).decode())
+        results += [
+            check("Valid request returns 200", await http_request(port, request) == 200),
+            check("1-byte public key returns 400", await http_request(port, malformed) == 400),
+            check("Unknown scheme returns 400", await http_request(port, dict(request, scheme='No-Such-Scheme')) == 400)
+        ]
+    finally:
+        unix_server.close()
+        http_server.close()
+        for async_scheme in daemon.async_schemes.values():
+            async_scheme.close()
+    return results
+
+def main():
+    print_separator()
+    print("Verification Daemon Testing")
+    print_separator()
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = asyncio.run(run_checks(directory))
+    print_separator()
+
+    passed = sum(results)
+    print(f"Passed {passed} out of {len(results)} checks")
+    return 0 if passed == len(results) else 1
+
+if __name__ == "__main__":
+    exit(main())
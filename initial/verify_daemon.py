@@ -0,0 +1,284 @@
+# verify_daemon.py
+import argparse
+import asyncio
+import base64
+import json
+import os
+import struct
+import time
+from typing import Dict, Any
+
+from schemes import dilithium, falcon, sphincs, AsyncScheme, SignatureWrapper
+from schemes.base import is_enabled
+
+# Binary protocol used on the Unix socket. Every frame is prefixed with its length (u32).
+#   request:  u32 request_id | u8 name_len | name | u32 msg_len | msg | u32 sig_len | sig | u32 pk_len | pk
+#   response: u32 request_id | u8 status | f64 server_latency_ms
+FRAME_HEADER = struct.Struct('>I')
+RESPONSE = struct.Struct('>IBd')
+STATUS_INVALID, STATUS_VALID, STATUS_ERROR = 0, 1, 2
+# Largest request frame (Unix socket) or HTTP body accepted; bigger ones close the connection
+MAX_FRAME = 16 * 1024 * 1024
+# Requests one Unix-socket connection may have in flight before the next frame is read
+MAX_INFLIGHT = 64
+
+def encode_request(request_id: int, scheme_name: str, message: bytes, signature: bytes,
+                   public_key: bytes) -> bytes:
+    name = scheme_name.encode()
+    payload = b''.join([
+        struct.pack('>IB', request_id, len(name)), name,
+        struct.pack('>I', len(message)), message,
+        struct.pack('>I', len(signature)), signature,
+        struct.pack('>I', len(public_key)), public_key
+    ])
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+def decode_request(payload: bytes):
+    """Parse a request frame; raises ValueError if a declared length does not match the frame"""
+    view = memoryview(payload)
+    if len(view) < 5:
+        raise ValueError(f"Request frame of {len(view)} bytes is too short")
+    request_id, name_len = struct.unpack_from('>IB', view, 0)
+    pos = 5
+    if pos + name_len > len(view):
+        raise ValueError("Scheme name runs past the end of the frame")
+    name = bytes(view[pos:pos + name_len]).decode()
+    pos += name_len
+    fields = []
+    for field in ('message', 'signature', 'public_key'):
+        if pos + 4 > len(view):
+            raise ValueError(f"Frame ends before the {field} length")
+        (length,) = struct.unpack_from('>I', view, pos)
+        pos += 4
+        if pos + length > len(view):
+            raise ValueError(f"{field} of {length} bytes runs past the end of the frame")
+        fields.append(view[pos:pos + length])
+        pos += length
+    if pos != len(view):
+        raise ValueError(f"{len(view) - pos} trailing bytes after the public key")
+    return request_id, name, fields[0], fields[1], fields[2]
+
+def decode_response(payload: bytes):
+    """Return (request_id, status, server_latency_ms)"""
+    return RESPONSE.unpack(payload)
+
+class VerificationDaemon:
+    """
+    Localhost verification service built on `schemes`.
+
+    Requests for the same algorithm that arrive within `batch_window` seconds of each
+    other are coalesced by AsyncScheme into one batched job on a worker pool of
+    `workers` threads. liboqs is loaded once here instead of in every client process.
+
+    Frames and HTTP bodies larger than `max_frame` bytes close the connection, and a Unix
+    connection stops being read while it has `max_inflight` requests outstanding, so each
+    connection buffers at most max_inflight * max_frame bytes. Scheme names that the
+    loaded liboqs does not enable are rejected without creating a handle; the others get
+    one cached handle each. Public keys of the wrong length are rejected before liboqs,
+    which would read past them, sees them.
+    """
+
+    def __init__(self, workers: int = None, batch_window: float = 0.0005, max_batch: int = 64,
+                 max_pending: int = 1024, max_frame: int = MAX_FRAME, max_inflight: int = MAX_INFLIGHT):
+        self.workers = workers or os.cpu_count()
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.max_frame = max_frame
+        self.max_inflight = max_inflight
+        self.schemes = {scheme.get_name(): scheme for scheme in (dilithium, falcon, sphincs)}
+        self.async_schemes: Dict[str, AsyncScheme] = {}
+        self.public_key_sizes: Dict[str, int] = {}
+        self.stats = {'requests': 0, 'valid': 0, 'invalid': 0, 'errors': 0, 'total_latency_ms': 0.0}
+
+    def _get_async_scheme(self, name: str) -> AsyncScheme:
+        if name not in self.async_schemes:
+            scheme = self.schemes.get(name)
+            if scheme is None:
+                if not is_enabled(name):
+                    raise ValueError(f"Unknown or disabled scheme {name!r}")
+                scheme = SignatureWrapper(name)
+            self.public_key_sizes[name] = scheme.get_params()['public_key_size']
+            self.async_schemes[name] = AsyncScheme(scheme, max_workers=self.workers,
+                                                   max_pending=self.max_pending,
+                                                   batch_window=self.batch_window,
+                                                   max_batch=self.max_batch)
+        return self.async_schemes[name]
+
+    def check_request(self, name: str, public_key):
+        """Raise ValueError for an unknown scheme or a public key of the wrong length"""
+        self._get_async_scheme(name)
+        expected = self.public_key_sizes[name]
+        if len(public_key) != expected:
+            raise ValueError(f"{name} public key is {len(public_key)} bytes, expected {expected}")
+
+    async def verify(self, name: str, message, signature, public_key):
+        """Return (status, latency_ms) for one request"""
+        start = time.perf_counter()
+        try:
+            self.check_request(name, public_key)
+            valid = await self._get_async_scheme(name).verify(message, signature, public_key)
+            status = STATUS_VALID if valid else STATUS_INVALID
+        except Exception as e:
+            print(f"Error verifying {name} request: {e}")
+            status = STATUS_ERROR
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        self.stats['requests'] += 1
+        self.stats['total_latency_ms'] += latency_ms
+        self.stats[{STATUS_VALID: 'valid', STATUS_INVALID: 'invalid', STATUS_ERROR: 'errors'}[status]] += 1
+        return status, latency_ms
+
+    # Unix socket transport
+
+    async def handle_unix_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # Requests on one connection are handled concurrently so they can be coalesced;
+        # responses carry the request id and may be returned out of order. At most
+        # max_inflight are outstanding; beyond that the socket is not read (backpressure).
+        write_lock = asyncio.Lock()
+        inflight = asyncio.Semaphore(self.max_inflight)
+        tasks = set()
+
+        async def process(payload):
+            try:
+                try:
+                    request_id, name, message, signature, public_key = decode_request(payload)
+                except ValueError as e:
+                    # Echo the request id when at least that much of the frame is present
+                    request_id = struct.unpack_from('>I', payload)[0] if len(payload) >= 4 else 0
+                    status, latency_ms = STATUS_ERROR, 0.0
+                    self.stats['errors'] += 1
+                    print(f"Rejected malformed request {request_id}: {e}")
+                else:
+                    status, latency_ms = await self.verify(name, message, signature, public_key)
+                response = RESPONSE.pack(request_id, status, latency_ms)
+                async with write_lock:
+                    writer.write(FRAME_HEADER.pack(len(response)) + response)
+                    await writer.drain()
+            finally:
+                inflight.release()
+
+        try:
+            while True:
+                await inflight.acquire()
+                header = await reader.readexactly(FRAME_HEADER.size)
+                (length,) = FRAME_HEADER.unpack(header)
+                if length > self.max_frame:
+                    print(f"Closing connection: {length}-byte frame exceeds {self.max_frame} bytes")
+                    break
+                payload = await reader.readexactly(length)
+                task = asyncio.create_task(process(payload))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            writer.close()
+
+    # HTTP transport: POST /verify with a JSON body of base64 fields, GET /stats
+
+    async def handle_http_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                if not 0 <= length <= self.max_frame:
+                    data = json.dumps({'error': f'Body exceeds {self.max_frame} bytes'}).encode()
+                    writer.write(f"HTTP/1.1 413 Payload Too Large\r\nContent-Type: application/json\r\n"
+                                 f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode() + data)
+                    await writer.drain()
+                    break
+                body = await reader.readexactly(length)
+
+                status_line, response = await self._http_route(method, path, body)
+                data = json.dumps(response).encode()
+                writer.write(f"HTTP/1.1 {status_line}\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(data)}\r\n\r\n".encode() + data)
+                await writer.drain()
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _http_route(self, method: str, path: str, body: bytes):
+        if method == 'GET' and path == '/stats':
+            return '200 OK', self.get_stats()
+        if method != 'POST' or path != '/verify':
+            return '404 Not Found', {'error': f'Unknown endpoint {method} {path}'}
+        try:
+            request = json.loads(body)
+            fields = [base64.b64decode(request[key]) for key in ('message', 'signature', 'public_key')]
+            name = request['scheme']
+            if not isinstance(name, str):
+                raise TypeError("scheme must be a string")
+            self.check_request(name, fields[2])
+        except (ValueError, KeyError, TypeError) as e:
+            self.stats['errors'] += 1
+            return '400 Bad Request', {'error': str(e)}
+        status, latency_ms = await self.verify(name, *fields)
+        if status == STATUS_ERROR:
+            return '500 Internal Server Error', {'error': 'verification failed', 'latency_ms': latency_ms}
+        return '200 OK', {'valid': status == STATUS_VALID, 'latency_ms': latency_ms}
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        stats['mean_latency_ms'] = stats['total_latency_ms'] / stats['requests'] if stats['requests'] else 0.0
+        return stats
+
+    async def serve(self, unix_path: str = None, http_port: int = None):
+        servers = []
+        if unix_path:
+            if os.path.exists(unix_path):
+                os.unlink(unix_path)
+            servers.append(await asyncio.start_unix_server(self.handle_unix_client, path=unix_path))
+            print(f"Listening on unix socket {unix_path}")
+        if http_port:
+            servers.append(await asyncio.start_server(self.handle_http_client, '127.0.0.1', http_port))
+            print(f"Listening on http://127.0.0.1:{http_port}")
+        if not servers:
+            raise ValueError("At least one of unix_path or http_port is required")
+        try:
+            await asyncio.gather(*(server.serve_forever() for server in servers))
+        finally:
+            for async_scheme in self.async_schemes.values():
+                async_scheme.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Local PQC signature verification daemon")
+    parser.add_argument('--unix-socket', default='/tmp/pqc_verify.sock',
+                        help="Unix socket path (empty string to disable)")
+    parser.add_argument('--http-port', type=int, default=None, help="Also serve HTTP on 127.0.0.1:PORT")
+    parser.add_argument('--workers', type=int, default=None, help="Worker threads per algorithm")
+    parser.add_argument('--batch-window', type=float, default=0.0005,
+                        help="Coalescing window in seconds (0 disables batching)")
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--max-frame', type=int, default=MAX_FRAME,
+                        help="Largest request frame or HTTP body in bytes; larger ones close the connection")
+    parser.add_argument('--max-inflight', type=int, default=MAX_INFLIGHT,
+                        help="Outstanding requests per unix connection before it stops being read")
+    args = parser.parse_args()
+
+    daemon = VerificationDaemon(workers=args.workers, batch_window=args.batch_window,
+                                max_batch=args.max_batch, max_frame=args.max_frame,
+                                max_inflight=args.max_inflight)
+    try:
+        asyncio.run(daemon.serve(args.unix_socket or None, args.http_port))
+    except KeyboardInterrupt:
+        print(f"\nShutting down. Stats: {daemon.get_stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+# verify_loadgen.py
+import argparse
+import asyncio
+import base64
+import itertools
+import json
+import os
+import statistics
+import time
+from pathlib import Path
+from typing import Dict, Any, List
+
+from schemes import dilithium, falcon, sphincs
+from verify_daemon import FRAME_HEADER, STATUS_VALID, encode_request, decode_response
+
+def summarize(mode: str, latencies: List[float], server_latencies: List[float],
+              elapsed: float, failures: int) -> Dict[str, Any]:
+    latencies = sorted(latencies)
+    count = len(latencies)
+    result = {
+        'mode': mode,
+        'requests': count,
+        'failures': failures,
+        'throughput_rps': count / elapsed if elapsed > 0 else 0.0,
+        'latency_mean_ms': statistics.mean(latencies) * 1000,
+        'latency_p50_ms': latencies[count // 2] * 1000,
+        'latency_p99_ms': latencies[min(int(count * 0.99), count - 1)] * 1000
+    }
+    if server_latencies:
+        result['server_latency_mean_ms'] = statistics.mean(server_latencies)
+    print(f"  {mode:<10} {result['throughput_rps']:>10.0f} req/s   "
+          f"p50 {result['latency_p50_ms']:.3f} ms   p99 {result['latency_p99_ms']:.3f} ms   "
+          f"failures {failures}")
+    return result
+
+class LoadGenerator:
+    """Drives the verification daemon and compares it with in-process verification"""
+
+    def __init__(self, requests: int = 2000, concurrency: int = 32, pipeline: int = 4,
+                 message_size: int = 1024, unix_path: str = '/tmp/pqc_verify.sock',
+                 http_port: int = None):
+        self.requests = requests
+        self.concurrency = concurrency
+        self.pipeline = pipeline
+        self.message = os.urandom(message_size)
+        self.unix_path = unix_path
+        self.http_port = http_port
+
+    def in_process(self, scheme, signature, public_key) -> Dict[str, Any]:
+        latencies = []
+        failures = 0
+        start = time.perf_counter()
+        for _ in range(self.requests):
+            call_start = time.perf_counter()
+            if not scheme.verify(self.message, signature, public_key):
+                failures += 1
+            latencies.append(time.perf_counter() - call_start)
+        return summarize('in-process', latencies, [], time.perf_counter() - start, failures)
+
+    async def unix_socket(self, scheme, signature, public_key) -> Dict[str, Any]:
+        latencies, server_latencies = [], []
+        failures = 0
+        request_ids = itertools.count()
+        per_client = self.requests // self.concurrency
+
+        async def client():
+            nonlocal failures
+            reader, writer = await asyncio.open_unix_connection(self.unix_path)
+            sent = {}
+            outstanding = 0
+            remaining = per_client
+            # Keep up to `pipeline` requests in flight per connection
+            while remaining or outstanding:
+                while remaining and outstanding < self.pipeline:
+                    request_id = next(request_ids)
+                    sent[request_id] = time.perf_counter()
+                    writer.write(encode_request(request_id, scheme.get_name(), self.message,
+                                                signature, public_key))
+                    outstanding += 1
+                    remaining -= 1
+                await writer.drain()
+                (length,) = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+                request_id, status, server_latency = decode_response(await reader.readexactly(length))
+                latencies.append(time.perf_counter() - sent.pop(request_id))
+                server_latencies.append(server_latency)
+                failures += status != STATUS_VALID
+                outstanding -= 1
+            writer.close()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(self.concurrency)))
+        return summarize('unix', latencies, server_latencies, time.perf_counter() - start, failures)
+
+    async def http(self, scheme, signature, public_key) -> Dict[str, Any]:
+        latencies, server_latencies = [], []
+        failures = 0
+        per_client = self.requests // self.concurrency
+        body = json.dumps({
+            'scheme': scheme.get_name(),
+            'message': base64.b64encode(self.message).decode(),
+            'signature': base64.b64encode(signature).decode(),
+            'public_key': base64.b64encode(public_key).decode()
+        }).encode()
+        request = (f"POST /verify HTTP/1.1\r\nHost: 127.0.0.1\r\nContent-Type: application/json\r\n"
+                   f"Content-Length: {len(body)}\r\n\r\n").encode() + body
+
+        async def client():
+            nonlocal failures
+            reader, writer = await asyncio.open_connection('127.0.0.1', self.http_port)
+            for _ in range(per_client):
+                call_start = time.perf_counter()
+                writer.write(request)
+                await writer.drain()
+                await reader.readline()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b''):
+                        break
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+                response = json.loads(await reader.readexactly(int(headers['content-length'])))
+                latencies.append(time.perf_counter() - call_start)
+                server_latencies.append(response.get('latency_ms', 0.0))
+                failures += not response.get('valid', False)
+            writer.close()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(self.concurrency)))
+        return summarize('http', latencies, server_latencies, time.perf_counter() - start, failures)
+
+    async def run(self, schemes) -> Dict[str, Any]:
+        all_results = {}
+        for scheme in schemes:
+            print(f"\n{scheme.get_name()}:")
+            public_key, private_key = scheme.keygen()
+            signature = scheme.sign(self.message, private_key)
+            results = {'in_process': self.in_process(scheme, signature, public_key)}
+            if self.unix_path:
+                results['unix'] = await self.unix_socket(scheme, signature, public_key)
+            if self.http_port:
+                results['http'] = await self.http(scheme, signature, public_key)
+            all_results[scheme.get_name()] = results
+        return all_results
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for verify_daemon.py")
+    parser.add_argument('--requests', type=int, default=2000, help="Requests per scheme and mode")
+    parser.add_argument('--concurrency', type=int, default=32, help="Concurrent client connections")
+    parser.add_argument('--pipeline', type=int, default=4, help="In-flight requests per unix connection")
+    parser.add_argument('--message-size', type=int, default=1024)
+    parser.add_argument('--unix-socket', default='/tmp/pqc_verify.sock',
+                        help="Daemon unix socket (empty string to skip)")
+    parser.add_argument('--http-port', type=int, default=None, help="Daemon HTTP port to also test")
+    args = parser.parse_args()
+
+    generator = LoadGenerator(args.requests, args.concurrency, args.pipeline, args.message_size,
+                              args.unix_socket or None, args.http_port)
+    results = asyncio.run(generator.run([dilithium, falcon, sphincs]))
+
+    Path('results').mkdir(exist_ok=True)
+    with open('results/verify_daemon_load.json', 'w') as f:
+        json.dump(results, f, indent=2)
+    print("\nResults saved to results/verify_daemon_load.json")
+
+if __name__ == "__main__":
+    main()
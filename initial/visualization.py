@@ -1,144 +1,267 @@
+import argparse
+import hashlib
+import inspect
 import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+import matplotlib
+matplotlib.use('Agg')  # Figures are only written to files, also from worker processes
 import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
 import numpy as np
 from pathlib import Path
 
-class PQCVisualizer:
-    def __init__(self, results_path='results/pqc_blockchain_benchmarks.json'):
-        with open(results_path) as f:
-            self.results = json.load(f)
-            
-        plt.style.use('seaborn-v0_8-paper')
-        sns.set_context("paper", font_scale=1.5)
-        self.colors = sns.color_palette("deep")
-        
-    def _format_size(self, size_bytes):
-        for unit in ['B', 'KB', 'MB']:
-            if size_bytes < 1024:
-                return f"{size_bytes:.0f}{unit}"
-            size_bytes /= 1024
-        return f"{size_bytes:.0f}MB"
+TARGET_SIZE_KEY = 'message_size_1024'
+SOURCES = {
+    'benchmarks': 'results/pqc_blockchain_benchmarks.json',
+    'message_sweep': 'results/message_sweep.json'
+}
 
-    def create_comparison_plot(self):
-        plt.figure(figsize=(12, 6))
-        scheme_names = list(self.results.keys())
-        
-        # Prepare data
-        pure_times = []
-        blockchain_times = []
-        message_sizes = []
-        schemes = []
-        
-        # Ensure consistent order for message sizes if needed, e.g., by sorting keys
-        all_sizes = set()
-        for scheme_data in self.results.values():
-            for key in scheme_data['measurements'].keys():
-                size = int(key.split('_')[-1])
-                all_sizes.add(size)
-        
-        sorted_sizes = sorted(list(all_sizes))
-        size_map = {size: self._format_size(size) for size in sorted_sizes}
-        ordered_size_labels = [size_map[size] for size in sorted_sizes]
-
-        for scheme_name, scheme_data in self.results.items():
-            # Sort measurements by size to ensure consistency
-            sorted_measurements = sorted(scheme_data['measurements'].items(), key=lambda item: int(item[0].split('_')[-1]))
-            for key, measurement in sorted_measurements:
-                size = int(key.split('_')[-1])
-                pure_times.append(measurement['pure_crypto']['pure_verification_time_ms'])
-                blockchain_times.append(measurement['blockchain_overhead']['blockchain_verification_time_ms'])
-                message_sizes.append(size_map[size]) # Use formatted size
-                schemes.append(scheme_name)
-        
-        df = pd.DataFrame({
-            'Message Size': message_sizes,
-            'Scheme': schemes,
-            'Pure Verification (ms)': pure_times,
-            'Blockchain Verification (ms)': blockchain_times
-        })
-        
-        # Ensure the plot uses the sorted order of message sizes
-        df['Message Size'] = pd.Categorical(df['Message Size'], categories=ordered_size_labels, ordered=True)
-
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
-        
-        sns.barplot(data=df, x='Message Size', y='Pure Verification (ms)', 
-                   hue='Scheme', ax=ax1, order=ordered_size_labels) # Specify order
-        ax1.set_title('Pure Verification Time')
-        ax1.tick_params(axis='x', rotation=45)
-        
-        sns.barplot(data=df, x='Message Size', y='Blockchain Verification (ms)', 
-                   hue='Scheme', ax=ax2, order=ordered_size_labels) # Specify order
-        ax2.set_title('Blockchain Verification Time')
-        ax2.tick_params(axis='x', rotation=45)
-        
-        plt.tight_layout()
-        plt.savefig('results/verification_comparison.pdf', dpi=300, bbox_inches='tight')
-        plt.close()
+def _init_style():
+    plt.style.use('seaborn-v0_8-paper')
+    sns.set_context("paper", font_scale=1.5)
 
-    def create_gas_analysis_plot(self):
-        scheme_names = []
-        base_gas = []
-        verify_gas = []
-        sig_sizes = []
-        
-        # Use a specific, common message size for comparison (e.g., 1024 bytes)
-        target_size_key = 'message_size_1024' 
-
-        for scheme_name, scheme_data in self.results.items():
-            if target_size_key in scheme_data['measurements']:
-                measurement = scheme_data['measurements'][target_size_key]
-                
-                scheme_names.append(scheme_name)
-                base_gas.append(measurement['blockchain_overhead']['base_transaction_gas'])
-                verify_gas.append(measurement['blockchain_overhead']['verification_gas'])
-                sig_sizes.append(measurement['pure_crypto']['signature_size'])
-            else:
-                print(f"Warning: Data for message size 1024 not found for scheme {scheme_name}. Skipping in gas analysis plot.")
-
-        if not scheme_names: # Check if any data was found
-             print("Error: No data found for message size 1024 for any scheme. Cannot generate gas analysis plot.")
-             return
-
-        fig, ax1 = plt.subplots(figsize=(10, 6))
-        
-        # Plot stacked bars
-        x = np.arange(len(scheme_names))
-        width = 0.35
-        
-        ax1.bar(x, base_gas, width, label='Base Gas', color='lightblue')
-        ax1.bar(x, verify_gas, width, bottom=base_gas, label='Verification Gas', color='darkblue')
-        
-        # Add signature size on secondary axis
-        ax2 = ax1.twinx()
-        ax2.plot(x, sig_sizes, 'r--', marker='o', label='Signature Size')
-        
-        # Set labels and legend
-        ax1.set_xlabel('Scheme')
-        ax1.set_ylabel('Gas Used')
-        ax2.set_ylabel('Signature Size (bytes)')
-        
-        ax1.set_xticks(x)
-        ax1.set_xticklabels(scheme_names)
-        
-        # Combine legends
-        handles1, labels1 = ax1.get_legend_handles_labels()
-        handles2, labels2 = ax2.get_legend_handles_labels()
-        ax1.legend(handles1 + handles2, labels1 + labels2, loc='upper left')
-        
-        plt.title('Gas Usage and Signature Size Comparison (Message Size: 1KB)')
-        plt.tight_layout()
-        plt.savefig('results/gas_analysis.pdf', dpi=300, bbox_inches='tight')
-        plt.close()
+def _format_size(size_bytes):
+    for unit in ['B', 'KB', 'MB']:
+        if size_bytes < 1024:
+            return f"{size_bytes:.0f}{unit}"
+        size_bytes /= 1024
+    return f"{size_bytes:.0f}MB"
 
-    def create_latex_tables(self):
-        # Use a specific, common message size for comparison (e.g., 1024 bytes)
-        target_size_key = 'message_size_1024' 
-        
-        # Table 1: Core Cryptographic Performance
-        crypto_table = f"""\\begin{{table}}[h]
+def iter_json_object(path, chunk_size=1 << 20):
+    """
+    Yield the (key, value) pairs of a top-level JSON object, decoding one value at a time
+    from chunks of the file, so only a single scheme's results are in memory at once.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, encoding='utf-8') as f:
+        buffer = ''
+        pos = 0
+        eof = False
+
+        def fill():
+            # Read at least as much as is buffered, so re-decoding a large value is amortised
+            nonlocal buffer, pos, eof
+            chunk = f.read(max(chunk_size, len(buffer) - pos))
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+
+        def skip_whitespace():
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in ' \t\r\n':
+                    pos += 1
+                if pos < len(buffer) or eof:
+                    return
+                fill()
+
+        def expect(chars):
+            nonlocal pos
+            skip_whitespace()
+            if pos >= len(buffer) or buffer[pos] not in chars:
+                raise ValueError(f"Malformed JSON in {path}: expected one of {chars!r}")
+            pos += 1
+            return buffer[pos - 1]
+
+        def decode():
+            nonlocal pos
+            skip_whitespace()
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buffer, pos)
+                    # A number split by a chunk boundary decodes as a shorter prefix ("1e-07"
+                    # read as "1" from "1e"), so only accept a value once the character after
+                    # it, which must be whitespace or a delimiter, has been read
+                    if eof or (end < len(buffer) and buffer[end] in ' \t\r\n,:}]'):
+                        pos = end
+                        return value
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                fill()
+
+        expect('{')
+        skip_whitespace()
+        if pos < len(buffer) and buffer[pos] == '}':
+            return
+        while True:
+            key = decode()
+            expect(':')
+            yield key, decode()
+            if expect(',}') == '}':
+                return
+
+# --- Per-figure input selection: only the selected data is fingerprinted and rendered ---
+
+def select_verification_times(scheme_data):
+    return {
+        key: {
+            'pure_verification_time_ms': m['pure_crypto']['pure_verification_time_ms'],
+            'blockchain_verification_time_ms': m['blockchain_overhead']['blockchain_verification_time_ms']
+        }
+        for key, m in scheme_data['measurements'].items()
+    }
+
+def select_target_size(scheme_data):
+    measurements = scheme_data['measurements']
+    if not measurements:
+        return None
+    # Keygen is independent of message size, take from the first measurement
+    first_measurement = next(iter(measurements.values()))
+    target = measurements.get(TARGET_SIZE_KEY)
+    return {
+        'key_generation_time_ms': first_measurement['pure_crypto']['key_generation_time_ms'],
+        'pure_crypto': target['pure_crypto'] if target else None,
+        'blockchain_overhead': target['blockchain_overhead'] if target else None
+    }
+
+def select_all(scheme_data):
+    return scheme_data
+
+# --- Renderers: module-level so they can run in worker processes ---
+
+def render_comparison_plot(results, output):
+    pure_times = []
+    blockchain_times = []
+    message_sizes = []
+    schemes = []
+
+    # Ensure consistent order for message sizes if needed, e.g., by sorting keys
+    all_sizes = set()
+    for scheme_data in results.values():
+        for key in scheme_data.keys():
+            size = int(key.split('_')[-1])
+            all_sizes.add(size)
+
+    sorted_sizes = sorted(list(all_sizes))
+    size_map = {size: _format_size(size) for size in sorted_sizes}
+    ordered_size_labels = [size_map[size] for size in sorted_sizes]
+
+    for scheme_name, scheme_data in results.items():
+        # Sort measurements by size to ensure consistency
+        sorted_measurements = sorted(scheme_data.items(), key=lambda item: int(item[0].split('_')[-1]))
+        for key, measurement in sorted_measurements:
+            size = int(key.split('_')[-1])
+            pure_times.append(measurement['pure_verification_time_ms'])
+            blockchain_times.append(measurement['blockchain_verification_time_ms'])
+            message_sizes.append(size_map[size]) # Use formatted size
+            schemes.append(scheme_name)
+
+    df = pd.DataFrame({
+        'Message Size': message_sizes,
+        'Scheme': schemes,
+        'Pure Verification (ms)': pure_times,
+        'Blockchain Verification (ms)': blockchain_times
+    })
+
+    # Ensure the plot uses the sorted order of message sizes
+    df['Message Size'] = pd.Categorical(df['Message Size'], categories=ordered_size_labels, ordered=True)
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
+
+    sns.barplot(data=df, x='Message Size', y='Pure Verification (ms)',
+               hue='Scheme', ax=ax1, order=ordered_size_labels) # Specify order
+    ax1.set_title('Pure Verification Time')
+    ax1.tick_params(axis='x', rotation=45)
+
+    sns.barplot(data=df, x='Message Size', y='Blockchain Verification (ms)',
+               hue='Scheme', ax=ax2, order=ordered_size_labels) # Specify order
+    ax2.set_title('Blockchain Verification Time')
+    ax2.tick_params(axis='x', rotation=45)
+
+    plt.tight_layout()
+    plt.savefig(output, dpi=300, bbox_inches='tight')
+    plt.close()
+
+def render_gas_analysis_plot(results, output):
+    scheme_names = []
+    base_gas = []
+    verify_gas = []
+    sig_sizes = []
+
+    # Use a specific, common message size for comparison (1024 bytes)
+    for scheme_name, measurement in results.items():
+        if measurement and measurement['blockchain_overhead']:
+            scheme_names.append(scheme_name)
+            base_gas.append(measurement['blockchain_overhead']['base_transaction_gas'])
+            verify_gas.append(measurement['blockchain_overhead']['verification_gas'])
+            sig_sizes.append(measurement['pure_crypto']['signature_size'])
+        else:
+            print(f"Warning: Data for message size 1024 not found for scheme {scheme_name}. Skipping in gas analysis plot.")
+
+    if not scheme_names: # Check if any data was found
+         print("Error: No data found for message size 1024 for any scheme. Cannot generate gas analysis plot.")
+         return
+
+    fig, ax1 = plt.subplots(figsize=(10, 6))
+
+    # Plot stacked bars
+    x = np.arange(len(scheme_names))
+    width = 0.35
+
+    ax1.bar(x, base_gas, width, label='Base Gas', color='lightblue')
+    ax1.bar(x, verify_gas, width, bottom=base_gas, label='Verification Gas', color='darkblue')
+
+    # Add signature size on secondary axis
+    ax2 = ax1.twinx()
+    ax2.plot(x, sig_sizes, 'r--', marker='o', label='Signature Size')
+
+    # Set labels and legend
+    ax1.set_xlabel('Scheme')
+    ax1.set_ylabel('Gas Used')
+    ax2.set_ylabel('Signature Size (bytes)')
+
+    ax1.set_xticks(x)
+    ax1.set_xticklabels(scheme_names)
+
+    # Combine legends
+    handles1, labels1 = ax1.get_legend_handles_labels()
+    handles2, labels2 = ax2.get_legend_handles_labels()
+    ax1.legend(handles1 + handles2, labels1 + labels2, loc='upper left')
+
+    plt.title('Gas Usage and Signature Size Comparison (Message Size: 1KB)')
+    plt.tight_layout()
+    plt.savefig(output, dpi=300, bbox_inches='tight')
+    plt.close()
+
+def render_message_sweep_plot(sweep, output):
+    """Latency and throughput vs. message size, marking each scheme's hash-dominated crossover"""
+    colors = sns.color_palette("deep")
+    fig, axes = plt.subplots(2, 2, figsize=(15, 10), sharex=True)
+    for i, (scheme_name, scheme_data) in enumerate(sweep.items()):
+        color = colors[i % len(colors)]
+        for col, op in enumerate(['sign', 'verify']):
+            sizes = [p['size'] for p in scheme_data[op]]
+            axes[0][col].plot(sizes, [p['latency_ms'] for p in scheme_data[op]],
+                              marker='o', markersize=3, color=color, label=scheme_name)
+            axes[1][col].plot(sizes, [p['throughput_mbps'] for p in scheme_data[op]],
+                              marker='o', markersize=3, color=color, label=scheme_name)
+            crossover = scheme_data['crossover'][op]['crossover_bytes']
+            if crossover:
+                for row in range(2):
+                    axes[row][col].axvline(crossover, color=color, linestyle='--', alpha=0.6)
+
+    for col, op in enumerate(['Signing', 'Verification']):
+        axes[0][col].set_title(f'{op} Latency')
+        axes[0][col].set_ylabel('Latency (ms)')
+        axes[1][col].set_title(f'{op} Throughput')
+        axes[1][col].set_ylabel('Throughput (MB/s)')
+        axes[1][col].set_xlabel('Message Size (bytes)')
+        for row in range(2):
+            axes[row][col].set_xscale('log', base=2)
+            axes[row][col].set_yscale('log')
+            axes[row][col].legend(loc='upper left', fontsize='small')
+
+    fig.suptitle('Message Size Sweep (dashed: fixed-cost / hash-throughput crossover)')
+    plt.tight_layout()
+    plt.savefig(output, dpi=300, bbox_inches='tight')
+    plt.close()
+
+def render_latex_tables(results, output):
+    # Table 1: Core Cryptographic Performance
+    crypto_table = f"""\\begin{{table}}[h]
 \\centering
 \\caption{{Core Cryptographic Performance Metrics (Message Size: 1KB)}} % Updated Caption
 \\label{{tab:crypto_perf}}
@@ -147,32 +270,29 @@ class PQCVisualizer:
 Scheme & Key Gen (ms) & Sign (ms) & Verify (ms) & Sig Size (B) \\\\
 \\midrule
 """
-        
-        for scheme_name, scheme_data in self.results.items():
-            # Keygen is independent of message size, take from any measurement if available
-            keygen_time = "N/A" 
-            if scheme_data['measurements']:
-                 # Find the first available measurement for keygen time (should be consistent)
-                 first_measurement = next(iter(scheme_data['measurements'].values()))
-                 keygen_time = f"{first_measurement['pure_crypto']['key_generation_time_ms']:.2f}"
-
-            if target_size_key in scheme_data['measurements']:
-                measurement = scheme_data['measurements'][target_size_key]['pure_crypto']
-                crypto_table += f"{scheme_name} & "
-                crypto_table += f"{keygen_time} & " # Use fetched keygen time
-                crypto_table += f"{measurement['signing_time_ms']:.2f} & "
-                crypto_table += f"{measurement['pure_verification_time_ms']:.2f} & "
-                crypto_table += f"{measurement['signature_size']} \\\\\n"
-            else:
-                 print(f"Warning: Data for message size 1024 not found for scheme {scheme_name}. Skipping in crypto table.")
-
-        crypto_table += """\\bottomrule
+
+    for scheme_name, selected in results.items():
+        keygen_time = "N/A"
+        if selected:
+             keygen_time = f"{selected['key_generation_time_ms']:.2f}"
+
+        if selected and selected['pure_crypto']:
+            measurement = selected['pure_crypto']
+            crypto_table += f"{scheme_name} & "
+            crypto_table += f"{keygen_time} & " # Use fetched keygen time
+            crypto_table += f"{measurement['signing_time_ms']:.2f} & "
+            crypto_table += f"{measurement['pure_verification_time_ms']:.2f} & "
+            crypto_table += f"{measurement['signature_size']} \\\\\n"
+        else:
+             print(f"Warning: Data for message size 1024 not found for scheme {scheme_name}. Skipping in crypto table.")
+
+    crypto_table += """\\bottomrule
 \\end{tabular}
 \\end{table}
 """
 
-        # Table 2: Blockchain Integration Overhead
-        overhead_table = f"""\\begin{{table}}[h]
+    # Table 2: Blockchain Integration Overhead
+    overhead_table = f"""\\begin{{table}}[h]
 \\centering
 \\caption{{Simulated Blockchain Integration Overhead (Message Size: 1KB)}} % Updated Caption
 \\label{{tab:blockchain_overhead}}
@@ -182,48 +302,222 @@ Scheme & Verification & Gas & Gas/Byte & Overhead \\\\
 & Time (ms) & Used & Ratio & Ratio \\\\
 \\midrule
 """
-        
-        for scheme_name, scheme_data in self.results.items():
-             if target_size_key in scheme_data['measurements']:
-                measurement = scheme_data['measurements'][target_size_key]
-                overhead_data = measurement['blockchain_overhead']
-                crypto_data = measurement['pure_crypto']
-                
-                # Calculate ratios safely, handle potential division by zero
-                overhead_ratio = "N/A"
-                if crypto_data['pure_verification_time_ms'] > 0:
-                    overhead_ratio = f"{overhead_data['blockchain_verification_time_ms'] / crypto_data['pure_verification_time_ms']:.2f}x"
-
-                gas_per_byte = "N/A"
-                if crypto_data['signature_size'] > 0:
-                     gas_per_byte = f"{overhead_data['total_gas'] / crypto_data['signature_size']:.1f}"
-
-                overhead_table += f"{scheme_name} & "
-                overhead_table += f"{overhead_data['blockchain_verification_time_ms']:.2f} & "
-                overhead_table += f"{int(overhead_data['total_gas']):,} & "
-                overhead_table += f"{gas_per_byte} & " # Use calculated gas/byte
-                overhead_table += f"{overhead_ratio} \\\\\n" # Use calculated overhead ratio
-             else:
-                 print(f"Warning: Data for message size 1024 not found for scheme {scheme_name}. Skipping in overhead table.")
-
-        overhead_table += """\\bottomrule
+
+    for scheme_name, selected in results.items():
+         if selected and selected['blockchain_overhead']:
+            overhead_data = selected['blockchain_overhead']
+            crypto_data = selected['pure_crypto']
+
+            # Calculate ratios safely, handle potential division by zero
+            overhead_ratio = "N/A"
+            if crypto_data['pure_verification_time_ms'] > 0:
+                overhead_ratio = f"{overhead_data['blockchain_verification_time_ms'] / crypto_data['pure_verification_time_ms']:.2f}x"
+
+            gas_per_byte = "N/A"
+            if crypto_data['signature_size'] > 0:
+                 gas_per_byte = f"{overhead_data['total_gas'] / crypto_data['signature_size']:.1f}"
+
+            overhead_table += f"{scheme_name} & "
+            overhead_table += f"{overhead_data['blockchain_verification_time_ms']:.2f} & "
+            overhead_table += f"{int(overhead_data['total_gas']):,} & "
+            overhead_table += f"{gas_per_byte} & " # Use calculated gas/byte
+            overhead_table += f"{overhead_ratio} \\\\\n" # Use calculated overhead ratio
+         else:
+             print(f"Warning: Data for message size 1024 not found for scheme {scheme_name}. Skipping in overhead table.")
+
+    overhead_table += """\\bottomrule
 \\end{tabular}
 \\end{table}
 """
 
-        # Save tables
-        results_dir = Path('results')
-        results_dir.mkdir(exist_ok=True) # Ensure results dir exists
-        with open(results_dir / 'tables.tex', 'w') as f:
-            f.write(crypto_table)
-            f.write('\n')
-            f.write(overhead_table)
+    with open(output, 'w') as f:
+        f.write(crypto_table)
+        f.write('\n')
+        f.write(overhead_table)
+
+# name: (source, selector, renderer, output)
+FIGURES = {
+    'verification_comparison': ('benchmarks', select_verification_times, render_comparison_plot,
+                                'results/verification_comparison.pdf'),
+    'gas_analysis': ('benchmarks', select_target_size, render_gas_analysis_plot, 'results/gas_analysis.pdf'),
+    'tables': ('benchmarks', select_target_size, render_latex_tables, 'results/tables.tex'),
+    'message_sweep': ('message_sweep', select_all, render_message_sweep_plot, 'results/message_sweep.pdf')
+}
+
+def _render(name, data):
+    _, _, renderer, output = FIGURES[name]
+    renderer(data, output)
+    return name
+
+class PQCVisualizer:
+    """
+    Builds the figures and tables from the results files incrementally.
+
+    Each figure declares the source it reads and a selector for the part of every
+    scheme's results it uses. A figure's fingerprint is a hash of its selected inputs
+    and of its selector and renderer code; figures whose fingerprint matches the
+    manifest (results/.figure_cache.json) and whose output exists are skipped. Sources
+    are streamed one scheme at a time, and not read at all when their size and mtime
+    match the manifest. Figures that need rebuilding render in parallel worker
+    processes with the Agg backend.
+
+    `results`, `colors`, `_format_size` and the `sweep_path` argument of
+    create_message_sweep_plot are kept for callers of the previous, non-incremental API.
+    """
+
+    def __init__(self, results_path='results/pqc_blockchain_benchmarks.json',
+                 sweep_path='results/message_sweep.json', cache_path='results/.figure_cache.json',
+                 workers=None):
+        self.sources = dict(SOURCES, benchmarks=results_path, message_sweep=sweep_path)
+        self.cache_path = Path(cache_path)
+        self.workers = workers or min(len(FIGURES), os.cpu_count() or 1)
+        self.manifest = {'figures': {}}
+        if self.cache_path.exists():
+            with open(self.cache_path) as f:
+                self.manifest = json.load(f)
+        _init_style()
+        self.colors = sns.color_palette("deep")
+        self._results = None
+
+    @property
+    def results(self):
+        """The whole benchmark results file, loaded on first access"""
+        if self._results is None:
+            with open(self.sources['benchmarks']) as f:
+                self._results = json.load(f)
+        return self._results
+
+    _format_size = staticmethod(_format_size)
+
+    @staticmethod
+    def _code_digest(name) -> str:
+        _, selector, renderer, _ = FIGURES[name]
+        return hashlib.sha256((inspect.getsource(selector) + inspect.getsource(renderer)).encode()).hexdigest()
+
+    def _source_stat(self, source):
+        stat = os.stat(self.sources[source])
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def _ingest(self, source, names):
+        """Stream a source once, collecting each figure's selected data per scheme"""
+        selected = {name: {} for name in names}
+        for scheme_name, scheme_data in iter_json_object(self.sources[source]):
+            for name in names:
+                selected[name][scheme_name] = FIGURES[name][1](scheme_data)
+        return selected
+
+    def plan(self, names=None, force=False):
+        """Return {figure: (fingerprint, source stat, selected data)} for the figures that need rebuilding"""
+        names = list(names or FIGURES)
+        jobs = {}
+        by_source = {}
+        for name in names:
+            by_source.setdefault(FIGURES[name][0], []).append(name)
+
+        for source, source_names in by_source.items():
+            if not Path(self.sources[source]).exists():
+                print(f"Warning: {self.sources[source]} not found. Skipping {', '.join(source_names)}.")
+                continue
+            stat = self._source_stat(source)
+            if not force:
+                source_names = [name for name in source_names if not self._unchanged(name, stat)]
+                if not source_names:
+                    continue
+            for name, data in self._ingest(source, source_names).items():
+                fingerprint = hashlib.sha256(
+                    (self._code_digest(name) + json.dumps(data, sort_keys=True)).encode()).hexdigest()
+                cached = self.manifest['figures'].get(name, {})
+                if force or cached.get('fingerprint') != fingerprint or not Path(FIGURES[name][3]).exists():
+                    jobs[name] = (fingerprint, stat, data)
+                else:
+                    # Source changed but not the parts this figure uses
+                    self._record(name, fingerprint, stat)
+        return jobs
+
+    def _unchanged(self, name, stat) -> bool:
+        """True if the source file, the figure's code and its output are as last recorded"""
+        cached = self.manifest['figures'].get(name, {})
+        return (cached.get('source_stat') == stat and cached.get('code') == self._code_digest(name)
+                and Path(FIGURES[name][3]).exists())
+
+    def _record(self, name, fingerprint, stat):
+        self.manifest['figures'][name] = {
+            'fingerprint': fingerprint,
+            'code': self._code_digest(name),
+            'source_stat': stat
+        }
+
+    def update(self, names=None, force=False):
+        """Rebuild the figures whose inputs changed; returns the names that were rendered"""
+        jobs = self.plan(names, force)
+        skipped = [name for name in (names or FIGURES)
+                   if name not in jobs and Path(self.sources[FIGURES[name][0]]).exists()]
+        if skipped:
+            print(f"Up to date: {', '.join(skipped)}")
+        if not jobs:
+            self._save_manifest()
+            return []
+
+        Path('results').mkdir(exist_ok=True)
+        rendered = []
+        if self.workers <= 1 or len(jobs) == 1:
+            for name, (_, _, data) in jobs.items():
+                rendered.append(self._run_job(name, data))
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(jobs)), initializer=_init_style) as executor:
+                futures = {name: executor.submit(_render, name, data) for name, (_, _, data) in jobs.items()}
+                for name, future in futures.items():
+                    try:
+                        rendered.append(future.result())
+                    except Exception as e:
+                        print(f"Error rendering {name}: {str(e)}")
+        rendered = [name for name in rendered if name]
+        for name in rendered:
+            fingerprint, stat, _ = jobs[name]
+            self._record(name, fingerprint, stat)
+            print(f"Rendered {FIGURES[name][3]}")
+        self._save_manifest()
+        return rendered
+
+    def _run_job(self, name, data):
+        try:
+            return _render(name, data)
+        except Exception as e:
+            print(f"Error rendering {name}: {str(e)}")
+            return None
+
+    def _save_manifest(self):
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_path.with_suffix('.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp, self.cache_path)
+
+    def create_comparison_plot(self):
+        self.update(['verification_comparison'], force=True)
+
+    def create_gas_analysis_plot(self):
+        self.update(['gas_analysis'], force=True)
+
+    def create_message_sweep_plot(self, sweep_path=None):
+        if sweep_path is not None:
+            self.sources['message_sweep'] = sweep_path
+        self.update(['message_sweep'], force=True)
+
+    def create_latex_tables(self):
+        self.update(['tables'], force=True)
 
 def main():
-    visualizer = PQCVisualizer()
-    visualizer.create_comparison_plot()
-    visualizer.create_gas_analysis_plot()
-    visualizer.create_latex_tables()
+    parser = argparse.ArgumentParser(description="Build figures and LaTeX tables from benchmark results")
+    parser.add_argument('--force', action='store_true', help="Rebuild every figure regardless of the cache")
+    parser.add_argument('--workers', type=int, default=None, help="Parallel render processes")
+    parser.add_argument('--only', nargs='+', choices=list(FIGURES), default=None,
+                        help="Restrict to these figures")
+    parser.add_argument('--results', default=SOURCES['benchmarks'])
+    args = parser.parse_args()
+
+    visualizer = PQCVisualizer(results_path=args.results, workers=args.workers)
+    visualizer.update(args.only, force=args.force)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,302 @@
+# wire_formats.py
+import argparse
+import csv
+import json
+import lzma
+import os
+import statistics
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Any, List
+
+import falcon_onchain
+
+FIELDS = ('signature', 'public_key')
+
+def calldata_gas(data: bytes) -> int:
+    """Calldata cost: 4 gas per zero byte, 16 per non-zero byte"""
+    zeros = data.count(0)
+    return 4 * zeros + 16 * (len(data) - zeros)
+
+def storage_gas(data: bytes) -> int:
+    """SSTORE into fresh slots: 22100 per non-zero 32-byte word, 2200 per all-zero word"""
+    gas = 0
+    for offset in range(0, len(data), 32):
+        gas += 22100 if any(data[offset:offset + 32]) else 2200
+    return gas
+
+def code_storage_gas(data: bytes) -> int:
+    """Storing the bytes as contract code (SSTORE2): CREATE plus 200 gas per deposited byte"""
+    return 32000 + 200 * (len(data) + 1)
+
+class WireEncoding:
+    """Identity encoding; subclasses re-encode a signature or public key for the wire"""
+    name = 'raw'
+    # Whether the verifier contracts accept this form; the others would need an on-chain decoder
+    verifier_input = True
+
+    def applies_to(self, scheme_name: str, field: str) -> bool:
+        return True
+
+    def encode(self, data: bytes) -> bytes:
+        return bytes(data)
+
+    def decode(self, data: bytes) -> bytes:
+        return bytes(data)
+
+class FalconTrimmedEncoding(WireEncoding):
+    """
+    Falcon signatures without the zero padding after the compressed s2. The compressed
+    form always ends in a non-zero byte, so decoding re-pads to the fixed length
+    (Falcon-padded-512). The on-chain Falcon512Verifier accepts the trimmed form as is.
+    """
+    name = 'falcon-trimmed'
+
+    def __init__(self, padded_length: int = None):
+        self.padded_length = padded_length
+
+    def applies_to(self, scheme_name: str, field: str) -> bool:
+        return field == 'signature' and 'falcon' in scheme_name.lower()
+
+    def encode(self, data: bytes) -> bytes:
+        return bytes(data).rstrip(b'\x00')
+
+    def decode(self, data: bytes) -> bytes:
+        if self.padded_length:
+            return bytes(data).ljust(self.padded_length, b'\x00')
+        return bytes(data)
+
+class FalconZigzagEncoding(FalconTrimmedEncoding):
+    """
+    Falcon signatures with s2 as 512 zigzag-coded big-endian u16 values instead of the
+    Golomb-Rice compressed bit stream. Twice the coefficients' byte count, but every
+    coefficient with |s2[i]| < 128 gets a zero high byte, which calldata prices at 4 gas.
+    """
+    name = 'falcon-zigzag16'
+    verifier_input = False
+
+    def applies_to(self, scheme_name: str, field: str) -> bool:
+        return super().applies_to(scheme_name, field) and '512' in scheme_name
+
+    def encode(self, data: bytes) -> bytes:
+        nonce, s2 = falcon_onchain.decode_signature(data)
+        out = bytearray(data[:1])
+        out += nonce
+        for c in s2:
+            out += (2 * c if c >= 0 else -2 * c - 1).to_bytes(2, 'big')
+        return bytes(out)
+
+    def decode(self, data: bytes) -> bytes:
+        header_len = 1 + falcon_onchain.NONCE_LEN
+        s2 = []
+        for i in range(header_len, len(data), 2):
+            z = (data[i] << 8) | data[i + 1]
+            s2.append(z >> 1 if z & 1 == 0 else -((z + 1) >> 1))
+        return super().decode(bytes(data[:header_len]) + falcon_onchain.compress(s2))
+
+class ZlibEncoding(WireEncoding):
+    """Raw DEFLATE (no zlib header) at maximum compression"""
+    name = 'zlib'
+    verifier_input = False
+
+    def encode(self, data: bytes) -> bytes:
+        compressor = zlib.compressobj(9, zlib.DEFLATED, -15)
+        return compressor.compress(bytes(data)) + compressor.flush()
+
+    def decode(self, data: bytes) -> bytes:
+        return zlib.decompress(data, -15)
+
+class LzmaEncoding(WireEncoding):
+    """Raw LZMA2 stream (no container header) at preset 9"""
+    name = 'lzma'
+    verifier_input = False
+    # A 64 KiB dictionary covers the largest signatures without preset 9's 64 MiB allocation per call
+    FILTERS = [{'id': lzma.FILTER_LZMA2, 'preset': 9, 'dict_size': 1 << 16}]
+
+    def encode(self, data: bytes) -> bytes:
+        return lzma.compress(bytes(data), format=lzma.FORMAT_RAW, filters=self.FILTERS)
+
+    def decode(self, data: bytes) -> bytes:
+        return lzma.decompress(data, format=lzma.FORMAT_RAW, filters=self.FILTERS)
+
+ENCODINGS = {
+    encoding.name: encoding
+    for encoding in (WireEncoding, FalconTrimmedEncoding, FalconZigzagEncoding, ZlibEncoding, LzmaEncoding)
+}
+
+def get_encoding(name: str, scheme, field: str = 'signature') -> WireEncoding:
+    """Instantiate an encoding for a scheme; falls back to raw where it does not apply"""
+    if name not in ENCODINGS:
+        raise ValueError(f"Unknown wire encoding: {name} (choose from {', '.join(ENCODINGS)})")
+    scheme_name = scheme.get_name()
+    if issubclass(ENCODINGS[name], FalconTrimmedEncoding):
+        padded = 'padded' in scheme_name.lower()
+        encoding = ENCODINGS[name](scheme.sig.length_signature if padded else None)
+    else:
+        encoding = ENCODINGS[name]()
+    return encoding if encoding.applies_to(scheme_name, field) else WireEncoding()
+
+class WireFormatBenchmark:
+    """
+    Compares wire encodings of signatures and public keys per scheme.
+
+    For each applicable encoding: encoded size, encode/decode throughput, calldata gas
+    (and, with a running chain, the measured gas of sending it to the PQCVerifier
+    contract), storage gas as SSTORE words or contract code, and a total cost per
+    message that converts CPU time and gas to the same unit (USD):
+        gas * gas_price * eth_usd + (encode + decode seconds) * cpu_usd_per_hour / 3600
+
+    Only `raw` and `falcon-trimmed` are accepted by the verifier contracts. The other
+    encodings would have to be decoded on-chain, which is not modelled, so their cost
+    counts the decode off-chain only: they are labelled "transport/storage only", get no
+    chain measurement and are never recommended. The cheapest verifier-accepted
+    encoding per scheme and field is reported as the recommendation.
+    """
+
+    def __init__(self, samples: int = 50, min_time: float = 0.2, chain: bool = False,
+                 gas_price_gwei: float = 20.0, eth_usd: float = 3000.0, cpu_usd_per_hour: float = 0.05):
+        self.samples = samples
+        self.min_time = min_time
+        self.gas_price_gwei = gas_price_gwei
+        self.eth_usd = eth_usd
+        self.cpu_usd_per_hour = cpu_usd_per_hour
+        self.chain = None
+        if chain:
+            from blockchain_benchmark import BlockchainPQCBenchmark
+            self.chain = BlockchainPQCBenchmark()
+
+    def _throughput(self, func, items: List[bytes]) -> float:
+        """Seconds per item, repeating the whole batch for at least min_time"""
+        rounds = 0
+        start = time.perf_counter()
+        while True:
+            for item in items:
+                func(item)
+            rounds += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= self.min_time:
+                return elapsed / (rounds * len(items))
+
+    def _tx_gas(self, scheme, message: bytes, signature: bytes, public_key: bytes) -> int:
+        verify_func = self.chain.placeholder_verify_function(scheme)
+        tx_hash = verify_func(message, signature, public_key).transact({
+            'from': self.chain.account,
+            'gas': 2_000_000
+        })
+        return self.chain.w3.eth.wait_for_transaction_receipt(tx_hash)['gasUsed']
+
+    def cost_usd(self, gas: float, cpu_seconds: float) -> float:
+        return (gas * self.gas_price_gwei * 1e-9 * self.eth_usd
+                + cpu_seconds * self.cpu_usd_per_hour / 3600)
+
+    def benchmark_scheme(self, scheme) -> Dict[str, Any]:
+        print(f"\nWire encodings for {scheme.get_name()} ({self.samples} samples)...")
+        message = os.urandom(32)
+        public_key, private_key = scheme.keygen()
+        samples = {
+            'signature': [scheme.sign(message, private_key) for _ in range(self.samples)],
+            'public_key': [scheme.keygen()[0] for _ in range(self.samples)]
+        }
+        results = {}
+        for field in FIELDS:
+            results[field] = {}
+            for name in ENCODINGS:
+                encoding = get_encoding(name, scheme, field)
+                if encoding.name != name:
+                    continue
+                encoded = [encoding.encode(item) for item in samples[field]]
+                if any(encoding.decode(e) != item for e, item in zip(encoded, samples[field])):
+                    raise RuntimeError(f"{name} does not round-trip {field}s of {scheme.get_name()}")
+                if field == 'signature' and not scheme.verify(message, encoding.decode(encoded[0]), public_key):
+                    raise RuntimeError(f"{name}-decoded signature rejected by {scheme.get_name()}")
+
+                raw_bytes = statistics.mean(len(item) for item in samples[field])
+                encode_s = self._throughput(encoding.encode, samples[field])
+                decode_s = self._throughput(encoding.decode, encoded)
+                entry = {
+                    'usage': 'verifier' if encoding.verifier_input else 'transport/storage only',
+                    'size_bytes': statistics.mean(len(e) for e in encoded),
+                    'size_ratio': statistics.mean(len(e) for e in encoded) / raw_bytes,
+                    'zero_bytes': statistics.mean(e.count(0) for e in encoded),
+                    'encode_us': encode_s * 1e6,
+                    'decode_us': decode_s * 1e6,
+                    'encode_mbps': raw_bytes / encode_s / 1e6,
+                    'decode_mbps': raw_bytes / decode_s / 1e6,
+                    'calldata_gas': statistics.mean(calldata_gas(e) for e in encoded),
+                    'storage_gas': statistics.mean(storage_gas(e) for e in encoded),
+                    'code_storage_gas': statistics.mean(code_storage_gas(e) for e in encoded)
+                }
+                gas = entry['calldata_gas']
+                if self.chain and encoding.verifier_input:
+                    signature, key = (encoded[0], public_key) if field == 'signature' \
+                        else (samples['signature'][0], encoded[0])
+                    entry['tx_gas'] = self._tx_gas(scheme, message, signature, key)
+                    gas = entry['tx_gas']
+                entry['total_cost_usd'] = self.cost_usd(gas, encode_s + decode_s)
+                results[field][name] = entry
+                print(f"  {field:<10} {name:<16} {entry['size_bytes']:7.1f} B "
+                      f"({entry['size_ratio'] * 100:5.1f}%), calldata {entry['calldata_gas']:7.0f} gas, "
+                      f"encode {entry['encode_mbps']:8.1f} MB/s, decode {entry['decode_mbps']:8.1f} MB/s"
+                      f"{'' if encoding.verifier_input else '  [transport/storage only]'}")
+
+            best = min((name for name in results[field] if ENCODINGS[name].verifier_input),
+                       key=lambda name: results[field][name]['total_cost_usd'])
+            results[field]['recommended'] = best
+            print(f"  -> lowest total cost for {field}: {best}")
+        return results
+
+    def run(self, schemes, output_path='results/wire_formats.json') -> Dict[str, Any]:
+        all_results = {}
+        for scheme in schemes:
+            try:
+                all_results[scheme.get_name()] = self.benchmark_scheme(scheme)
+            except Exception as e:
+                print(f"Error benchmarking {scheme.get_name()}: {str(e)}")
+                import traceback
+                traceback.print_exc()
+
+        Path(output_path).parent.mkdir(exist_ok=True)
+        with open(output_path, 'w') as f:
+            json.dump(all_results, f, indent=2)
+        self._save_csv(all_results, Path(output_path).with_suffix('.csv'))
+        print(f"\nResults saved to {output_path}")
+        return all_results
+
+    @staticmethod
+    def _save_csv(all_results: Dict[str, Any], path: Path):
+        with open(path, 'w', newline='') as f:
+            writer = None
+            for scheme_name, results in all_results.items():
+                for field in FIELDS:
+                    for name, entry in results[field].items():
+                        if name == 'recommended':
+                            continue
+                        row = {'scheme': scheme_name, 'field': field, 'encoding': name,
+                               'recommended': results[field]['recommended'] == name, **entry}
+                        if writer is None:
+                            writer = csv.DictWriter(f, fieldnames=list(row), extrasaction='ignore')
+                            writer.writeheader()
+                        writer.writerow(row)
+
+def main():
+    parser = argparse.ArgumentParser(description="Wire encodings for signatures and public keys")
+    parser.add_argument('--samples', type=int, default=50, help="Signatures and keys per scheme")
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help="Minimum timing per encode/decode measurement in seconds")
+    parser.add_argument('--chain', action='store_true',
+                        help="Also measure transaction gas against the deployed PQCVerifier")
+    parser.add_argument('--gas-price-gwei', type=float, default=20.0)
+    parser.add_argument('--eth-usd', type=float, default=3000.0)
+    parser.add_argument('--cpu-usd-per-hour', type=float, default=0.05,
+                        help="Price of one CPU core-hour for the encode/decode cost")
+    args = parser.parse_args()
+
+    benchmark = WireFormatBenchmark(args.samples, args.min_time, args.chain,
+                                    args.gas_price_gwei, args.eth_usd, args.cpu_usd_per_hour)
+    # Imported here: the singletons load liboqs, which importers of this module may not need
+    from schemes import dilithium, falcon, sphincs
+    benchmark.run([dilithium, falcon, sphincs])
+
+if __name__ == "__main__":
+    main()